@@ -0,0 +1,65 @@
+from unstructured.documents.elements import Text
+from unstructured.embed.cache import (
+    CachedEmbeddingEncoder,
+    EmbeddingCache,
+    get_embedding_cache_key,
+)
+from unstructured.embed.openai import OpenAIEmbeddingEncoder
+
+
+def test_embedding_cache_key_normalizes_text():
+    assert get_embedding_cache_key("openai:ada", " Café\n") == get_embedding_cache_key(
+        "openai:ada",
+        "Café",
+    )
+    assert get_embedding_cache_key("openai:ada", "text") != get_embedding_cache_key(
+        "huggingface:mini",
+        "text",
+    )
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(path=tmp_path / "embeddings.sqlite3", max_entries=2)
+    cache.update({"a": [0.1], "b": [0.2]})
+    assert cache.get_many(["a"]) == {"a": [0.1]}
+
+    cache.update({"c": [0.3]})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": [0.1], "c": [0.3]}
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_embedding_cache_only_checks_for_evictions_every_so_many_inserts(mocker, tmp_path):
+    cache = EmbeddingCache(path=tmp_path / "embeddings.sqlite3", max_entries=100)
+    evict = mocker.spy(cache, "evict")
+
+    for i in range(9):
+        cache.update({f"key-{i}": [float(i)]})
+    evict.assert_not_called()
+
+    cache.update({"key-9": [9.0]})
+    evict.assert_called_once_with(max_entries=100)
+
+
+def test_cached_embedding_encoder_only_embeds_new_text(mocker, tmp_path):
+    mock_client = mocker.MagicMock()
+    mock_client.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    mocker.patch.object(OpenAIEmbeddingEncoder, "get_openai_client", return_value=mock_client)
+    cache = EmbeddingCache(path=tmp_path / "embeddings.sqlite3")
+
+    def embed(texts):
+        encoder = CachedEmbeddingEncoder(
+            encoder=OpenAIEmbeddingEncoder(api_key="api_key"),
+            cache=cache,
+            namespace="langchain-openai:",
+        )
+        return encoder.embed_documents(elements=[Text(text) for text in texts])
+
+    elements = embed(["footer", "sentence 1", "footer"])
+    assert [e.embeddings for e in elements] == [[6.0], [10.0], [6.0]]
+    mock_client.embed_documents.assert_called_once_with(["footer", "sentence 1"])
+
+    elements = embed(["footer", "sentence 22"])
+    assert [e.embeddings for e in elements] == [[6.0], [11.0]]
+    assert mock_client.embed_documents.call_args.args == (["sentence 22"],)
+    assert elements[0].to_dict()["embeddings"] == [6.0]
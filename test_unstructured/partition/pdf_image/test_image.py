@@ -9,7 +9,7 @@ from unstructured_inference.inference import layout
 
 from test_unstructured.unit_utils import assert_round_trips_through_JSON, example_doc_path
 from unstructured.chunking.title import chunk_by_title
-from unstructured.documents.elements import ElementType
+from unstructured.documents.elements import ElementMetadata, ElementType, Title
 from unstructured.partition.pdf_image import image, ocr, pdf
 from unstructured.partition.utils.constants import (
     UNSTRUCTURED_INCLUDE_DEBUG_METADATA,
@@ -160,6 +160,27 @@ def test_partition_image_with_multipage_tiff(
     assert elements[-1].metadata.page_number == 2
 
 
+def test_partition_image_with_multipage_tiff_ocr_only(
+    filename="example-docs/layout-parser-paper-combined.tiff",
+):
+    def mock_ocr_from_image(image, page_number=1, **kwargs):
+        return [Title(image.format, metadata=ElementMetadata(page_number=page_number))]
+
+    with mock.patch.object(
+        pdf,
+        "_partition_pdf_or_image_with_ocr_from_image",
+        side_effect=mock_ocr_from_image,
+    ):
+        elements = image.partition_image(
+            filename=filename,
+            strategy=PartitionStrategy.OCR_ONLY,
+            ocr_max_workers=2,
+        )
+
+    assert [el.metadata.page_number for el in elements] == [1, 2]
+    assert [el.text for el in elements] == ["TIFF", "TIFF"]
+
+
 def test_partition_image_with_language_passed(filename="example-docs/example.jpg"):
     with mock.patch.object(
         ocr,
@@ -1,6 +1,7 @@
 import logging
 import math
 import os
+import time
 from tempfile import SpooledTemporaryFile
 from unittest import mock
 
@@ -102,13 +103,8 @@ class MockDocumentLayout(layout.DocumentLayout):
 )
 def test_partition_pdf_local(monkeypatch, filename, file):
     monkeypatch.setattr(
-        layout,
-        "process_data_with_model",
-        lambda *args, **kwargs: MockDocumentLayout(),
-    )
-    monkeypatch.setattr(
-        layout,
-        "process_file_with_model",
+        pdf,
+        "process_pdf_page_images_with_model",
         lambda *args, **kwargs: MockDocumentLayout(),
     )
     monkeypatch.setattr(
@@ -189,10 +185,10 @@ def test_partition_pdf_with_model_name_env_var(
     monkeypatch,
     filename=example_doc_path("layout-parser-paper-fast.pdf"),
 ):
-    monkeypatch.setattr(pdf, "extractable_elements", lambda *args, **kwargs: [])
+    monkeypatch.setattr(pdf, "is_pdf_text_extractable", lambda *args, **kwargs: False)
     with mock.patch.object(
-        layout,
-        "process_file_with_model",
+        pdf,
+        "process_pdf_page_images_with_model",
         mock.MagicMock(),
     ) as mock_process:
         pdf.partition_pdf(filename=filename, strategy=PartitionStrategy.HI_RES)
@@ -203,10 +199,10 @@ def test_partition_pdf_with_model_name(
     monkeypatch,
     filename=example_doc_path("layout-parser-paper-fast.pdf"),
 ):
-    monkeypatch.setattr(pdf, "extractable_elements", lambda *args, **kwargs: [])
+    monkeypatch.setattr(pdf, "is_pdf_text_extractable", lambda *args, **kwargs: False)
     with mock.patch.object(
-        layout,
-        "process_file_with_model",
+        pdf,
+        "process_pdf_page_images_with_model",
         mock.MagicMock(),
     ) as mock_process:
         pdf.partition_pdf(
@@ -364,7 +360,7 @@ def test_partition_pdf_falls_back_to_hi_res_from_ocr_only(
         return dep not in ["pytesseract"]
 
     monkeypatch.setattr(strategies, "dependency_exists", mock_exists)
-    monkeypatch.setattr(pdf, "extractable_elements", lambda *args, **kwargs: [])
+    monkeypatch.setattr(pdf, "is_pdf_text_extractable", lambda *args, **kwargs: False)
 
     mock_return = [Text("Hello there!")]
     with mock.patch.object(
@@ -400,6 +396,56 @@ def test_partition_pdf_falls_back_to_ocr_only(
     assert "unstructured_inference is not installed" in caplog.text
 
 
+def _mock_ocr_from_image(image, page_number=1, **kwargs):
+    # The first pages finish last
+    time.sleep(0.05 / page_number)
+    return [Title(f"Page {page_number}", metadata=ElementMetadata(page_number=page_number))]
+
+
+def test_partition_pdf_with_ocr_only_ocrs_pages_concurrently(
+    filename=example_doc_path("layout-parser-paper-fast.pdf"),
+):
+    images = [Image.new("RGB", (100, 100)) for _ in range(7)]
+    with mock.patch.object(
+        pdf,
+        "convert_pdf_to_images",
+        return_value=iter(images),
+    ), mock.patch.object(
+        pdf,
+        "_partition_pdf_or_image_with_ocr_from_image",
+        side_effect=_mock_ocr_from_image,
+    ) as mock_ocr:
+        elements = pdf._partition_pdf_or_image_with_ocr(filename=filename, ocr_max_workers=3)
+
+    assert mock_ocr.call_count == 7
+    assert [el.text for el in elements] == [f"Page {i}" for i in range(1, 8)]
+    assert [el.metadata.page_number for el in elements] == list(range(1, 8))
+
+
+def test_partition_pdf_with_ocr_only_ignores_hi_res_max_workers(
+    filename=example_doc_path("layout-parser-paper-fast.pdf"),
+):
+    images = [Image.new("RGB", (100, 100)) for _ in range(3)]
+    with mock.patch.object(
+        pdf,
+        "convert_pdf_to_images",
+        return_value=iter(images),
+    ), mock.patch.object(
+        pdf,
+        "_partition_pdf_or_image_with_ocr_from_image",
+        side_effect=_mock_ocr_from_image,
+    ):
+        elements = pdf.partition_pdf(
+            filename=filename,
+            strategy=PartitionStrategy.OCR_ONLY,
+            max_workers=2,
+            page_batch_size=4,
+            ocr_max_workers=2,
+        )
+
+    assert [el.text for el in elements] == [f"Page {i}" for i in range(1, 4)]
+
+
 def test_partition_pdf_uses_table_extraction():
     filename = example_doc_path("layout-parser-paper-fast.pdf")
     with mock.patch(
@@ -486,11 +532,84 @@ def test_partition_pdf_with_copy_protection():
     assert isinstance(elements[idx].metadata.detection_class_prob, float)
 
 
+def test_partition_pdf_hi_res_pages_in_parallel(
+    filename=example_doc_path("layout-parser-paper-fast.pdf"),
+):
+    elements = pdf.partition_pdf(filename=filename, strategy=PartitionStrategy.HI_RES)
+    parallel_elements = pdf.partition_pdf(
+        filename=filename,
+        strategy=PartitionStrategy.HI_RES,
+        max_workers=2,
+        page_batch_size=1,
+    )
+
+    assert {el.metadata.page_number for el in parallel_elements} == {1, 2}
+    assert [el.to_dict() for el in parallel_elements] == [el.to_dict() for el in elements]
+
+
+@pytest.mark.parametrize(
+    "filename",
+    [
+        example_doc_path("layout-parser-paper.pdf"),
+        example_doc_path("invalid-pdf-structure-pdfminer-one-page.pdf"),
+    ],
+)
+def test_get_regions_by_pdfminer_of_some_pages(filename):
+    with open(filename, "rb") as f:
+        regions = pdfminer_processing.get_regions_by_pdfminer(f)
+    with open(filename, "rb") as f:
+        page_regions = pdfminer_processing.get_regions_by_pdfminer(f, page_numbers=[2])
+
+    assert len(page_regions) == 1
+    assert [(region.bbox, region.text) for region in page_regions[0]] == [
+        (region.bbox, region.text) for region in regions[1]
+    ]
+
+
+@pytest.mark.parametrize(
+    ("strategy", "infer_table_structure", "partitions_with_pdfminer"),
+    [
+        (PartitionStrategy.HI_RES, False, False),
+        (PartitionStrategy.AUTO, True, False),
+        (PartitionStrategy.AUTO, False, True),
+    ],
+)
+def test_partition_pdf_only_partitions_with_pdfminer_for_fast(
+    strategy,
+    infer_table_structure,
+    partitions_with_pdfminer,
+    filename=example_doc_path("layout-parser-paper-fast.pdf"),
+):
+    with mock.patch.object(
+        pdf,
+        "extractable_elements",
+        return_value=[Title("Hello there!")],
+    ) as mock_extractable_elements, mock.patch.object(
+        pdf,
+        "_partition_pdf_or_image_local",
+        return_value=[],
+    ) as mock_partition:
+        pdf.partition_pdf(
+            filename=filename,
+            strategy=strategy,
+            infer_table_structure=infer_table_structure,
+        )
+
+    assert mock_extractable_elements.called is partitions_with_pdfminer
+    assert mock_partition.called is not partitions_with_pdfminer
+    if mock_partition.called:
+        assert mock_partition.call_args.kwargs["pdf_text_extractable"] is True
+
+
 def test_partition_pdf_with_dpi():
     filename = os.path.join("example-docs", "copy-protected.pdf")
-    with mock.patch.object(layout, "process_file_with_model", mock.MagicMock()) as mock_process:
+    with mock.patch.object(
+        pdf,
+        "process_pdf_page_images_with_model",
+        mock.MagicMock(),
+    ) as mock_process:
         pdf.partition_pdf(filename=filename, strategy=PartitionStrategy.HI_RES, pdf_image_dpi=100)
-        assert mock_process.call_args[1]["pdf_image_dpi"] == 100
+        assert mock_process.call_args[0][0].dpi == 100
 
 
 def test_partition_pdf_requiring_recursive_text_grab(filename=example_doc_path("reliance.pdf")):
@@ -514,7 +633,7 @@ def test_partition_pdf_fails_if_pdf_not_processable(
         return dep not in ["unstructured_inference", "pytesseract"]
 
     monkeypatch.setattr(strategies, "dependency_exists", mock_exists)
-    monkeypatch.setattr(pdf, "extractable_elements", lambda *args, **kwargs: [])
+    monkeypatch.setattr(pdf, "is_pdf_text_extractable", lambda *args, **kwargs: False)
 
     with pytest.raises(ValueError):
         pdf.partition_pdf(filename=filename)
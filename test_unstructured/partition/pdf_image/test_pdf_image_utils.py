@@ -1,5 +1,6 @@
 import os
 import tempfile
+from unittest import mock
 
 import numpy as np
 import pytest
@@ -114,6 +115,56 @@ def test_save_elements(filename=example_doc_path("embedded-images.pdf")):
             assert el.metadata.image_path == expected_image_path
 
 
+def test_save_elements_with_pdf_page_images(tmpdir):
+    pdf_page_images = mock.MagicMock()
+    pdf_page_images.get_page.return_value = PILImg.new("RGB", (100, 100))
+    elements = [
+        Image(
+            text="3",
+            coordinates=((10, 10), (10, 50), (50, 50), (50, 10)),
+            coordinate_system=PixelSpace(width=100, height=100),
+            metadata=ElementMetadata(page_number=2),
+        ),
+    ]
+
+    pdf_image_utils.save_elements(
+        elements=elements,
+        element_category_to_save=ElementType.IMAGE,
+        pdf_image_dpi=200,
+        output_dir_path=str(tmpdir),
+        pdf_page_images=pdf_page_images,
+    )
+
+    pdf_page_images.get_page.assert_called_once_with(2)
+    assert elements[0].metadata.image_path == os.path.join(str(tmpdir), "figure-2-1.jpg")
+    assert PILImg.open(elements[0].metadata.image_path).size == (40, 40)
+
+
+@pytest.mark.parametrize("file_mode", ["filename", "rb"])
+def test_pdf_page_images_renders_each_page_once(
+    file_mode, filename=example_doc_path("layout-parser-paper-fast.pdf")
+):
+    with open(filename, "rb") as f:
+        file = f.read() if file_mode == "rb" else None
+    with pdf_image_utils.PdfPageImages(
+        filename=filename if file is None else "",
+        file=file,
+        max_cached_pages=1,
+        render_batch_size=1,
+    ) as pdf_page_images:
+        images = list(pdf_page_images)
+        for page_number in range(1, len(pdf_page_images) + 1):
+            pdf_page_images.get_page(page_number)
+        temp_dir = pdf_page_images.temp_dir
+
+        assert len(images) == len(pdf_page_images) == 2
+        assert pdf_page_images.number_of_renders == 2
+        assert pdf_page_images.get_page(2) is pdf_page_images.get_page(2)
+        with pytest.raises(IndexError):
+            pdf_page_images.get_page(3)
+    assert not os.path.exists(temp_dir)
+
+
 def test_write_image_raises_error():
     with pytest.raises(ValueError):
         pdf_image_utils.write_image("invalid_type", "test_image.jpg")
@@ -1,15 +1,25 @@
 import contextlib
+import io
 import json
 import os
 import pathlib
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
+import pypdf
 import pytest
 import requests
 from unstructured_client.general import General
 from unstructured_client.models.errors.sdkerror import SDKError
 
 from unstructured.documents.elements import NarrativeText
-from unstructured.partition.api import partition_multiple_via_api, partition_via_api
+from unstructured.partition.api import (
+    PartitionApiClient,
+    partition_multiple_via_api,
+    partition_via_api,
+)
 
 DIRECTORY = pathlib.Path(__file__).parent.resolve()
 
@@ -446,3 +456,141 @@ def test_partition_multiple_via_api_invalid_request_data_kwargs():
             strategy="not_a_strategy",
             api_key=get_api_key(),
         )
+
+
+class StandInApi:
+    """Local stand-in for the API that returns an element per page of the uploaded file."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.num_requests = 0
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.num_failures = 0
+        self.form_data = {}
+
+    def partition(self, content_type, body):
+        message = BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body,
+        )
+        filename, content = None, b""
+        for part in message.get_payload():
+            name = part.get_param("name", header="content-disposition")
+            if name == "files":
+                filename = part.get_filename()
+                content = part.get_payload(decode=True)
+            else:
+                self.form_data.setdefault(name, []).append(part.get_payload())
+        num_pages = len(pypdf.PdfReader(io.BytesIO(content)).pages) if content[:4] == b"%PDF" else 1
+        return [
+            {
+                "type": "NarrativeText",
+                "element_id": f"{filename}-{content[-64:].hex()}-{page_number}",
+                "text": f"Page {page_number} of {num_pages}",
+                "metadata": {"filename": filename, "page_number": page_number},
+            }
+            for page_number in range(1, num_pages + 1)
+        ]
+
+
+@pytest.fixture()
+def stand_in_api():
+    api = StandInApi()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            with api.lock:
+                api.num_requests += 1
+                api.connections.add(self.client_address)
+                api.in_flight += 1
+                api.max_in_flight = max(api.max_in_flight, api.in_flight)
+                fail = api.num_failures > 0
+                api.num_failures -= 1
+            time.sleep(0.05)
+            if fail:
+                status, response = 503, b"{}"
+            else:
+                status = 200
+                response = json.dumps(api.partition(self.headers["Content-Type"], body)).encode()
+            with api.lock:
+                api.in_flight -= 1
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api.url = f"http://127.0.0.1:{server.server_address[1]}/general/v0/general"
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+def test_partition_api_client_reuses_connections(stand_in_api):
+    filenames = [
+        os.path.join(DIRECTORY, "..", "..", "example-docs", EML_TEST_FILE),
+        os.path.join(DIRECTORY, "..", "..", "example-docs", "fake.docx"),
+    ] * 4
+
+    with PartitionApiClient(api_url=stand_in_api.url, max_concurrency=2) as client:
+        documents = client.partition_multiple(
+            filenames=filenames,
+            strategy="fast",
+            languages=["eng", "deu"],
+            pdf_infer_table_structure=False,
+        )
+
+    assert [document[0].metadata.filename for document in documents] == [
+        os.path.basename(filename) for filename in filenames
+    ]
+    assert stand_in_api.num_requests == 8
+    assert stand_in_api.max_in_flight == 2
+    assert len(stand_in_api.connections) <= 2
+    assert stand_in_api.form_data["languages"][:2] == ["eng", "deu"]
+    assert stand_in_api.form_data["pdf_infer_table_structure"][0] == "false"
+
+
+def test_partition_api_client_retries(stand_in_api):
+    stand_in_api.num_failures = 2
+    filename = os.path.join(DIRECTORY, "..", "..", "example-docs", EML_TEST_FILE)
+
+    with PartitionApiClient(api_url=stand_in_api.url, backoff_factor=0) as client:
+        elements = client.partition(filename=filename)
+
+    assert len(elements) == 1
+    assert stand_in_api.num_requests == 3
+
+    stand_in_api.num_failures = 2
+    with PartitionApiClient(api_url=stand_in_api.url, max_retries=1, backoff_factor=0) as client:
+        with pytest.raises(ValueError):
+            client.partition(filename=filename)
+
+
+def test_partition_api_client_splits_pdf(stand_in_api):
+    filename = os.path.join(DIRECTORY, "..", "..", "example-docs", "layout-parser-paper.pdf")
+
+    with PartitionApiClient(api_url=stand_in_api.url, max_concurrency=3) as client:
+        with open(filename, "rb") as f:
+            elements = client.partition(
+                file=f,
+                metadata_filename=filename,
+                split_pdf_page_range=5,
+            )
+
+    assert [element.metadata.page_number for element in elements] == list(range(1, 17))
+    assert [element.text for element in elements[:6]] == [
+        *[f"Page {i} of 5" for i in range(1, 6)],
+        "Page 1 of 5",
+    ]
+    assert stand_in_api.num_requests == 4
+    assert stand_in_api.max_in_flight == 3
@@ -54,6 +54,43 @@ def test_is_pdf_text_extractable(filename, from_file, expected):
     assert bool(extractable) is expected
 
 
+@pytest.mark.parametrize(
+    ("filename", "from_file", "expected"),
+    [
+        ("layout-parser-paper-fast.pdf", True, True),
+        ("copy-protected.pdf", True, True),
+        ("loremipsum-flat.pdf", True, False),
+        ("layout-parser-paper-fast.pdf", False, True),
+        ("copy-protected.pdf", False, True),
+        ("loremipsum-flat.pdf", False, False),
+        ("invalid-pdf-structure-pdfminer-entire-doc.pdf", False, True),
+    ],
+)
+def test_is_pdf_text_extractable_from_sampled_pages(filename, from_file, expected):
+    filename = os.path.join("example-docs", filename)
+
+    if from_file:
+        with open(filename, "rb") as f:
+            extractable = strategies.is_pdf_text_extractable(file=f)
+    else:
+        extractable = strategies.is_pdf_text_extractable(filename=filename)
+
+    assert extractable is expected
+
+
+@pytest.mark.parametrize(
+    ("number_of_pages", "max_pages", "expected"),
+    [
+        (3, 10, [0, 1, 2]),
+        (100, 1, [0]),
+        (100, 3, [0, 50, 99]),
+        (10, 4, [0, 3, 6, 9]),
+    ],
+)
+def test_sample_page_indices(number_of_pages, max_pages, expected):
+    assert strategies._sample_page_indices(number_of_pages, max_pages) == expected
+
+
 def test_determine_image_auto_strategy():
     strategy = strategies._determine_image_auto_strategy()
     assert strategy == PartitionStrategy.HI_RES
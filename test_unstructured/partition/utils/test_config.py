@@ -9,3 +9,14 @@ def test_env_override(monkeypatch):
     from unstructured.partition.utils.config import env_config
 
     assert env_config.IMAGE_CROP_PAD == 1
+
+
+def test_ocr_max_workers_defaults_to_one_in_daemon_processes(monkeypatch):
+    import multiprocessing
+
+    from unstructured.partition.utils.config import env_config
+
+    monkeypatch.delenv("OCR_MAX_WORKERS", raising=False)
+    monkeypatch.setattr(multiprocessing.current_process(), "daemon", True)
+
+    assert env_config.OCR_MAX_WORKERS == 1
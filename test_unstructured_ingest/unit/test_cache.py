@@ -0,0 +1,106 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from unstructured.ingest.cli.cli import get_cmd
+from unstructured.ingest.pipeline.cache import get_cache_stats, prune_cache, touch_cache_file
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture()
+def work_dir(tmp_path: Path) -> Path:
+    """
+    Cached outputs last used 1 to 4 days ago, 100 bytes each, a journal last used 5 days ago
+    whose WAL file takes up another 50 bytes, and a manifest last used 6 days ago.
+    """
+    now = time.time()
+    for name, days_ago, size in [
+        ("partitioned/a.json", 4, 100),
+        ("partitioned/content/b.json", 3, 100),
+        ("chunked/c.json", 2, 100),
+        ("embedded/d.json", 1, 100),
+        ("journals/run.sqlite3", 5, 100),
+        ("journals/run.sqlite3-wal", 5, 50),
+        ("manifests/destination.sqlite3", 6, 100),
+    ]:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"a" * size)
+        os.utime(path, (now - days_ago * DAY, now - days_ago * DAY))
+    return tmp_path
+
+
+def test_get_cache_stats(work_dir: Path):
+    stats = get_cache_stats(work_dir=work_dir)
+
+    files = {cache_dir: dir_stats["files"] for cache_dir, dir_stats in stats.items()}
+    assert {cache_dir: n for cache_dir, n in files.items() if n} == {
+        "partitioned": 1,
+        "partitioned/content": 1,
+        "chunked": 1,
+        "embedded": 1,
+        "journals": 1,
+        "manifests": 1,
+    }
+    assert stats["chunked"]["bytes"] == 100
+    assert stats["journals"]["bytes"] == 150
+    assert stats["doc_state"]["files"] == 0
+    assert stats["chunked"]["oldest"] == pytest.approx(time.time() - 2 * DAY, abs=60)
+    assert get_cache_stats(work_dir=work_dir / "missing")["embedded"]["files"] == 0
+
+
+def test_prune_cache_by_age(work_dir: Path):
+    evicted = prune_cache(work_dir=work_dir, max_age=2.5 * DAY)
+
+    assert evicted == {"files": 3, "bytes": 350, "remaining_bytes": 200}
+    assert not (work_dir / "partitioned" / "a.json").exists()
+    assert not (work_dir / "partitioned" / "content" / "b.json").exists()
+    assert (work_dir / "chunked" / "c.json").exists()
+    assert list((work_dir / "journals").iterdir()) == []
+    assert (work_dir / "manifests" / "destination.sqlite3").exists()
+
+
+def test_prune_cache_evicts_least_recently_used(work_dir: Path):
+    touch_cache_file(work_dir / "partitioned" / "a.json")
+
+    evicted = prune_cache(work_dir=work_dir, max_size=250, min_age=0)
+
+    assert evicted == {"files": 3, "bytes": 350, "remaining_bytes": 200}
+    assert (work_dir / "partitioned" / "a.json").exists()
+    assert (work_dir / "embedded" / "d.json").exists()
+
+
+def test_prune_cache_keeps_recently_used(work_dir: Path):
+    evicted = prune_cache(work_dir=work_dir, max_size=0, min_age=1.5 * DAY)
+
+    assert evicted == {"files": 4, "bytes": 450, "remaining_bytes": 100}
+    assert (work_dir / "embedded" / "d.json").exists()
+
+
+def test_prune_cache_dry_run(work_dir: Path):
+    evicted = prune_cache(work_dir=work_dir, max_size=0, min_age=0, dry_run=True)
+
+    assert evicted["files"] == 5
+    assert len(list(work_dir.rglob("*.json"))) == 4
+    assert (work_dir / "journals" / "run.sqlite3").exists()
+
+
+def test_cache_cli(work_dir: Path):
+    result = CliRunner().invoke(get_cmd(), ["cache", "stats", "--work-dir", str(work_dir)])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["embedded"]["newest"] == pytest.approx(1.0, abs=0.01)
+
+    result = CliRunner().invoke(
+        get_cmd(),
+        ["cache", "prune", "--work-dir", str(work_dir), "--max-age", "1.5"],
+    )
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["files"] == 4
+
+    result = CliRunner().invoke(get_cmd(), ["cache", "prune", "--work-dir", str(work_dir)])
+    assert result.exit_code != 0
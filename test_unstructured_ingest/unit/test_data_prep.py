@@ -0,0 +1,116 @@
+import json
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from unstructured.ingest.connector.azure_cognitive_search import (
+    AzureCognitiveSearchAccessConfig,
+    AzureCognitiveSearchDestinationConnector,
+    AzureCognitiveSearchWriteConfig,
+    SimpleAzureCognitiveSearchStorageConfig,
+)
+from unstructured.ingest.connector.local import LocalIngestDoc, SimpleLocalConfig
+from unstructured.ingest.connector.mongodb import (
+    MongoDBDestinationConnector,
+    MongoDBWriteConfig,
+    SimpleMongoDBStorageConfig,
+)
+from unstructured.ingest.interfaces import ProcessorConfig, ReadConfig
+from unstructured.ingest.utils.data_prep import batch_generator, iter_elements_dicts
+
+
+@pytest.mark.parametrize(
+    ("batch_size", "max_batch_bytes", "expected"),
+    [
+        (None, None, [["a", "bb", "ccc", "dddd"]]),
+        (3, None, [["a", "bb", "ccc"], ["dddd"]]),
+        (None, 6, [["a", "bb", "ccc"], ["dddd"]]),
+        (2, 6, [["a", "bb"], ["ccc"], ["dddd"]]),
+        (None, 2, [["a"], ["bb"], ["ccc"], ["dddd"]]),
+    ],
+)
+def test_batch_generator(
+    batch_size: t.Optional[int],
+    max_batch_bytes: t.Optional[int],
+    expected: t.List[t.List[str]],
+):
+    batches = batch_generator(
+        ["a", "bb", "ccc", "dddd"],
+        batch_size=batch_size,
+        max_batch_bytes=max_batch_bytes,
+        get_size=len,
+    )
+    assert list(batches) == expected
+
+
+def test_batch_generator_is_lazy():
+    consumed: t.List[int] = []
+
+    def items():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    batches = batch_generator(items(), batch_size=3)
+    assert next(batches) == [0, 1, 2]
+    assert consumed == [0, 1, 2]
+
+
+@pytest.fixture()
+def docs(tmp_path: Path) -> t.List[LocalIngestDoc]:
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    docs = []
+    for i, num_elements in enumerate([4, 2]):
+        (tmp_path / f"doc-{i}.txt").write_text(f"doc {i}")
+        doc = LocalIngestDoc(
+            processor_config=ProcessorConfig(output_dir=str(output_dir)),
+            read_config=ReadConfig(),
+            connector_config=SimpleLocalConfig(input_path=str(tmp_path)),
+            path=str(tmp_path / f"doc-{i}.txt"),
+        )
+        doc._output_filename.write_text(
+            json.dumps(
+                [{"text": f"element {i}-{j}", "metadata": {}} for j in range(num_elements)],
+            ),
+        )
+        docs.append(doc)
+    return docs
+
+
+def test_iter_elements_dicts(docs: t.List[LocalIngestDoc]):
+    texts = [element["text"] for element in iter_elements_dicts(docs)]
+    assert texts == [f"element 0-{j}" for j in range(4)] + [f"element 1-{j}" for j in range(2)]
+
+
+def test_mongodb_writes_in_batches(mocker, docs: t.List[LocalIngestDoc]):
+    connector = MongoDBDestinationConnector(
+        write_config=MongoDBWriteConfig(database="db", collection="elements", batch_size=4),
+        connector_config=SimpleMongoDBStorageConfig(host="localhost"),
+    )
+    write_dict = mocker.patch.object(connector, "write_dict")
+
+    connector.write(docs=docs)
+
+    assert [len(call.kwargs["elements_dict"]) for call in write_dict.call_args_list] == [4, 2]
+
+
+def test_azure_cognitive_search_batches_capped_in_bytes(mocker, docs: t.List[LocalIngestDoc]):
+    connector = AzureCognitiveSearchDestinationConnector(
+        write_config=AzureCognitiveSearchWriteConfig(index="index", max_batch_bytes=250),
+        connector_config=SimpleAzureCognitiveSearchStorageConfig(
+            endpoint="https://search.windows.net",
+            access_config=AzureCognitiveSearchAccessConfig(key="key"),
+        ),
+    )
+    write_dict = mocker.patch.object(connector, "write_dict")
+
+    connector.write(docs=docs)
+
+    batches = [call.kwargs["elements_dict"] for call in write_dict.call_args_list]
+    assert sum(len(batch) for batch in batches) == 6
+    assert len(batches) > 1
+    for batch in batches:
+        assert sum(len(json.dumps(element)) for element in batch) <= 250
+        assert all("id" in element for element in batch)
@@ -0,0 +1,105 @@
+import multiprocessing as mp
+import pickle
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+
+import pytest
+
+from unstructured.ingest.pipeline.doc_state import (
+    ManagerDocStateStore,
+    SqliteDocStateStore,
+    get_doc_state_store,
+)
+
+
+def add_doc(store: SqliteDocStateStore, key: str) -> str:
+    store[key] = {"unique_id": key, "filename": f"/tmp/{key}"}
+    return store[key]["filename"]
+
+
+@pytest.fixture()
+def sqlite_store(tmp_path: Path):
+    store = SqliteDocStateStore(path=tmp_path / "state.sqlite3")
+    yield store
+    store.close()
+
+
+@pytest.fixture()
+def manager_store():
+    store = ManagerDocStateStore()
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("store_fixture", ["sqlite_store", "manager_store"])
+def test_doc_state_store_round_trip(request, store_fixture: str):
+    store = request.getfixturevalue(store_fixture)
+    store.update({f"doc-{i}": {"unique_id": f"doc-{i}", "index": i} for i in range(3)})
+    store["doc-1"] = {"unique_id": "doc-1", "index": 10}
+
+    assert "doc-0" in store
+    assert "doc-3" not in store
+    assert store["doc-1"] == {"unique_id": "doc-1", "index": 10}
+    assert [d["index"] for d in store.get_many(["doc-2", "doc-0", "doc-1"])] == [2, 0, 10]
+    with pytest.raises(KeyError, match="doc-3"):
+        store.get_many(["doc-0", "doc-3"])
+
+
+def test_sqlite_doc_state_store_batches_large_reads(sqlite_store: SqliteDocStateStore):
+    keys = [f"doc-{i}" for i in range(1234)]
+    sqlite_store.update({key: {"unique_id": key} for key in keys})
+    assert [d["unique_id"] for d in sqlite_store.get_many(keys)] == keys
+
+
+def test_sqlite_doc_state_store_persists(tmp_path: Path):
+    path = tmp_path / "state.sqlite3"
+    store = SqliteDocStateStore(path=path)
+    store["doc"] = {"unique_id": "doc"}
+    store.close()
+    assert SqliteDocStateStore(path=path)["doc"] == {"unique_id": "doc"}
+
+
+def test_sqlite_doc_state_store_delete(tmp_path: Path):
+    store = SqliteDocStateStore(path=tmp_path / "state.sqlite3")
+    store["doc"] = {"unique_id": "doc"}
+    store.delete()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sqlite_doc_state_store_splits_out_connector_config(tmp_path: Path):
+    connector_config = {"access_token": "secret", "nested": {"password": "secret"}}
+    store = SqliteDocStateStore(path=tmp_path / "state.sqlite3", connector_config=connector_config)
+    doc = {"unique_id": "doc", "connector_config": connector_config}
+    batch = {"unique_id": "batch", "connector_config": connector_config, "ingest_docs": [doc]}
+    store.update({"doc": doc, "batch": batch})
+    store.close()
+
+    assert all(b"secret" not in path.read_bytes() for path in tmp_path.iterdir())
+    assert store["doc"] == doc
+    assert store["batch"] == batch
+
+
+def test_sqlite_doc_state_store_shared_across_processes(sqlite_store: SqliteDocStateStore):
+    unpickled = pickle.loads(pickle.dumps(sqlite_store))
+    assert unpickled._connections == {}
+    with mp.get_context("spawn").Pool(processes=2) as pool:
+        filenames = pool.starmap(add_doc, [(sqlite_store, f"doc-{i}") for i in range(4)])
+    assert filenames == [f"/tmp/doc-{i}" for i in range(4)]
+    assert all(f"doc-{i}" in sqlite_store for i in range(4))
+
+
+def test_sqlite_doc_state_store_shared_across_threads(sqlite_store: SqliteDocStateStore):
+    with ThreadPool(processes=4) as pool:
+        filenames = pool.starmap(add_doc, [(sqlite_store, f"doc-{i}") for i in range(8)])
+    assert filenames == [f"/tmp/doc-{i}" for i in range(8)]
+    assert all(f"doc-{i}" in sqlite_store for i in range(8))
+
+
+def test_get_doc_state_store(tmp_path: Path):
+    store = get_doc_state_store(backend="sqlite", work_dir=str(tmp_path))
+    other_store = get_doc_state_store(backend="sqlite", work_dir=str(tmp_path))
+    assert isinstance(store, SqliteDocStateStore)
+    assert Path(store.path).parent == tmp_path / "doc_state"
+    assert store.path != other_store.path
+    with pytest.raises(ValueError, match="not recognized"):
+        get_doc_state_store(backend="redis", work_dir=str(tmp_path))
@@ -0,0 +1,129 @@
+from pathlib import Path
+
+import pytest
+from fsspec.implementations.memory import MemoryFileSystem
+
+from unstructured.ingest.connector.fsspec.fsspec import (
+    FsspecSessionHandle,
+    get_info_value,
+)
+from unstructured.ingest.connector.fsspec.s3 import (
+    S3IngestDoc,
+    S3SourceConnector,
+    SimpleS3Config,
+)
+from unstructured.ingest.connector.registry import create_ingest_doc_from_dict
+from unstructured.ingest.interfaces import ProcessorConfig, ReadConfig
+
+
+class BucketFileSystem(MemoryFileSystem):
+    """In memory filesystem that lists paths without a leading slash, like object stores."""
+
+    def ls(self, path, detail=True, **kwargs):
+        files = [
+            dict(info, name=info["name"].lstrip("/"))
+            for info in super().ls(path, detail=True, **kwargs)
+        ]
+        return files if detail else [info["name"] for info in files]
+
+
+@pytest.fixture()
+def fs():
+    fs = BucketFileSystem(skip_instance_cache=True)
+    fs.pipe("bucket/docs/a.txt", b"first document")
+    fs.pipe("bucket/docs/nested/b.txt", b"second document")
+    fs.pipe("bucket/docs/nested/deeper/c.txt", b"third document")
+    yield fs
+    fs.rm("bucket", recursive=True)
+
+
+@pytest.fixture()
+def source_connector(tmp_path: Path, fs: MemoryFileSystem):
+    connector = S3SourceConnector(
+        processor_config=ProcessorConfig(output_dir=str(tmp_path / "output")),
+        read_config=ReadConfig(download_dir=str(tmp_path / "download")),
+        connector_config=SimpleS3Config(remote_url="s3://bucket/docs", recursive=True),
+    )
+    connector.fs = fs
+    return connector
+
+
+def test_get_info_value():
+    from datetime import datetime
+
+    info = {"etag": "abc", "mtime": datetime(2023, 1, 2, 3, 4, 5), "size": 0}
+    assert get_info_value(info, ["ETag", "etag"]) == "abc"
+    assert get_info_value(info, ["LastModified", "mtime"]) == "2023-01-02T03:04:05"
+    assert get_info_value(info, ["created"]) is None
+
+
+def test_source_metadata_populated_from_listing(mocker, source_connector, fs):
+    info = mocker.spy(fs, "info")
+    docs = source_connector.get_ingest_docs()
+
+    assert sorted(doc.remote_file_path for doc in docs) == [
+        "bucket/docs/a.txt",
+        "bucket/docs/nested/b.txt",
+        "bucket/docs/nested/deeper/c.txt",
+    ]
+    for doc in docs:
+        assert doc._source_metadata is not None
+        assert doc.exists
+        assert doc.version
+        assert doc.source_url == f"s3://{doc.remote_file_path}"
+    info.assert_not_called()
+
+
+def test_list_files_is_lazy(mocker, source_connector, fs):
+    find = mocker.spy(fs, "find")
+    ls = mocker.spy(fs, "ls")
+
+    docs = source_connector.iter_ingest_docs()
+    assert ls.call_count == 0
+    assert next(docs).remote_file_path == "bucket/docs/a.txt"
+    # Only the top level directory was listed so far
+    assert ls.call_count == 1
+    assert len(list(docs)) == 2
+    find.assert_not_called()
+
+
+def test_list_files_non_recursive(source_connector):
+    source_connector.connector_config.recursive = False
+    docs = source_connector.get_ingest_docs()
+    assert [doc.remote_file_path for doc in docs] == ["bucket/docs/a.txt"]
+
+
+def test_get_file_downloads_once(mocker, source_connector, fs):
+    doc = next(
+        d for d in source_connector.get_ingest_docs() if d.remote_file_path.endswith("a.txt")
+    )
+    doc = create_ingest_doc_from_dict(doc.to_dict())
+    get = mocker.spy(fs, "get")
+    update_source_metadata = mocker.spy(S3IngestDoc, "update_source_metadata")
+    doc.session_handle = FsspecSessionHandle(fs=fs)
+
+    doc.get_file()
+
+    assert Path(doc.filename).read_text() == "first document"
+    get.assert_called_once()
+    update_source_metadata.assert_not_called()
+    assert doc.exists
+
+
+def test_update_source_metadata_for_missing_file(tmp_path: Path, fs):
+    doc = S3IngestDoc(
+        processor_config=ProcessorConfig(),
+        read_config=ReadConfig(download_dir=str(tmp_path)),
+        connector_config=SimpleS3Config(remote_url="s3://bucket/docs"),
+        remote_file_path="bucket/docs/missing.txt",
+    )
+    doc.session_handle = FsspecSessionHandle(fs=fs)
+    doc.update_source_metadata()
+    assert doc.exists is False
+
+
+def test_session_handle_not_serialized(source_connector, fs):
+    doc = source_connector.get_ingest_docs()[0]
+    doc.session_handle = FsspecSessionHandle(fs=fs)
+    assert "_session_handle" not in doc.to_dict()
+    assert create_ingest_doc_from_dict(doc.to_dict())._session_handle is None
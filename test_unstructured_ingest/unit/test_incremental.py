@@ -0,0 +1,208 @@
+import os
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from unstructured.ingest.connector.local import LocalSourceConnector, SimpleLocalConfig
+from unstructured.ingest.interfaces import PartitionConfig, ProcessorConfig, ReadConfig
+from unstructured.ingest.pipeline import Partitioner, PipelineContext, Reader
+from unstructured.ingest.pipeline.incremental import SourceVersionFilter
+from unstructured.ingest.pipeline.manifest import (
+    ManifestEntry,
+    SourceVersionManifest,
+    get_source_version,
+)
+from unstructured.ingest.processor import process_documents
+
+
+@pytest.fixture()
+def manifest(tmp_path: Path):
+    manifest = SourceVersionManifest(path=tmp_path / "manifest.sqlite3")
+    yield manifest
+    manifest.close()
+
+
+def test_manifest_round_trip(manifest: SourceVersionManifest):
+    manifest.update([ManifestEntry(unique_id=f"doc-{i}", version=str(i)) for i in range(1000)])
+    manifest.update([ManifestEntry(unique_id="doc-0", version="new", output_hash="abc")])
+    manifest.remove(["doc-1"])
+
+    entries = manifest.get_many([f"doc-{i}" for i in range(1000)] + ["missing"])
+
+    assert len(entries) == 999
+    assert entries["doc-0"] == ManifestEntry(unique_id="doc-0", version="new", output_hash="abc")
+    assert manifest.get("doc-1") is None
+    assert manifest.get("doc-999") == ManifestEntry(unique_id="doc-999", version="999")
+
+
+def test_manifest_iter_missing(manifest: SourceVersionManifest):
+    doc = {"unique_id": "doc-1", "connector_config": {"token": "secret"}}
+    manifest.update(
+        [
+            ManifestEntry(unique_id="doc-0", version="0"),
+            ManifestEntry(unique_id="doc-1", version="1", doc=doc),
+            ManifestEntry(unique_id="doc-2", version="2"),
+        ],
+    )
+
+    missing = {entry.unique_id: entry for entry in manifest.iter_missing({"doc-2"})}
+
+    assert set(missing) == {"doc-0", "doc-1"}
+    assert missing["doc-0"].doc is None
+    assert missing["doc-1"].doc == {"unique_id": "doc-1", "connector_config": None}
+
+
+def test_get_source_version_falls_back_to_date_modified():
+    assert get_source_version({"version": "v1", "date_modified": "2023-01-01"}) == "v1"
+    assert get_source_version({"version": None, "date_modified": "2023-01-01"}) == "2023-01-01"
+    assert get_source_version({"unique_id": "doc"}) is None
+
+
+@pytest.mark.parametrize(
+    ("exists", "recorded", "incremental_delete", "kept"),
+    [
+        (True, None, False, True),
+        (True, "v1", False, False),
+        (True, "v0", False, True),
+        (False, "v1", False, False),
+        (False, "v1", True, True),
+        (False, None, True, False),
+    ],
+)
+def test_source_version_filter(
+    mocker,
+    tmp_path: Path,
+    manifest: SourceVersionManifest,
+    exists: bool,
+    recorded: t.Optional[str],
+    incremental_delete: bool,
+    kept: bool,
+):
+    from unstructured.ingest.connector.local import LocalIngestDoc
+    from unstructured.ingest.interfaces import SourceMetadata
+
+    doc = LocalIngestDoc(
+        processor_config=ProcessorConfig(output_dir=str(tmp_path / "output")),
+        read_config=ReadConfig(),
+        connector_config=SimpleLocalConfig(input_path=str(tmp_path)),
+        path=str(tmp_path / "doc.txt"),
+    )
+    mocker.patch.object(
+        LocalIngestDoc,
+        "update_source_metadata",
+        autospec=True,
+        side_effect=lambda self: setattr(
+            self,
+            "_source_metadata",
+            SourceMetadata(version="v1", exists=exists),
+        ),
+    )
+    if recorded:
+        manifest.update([ManifestEntry(unique_id=str(doc.unique_id), version=recorded)])
+    pipeline_context = PipelineContext(incremental=True, incremental_delete=incremental_delete)
+    pipeline_context.source_manifest = manifest
+
+    result = SourceVersionFilter(pipeline_context=pipeline_context).run(doc.to_dict())
+
+    if kept:
+        assert result is not None
+        assert result["version"] == "v1"
+        assert result["exists"] is exists
+    else:
+        assert result is None
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_process_documents_incrementally(mocker, tmp_path: Path, streaming: bool):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(3):
+        (input_dir / f"doc-{i}.txt").write_text(f"This is the content of document number {i}.")
+    output_dir = tmp_path / "output"
+    processor_config = ProcessorConfig(
+        output_dir=str(output_dir),
+        work_dir=str(tmp_path / "work"),
+        num_processes=1,
+        incremental=True,
+        streaming=streaming,
+    )
+    # Streaming runs partition in worker processes, so count the fetches instead, which are
+    # done by threads of this process when a fetch concurrency is set
+    read_config = ReadConfig(fetch_concurrency=2 if streaming else None)
+    source_connector = LocalSourceConnector(
+        processor_config=processor_config,
+        read_config=read_config,
+        connector_config=SimpleLocalConfig(input_path=str(input_dir)),
+    )
+    processed = mocker.spy(Reader if streaming else Partitioner, "run")
+
+    def run():
+        process_documents(
+            processor_config=processor_config,
+            source_doc_connector=source_connector,
+            partition_config=PartitionConfig(strategy="fast"),
+        )
+
+    run()
+    assert processed.call_count == 3
+
+    # Nothing changed, so nothing is partitioned again
+    run()
+    assert processed.call_count == 3
+
+    changed = input_dir / "doc-1.txt"
+    changed.write_text("This document was edited.")
+    stat = changed.stat()
+    os.utime(changed, (stat.st_atime, stat.st_mtime + 10))
+    run()
+    assert processed.call_count == 4
+    assert processed.call_args.args[1]["unique_id"] == str(changed)
+    assert "This document was edited." in (output_dir / "doc-1.txt.json").read_text()
+
+    # Docs the source no longer lists are deleted, but only when requested
+    (input_dir / "doc-0.txt").unlink()
+    run()
+    assert (output_dir / "doc-0.txt.json").exists()
+    processor_config.incremental_delete = True
+    run()
+    assert not (output_dir / "doc-0.txt.json").exists()
+    assert (output_dir / "doc-2.txt.json").exists()
+    assert processed.call_count == 4
+
+
+def test_incremental_delete_requires_destination_deletes(mocker):
+    from unstructured.ingest.interfaces import BaseDestinationConnector
+    from unstructured.ingest.pipeline import Writer
+    from unstructured.ingest.pipeline.pipeline import Pipeline
+
+    class NoDeleteDestinationConnector(BaseDestinationConnector):
+        def initialize(self):
+            pass
+
+        def check_connection(self):
+            pass
+
+        def write(self, docs):
+            pass
+
+        def write_dict(self, *args, elements_dict, **kwargs):
+            pass
+
+    pipeline_context = PipelineContext(incremental=True, incremental_delete=True)
+    pipeline = Pipeline(
+        pipeline_context=pipeline_context,
+        doc_factory_node=mocker.Mock(),
+        source_node=mocker.Mock(),
+        write_node=Writer(
+            pipeline_context=pipeline_context,
+            dest_doc_connector=NoDeleteDestinationConnector(
+                write_config=mocker.Mock(),
+                connector_config=mocker.Mock(),
+            ),
+        ),
+    )
+
+    with pytest.raises(ValueError, match="does not support deleting"):
+        pipeline.run()
+    pipeline.doc_factory_node.initialize.assert_not_called()
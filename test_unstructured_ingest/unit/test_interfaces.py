@@ -156,6 +156,40 @@ def test_partition_file():
         assert data_source_metadata["date_processed"] == TEST_DATE_PROCESSSED
 
 
+def test_partition_file_by_api_reuses_client(mocker, partition_test_results):
+    partition = mocker.patch(
+        "unstructured.partition.api.PartitionApiClient.partition",
+        return_value=partition_test_results,
+    )
+    test_ingest_doc = ExampleIngestDoc(
+        connector_config=TEST_CONFIG,
+        read_config=ReadConfig(download_dir=TEST_DOWNLOAD_DIR),
+        processor_config=ProcessorConfig(output_dir=TEST_OUTPUT_DIR),
+    )
+    partition_config = PartitionConfig(
+        partition_by_api=True,
+        partition_endpoint="http://localhost:8000/general/v0/general",
+        api_split_pdf_page_range=10,
+    )
+
+    for _ in range(2):
+        elements = test_ingest_doc.partition_file(
+            partition_config=partition_config,
+            strategy="fast",
+        )
+
+    assert elements == partition_test_results
+    assert partition.call_count == 2
+    partition.assert_called_with(
+        filename=TEST_FILE_PATH,
+        split_pdf_page_range=10,
+        strategy="fast",
+    )
+    client = partition_config.get_api_client()
+    assert client.api_url == "http://localhost:8000/general/v0/general"
+    assert PartitionConfig(**partition_config.to_dict()).get_api_client() is client
+
+
 def test_process_file_fields_include_default(mocker, partition_test_results):
     """Validate when metadata_include and metadata_exclude are not set, all fields:
     ("element_id", "text", "type", "metadata") are included"""
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+
+from unstructured.ingest.connector.local import LocalSourceConnector, SimpleLocalConfig
+from unstructured.ingest.interfaces import PartitionConfig, ProcessorConfig, ReadConfig
+from unstructured.ingest.pipeline import intermediate
+from unstructured.ingest.pipeline.intermediate import (
+    PACKED_EMBEDDINGS_KEY,
+    read_elements_dicts,
+    render_elements_json,
+    write_elements_dicts,
+)
+from unstructured.ingest.pipeline.utils import get_file_content_hash
+from unstructured.ingest.processor import process_documents
+
+elements_dicts = [
+    {
+        "element_id": "abc",
+        "embeddings": [0.1, -2.5, 1e-10],
+        "metadata": {"filename": "doc.txt", "page_number": 1},
+        "text": "Zürich",
+        "type": "NarrativeText",
+    },
+    {"element_id": "def", "metadata": {}, "text": "no embeddings", "type": "Title"},
+]
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+@pytest.mark.parametrize("suffix", [".json", ".jsonl", ".jsonl.gz"])
+def test_elements_dicts_round_trip(mocker, tmp_path: Path, suffix: str, orjson_available: bool):
+    mocker.patch.object(intermediate, "ORJSON_AVAILABLE", orjson_available)
+    path = tmp_path / f"elements{suffix}"
+
+    write_elements_dicts(path, elements_dicts)
+
+    assert read_elements_dicts(path) == elements_dicts
+    if suffix != ".json":
+        with intermediate.open_intermediate(path, "rb") as input_f:
+            assert PACKED_EMBEDDINGS_KEY.encode() in input_f.read()
+        # The rendered json is exactly what would have been written as the intermediate file
+        json_path = tmp_path / "elements.json"
+        write_elements_dicts(json_path, elements_dicts)
+        render_elements_json(path, tmp_path / "rendered.json")
+        assert (tmp_path / "rendered.json").read_text() == json_path.read_text()
+
+
+def test_compressed_content_is_deterministic(tmp_path: Path):
+    paths = [tmp_path / run / "elements.jsonl.gz" for run in ["first", "second"]]
+    for path in paths:
+        path.parent.mkdir()
+        write_elements_dicts(path, elements_dicts)
+    assert get_file_content_hash(paths[0]) == get_file_content_hash(paths[1])
+
+
+def test_process_documents_with_compact_intermediate_format(tmp_path: Path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(2):
+        (input_dir / f"doc-{i}.txt").write_text(f"This is the content of document number {i}.")
+
+    def run(intermediate_format: str) -> Path:
+        output_dir = tmp_path / intermediate_format / "output"
+        processor_config = ProcessorConfig(
+            output_dir=str(output_dir),
+            work_dir=str(tmp_path / intermediate_format / "work"),
+            num_processes=1,
+            intermediate_format=intermediate_format,
+        )
+        process_documents(
+            processor_config=processor_config,
+            source_doc_connector=LocalSourceConnector(
+                processor_config=processor_config,
+                read_config=ReadConfig(),
+                connector_config=SimpleLocalConfig(input_path=str(input_dir)),
+            ),
+            partition_config=PartitionConfig(strategy="fast"),
+        )
+        return output_dir
+
+    json_output_dir = run("json")
+    jsonl_output_dir = run("jsonl.gz")
+
+    assert list((tmp_path / "jsonl.gz" / "work" / "partitioned").glob("*.jsonl.gz"))
+    for i in range(2):
+        json_output = (json_output_dir / f"doc-{i}.txt.json").read_text().splitlines()
+        jsonl_output = (jsonl_output_dir / f"doc-{i}.txt.json").read_text().splitlines()
+        # Only the time the docs were processed may differ
+        assert [line for line in json_output if "date_processed" not in line] == [
+            line for line in jsonl_output if "date_processed" not in line
+        ]
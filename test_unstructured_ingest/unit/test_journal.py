@@ -0,0 +1,155 @@
+from pathlib import Path
+
+import pytest
+
+from unstructured.ingest.connector.local import LocalSourceConnector, SimpleLocalConfig
+from unstructured.ingest.interfaces import PartitionConfig, ProcessorConfig, ReadConfig
+from unstructured.ingest.pipeline import Pipeline, Reader
+from unstructured.ingest.pipeline.journal import CheckpointJournal, JournalEntry
+from unstructured.ingest.processor import process_documents
+
+
+@pytest.fixture()
+def journal(tmp_path: Path):
+    journal = CheckpointJournal(path=tmp_path / "journal.sqlite3")
+    yield journal
+    journal.close()
+
+
+def test_journal_returns_latest_entries(journal: CheckpointJournal):
+    journal.record("listed", [JournalEntry(doc_hash=f"doc-{i}", doc={"i": i}) for i in range(3)])
+    journal.record("partitioned", [JournalEntry(doc_hash="doc-0", path="first.json")])
+    journal.record("partitioned", [JournalEntry(doc_hash="doc-0", path="second.json")])
+    # Listed again by a resumed run that didn't complete listing
+    journal.record("listed", [JournalEntry(doc_hash="doc-1", doc={"i": 1})])
+
+    assert not journal.is_listing_complete()
+    journal.record_listing_complete()
+    assert journal.is_listing_complete()
+    assert [doc["i"] for doc in journal.iter_listed_docs()] == [0, 1, 2]
+    entries = journal.get_many("partitioned", ["doc-0", "doc-1"])
+    assert list(entries) == ["doc-0"]
+    assert entries["doc-0"].path == "second.json"
+    assert journal.count_docs()["listed"] == 3
+    assert journal.count_docs()["written"] == 0
+
+    journal.clear()
+    assert list(journal.iter_listed_docs()) == []
+
+
+def test_journal_splits_out_connector_config(tmp_path: Path):
+    connector_config = {"access_config": {"token": "secret"}}
+    journal = CheckpointJournal(
+        path=tmp_path / "journal.sqlite3",
+        connector_config=connector_config,
+    )
+    doc = {"unique_id": "doc-0", "connector_config": connector_config}
+    journal.record("listed", [JournalEntry(doc_hash="doc-0", doc=doc)])
+    journal.record("fetched", [JournalEntry(doc_hash="doc-0", doc=doc, path="doc-0.txt")])
+
+    assert list(journal.iter_listed_docs()) == [doc]
+    assert journal.get_many("fetched", ["doc-0"])["doc-0"].doc == doc
+    journal.close()
+    assert not any(b"secret" in path.read_bytes() for path in tmp_path.iterdir())
+
+    journal.delete()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_journal_locks_out_other_runs(tmp_path: Path):
+    journal = CheckpointJournal(path=tmp_path / "journal.sqlite3")
+    journal.lock()
+    other = CheckpointJournal(path=tmp_path / "journal.sqlite3")
+    with pytest.raises(RuntimeError, match="in use by another run"):
+        other.lock()
+
+    journal.close()
+    other.lock()
+    other.delete()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_journal_rejects_unknown_stage(journal: CheckpointJournal):
+    with pytest.raises(ValueError):
+        journal.record("uploaded", [JournalEntry(doc_hash="doc-0")])
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_process_documents_resumes_from_journal(mocker, tmp_path: Path, streaming: bool):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(3):
+        (input_dir / f"doc-{i}.txt").write_text(f"This is the content of document number {i}.")
+    output_dir = tmp_path / "output"
+
+    def run(resume: bool):
+        processor_config = ProcessorConfig(
+            output_dir=str(output_dir),
+            work_dir=str(tmp_path / "work"),
+            num_processes=1,
+            streaming=streaming,
+            resume=resume,
+        )
+        # Streaming runs partition in worker processes, so only count what happens in this
+        # process: listing, and fetching by threads of this process
+        read_config = ReadConfig(fetch_concurrency=2 if streaming else None)
+        process_documents(
+            processor_config=processor_config,
+            source_doc_connector=LocalSourceConnector(
+                processor_config=processor_config,
+                read_config=read_config,
+                connector_config=SimpleLocalConfig(input_path=str(input_dir)),
+            ),
+            partition_config=PartitionConfig(strategy="fast"),
+        )
+
+    # Crash once every doc was processed, but before any of them were written
+    write_batch = mocker.patch.object(Pipeline, "write_batch", side_effect=RuntimeError)
+    with pytest.raises(RuntimeError):
+        run(resume=False)
+    mocker.stop(write_batch)
+
+    # Another run of the same command fails rather than clearing the journal in use
+    (journal_path,) = (tmp_path / "work" / "journals").glob("*.sqlite3")
+    journal = CheckpointJournal(path=journal_path)
+    journal.lock()
+    with pytest.raises(RuntimeError, match="in use by another run"):
+        run(resume=False)
+    assert journal.count_docs()["fetched"] == 3
+    journal.close()
+
+    list_files = mocker.spy(LocalSourceConnector, "_list_files")
+    reader_run = mocker.spy(Reader, "run")
+    run(resume=True)
+
+    # Listing completed and every doc was fetched, so neither is done again
+    list_files.assert_not_called()
+    reader_run.assert_not_called()
+    output_paths = sorted(output_dir.iterdir())
+    assert [p.name for p in output_paths] == [f"doc-{i}.txt.json" for i in range(3)]
+    # The run completed, so there is nothing left to resume
+    assert list((tmp_path / "work" / "journals").iterdir()) == []
+
+    # Crash once every doc was written
+    original_write_batch = Pipeline.write_batch
+
+    def write_batch_and_crash(self, json_paths):
+        original_write_batch(self, json_paths=json_paths)
+        raise RuntimeError
+
+    write_batch = mocker.patch.object(
+        Pipeline,
+        "write_batch",
+        autospec=True,
+        side_effect=write_batch_and_crash,
+    )
+    with pytest.raises(RuntimeError):
+        run(resume=False)
+    mocker.stop(write_batch)
+    assert reader_run.call_count == 3
+
+    # Every doc was written by now, so none of them are fetched or copied to the output again
+    modified = [p.stat().st_mtime_ns for p in output_paths]
+    run(resume=True)
+    assert [p.stat().st_mtime_ns for p in output_paths] == modified
+    assert reader_run.call_count == 3
@@ -0,0 +1,112 @@
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from unstructured.ingest.connector.local import LocalSourceConnector, SimpleLocalConfig
+from unstructured.ingest.interfaces import PartitionConfig, ProcessorConfig, ReadConfig
+from unstructured.ingest.pipeline.metrics import (
+    DocMetric,
+    MetricsStore,
+    format_summary_table,
+    measure_docs,
+    note_doc_metric,
+    write_metrics_report,
+    write_prometheus_textfile,
+)
+from unstructured.ingest.processor import process_documents
+
+
+@pytest.fixture()
+def store(tmp_path: Path):
+    store = MetricsStore(path=tmp_path / "metrics.sqlite3")
+    yield store
+    store.close()
+
+
+def test_measure_docs_records_metrics(store: MetricsStore):
+    with measure_docs(store, metrics=[DocMetric(node="Chunker", doc_hash="doc-0")], queued_at=0):
+        note_doc_metric(elements=3, cache_hit=True)
+    metrics = [DocMetric(node="Embedder", doc_hash=f"doc-{i}") for i in range(2)]
+    with pytest.raises(RuntimeError):
+        with measure_docs(store, metrics=metrics):
+            note_doc_metric(index=1, elements=5)
+            raise RuntimeError
+    # Outside of a measured run, noting does nothing
+    note_doc_metric(elements=7)
+
+    chunked, *embedded = store.iter_metrics()
+    assert chunked.elements == 3
+    assert chunked.cache_hit
+    assert chunked.queue_wait_seconds > 0
+    assert [metric.failed for metric in embedded] == [True, True]
+    assert [metric.queue_wait_seconds for metric in embedded] == [None, None]
+    summary = store.summarize()
+    assert [row["node"] for row in summary] == ["Chunker", "Embedder"]
+    assert summary[1]["docs"] == 2
+    assert summary[1]["failed"] == 2
+    assert summary[1]["elements"] == 5
+    assert "Embedder" in format_summary_table(summary)
+
+
+def test_write_metrics_reports(store: MetricsStore, tmp_path: Path):
+    store.record([DocMetric(node="Partitioner", doc_hash="doc-0", elements=2, bytes_in=10)])
+
+    write_metrics_report(store.iter_metrics(), path=tmp_path / "metrics.jsonl")
+    write_metrics_report(store.iter_metrics(), path=tmp_path / "metrics.csv")
+    write_prometheus_textfile(store.summarize(), path=tmp_path / "metrics.prom")
+
+    (row,) = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert row["node"] == "Partitioner"
+    assert row["elements"] == 2
+    with open(tmp_path / "metrics.csv") as f:
+        (csv_row,) = list(csv.DictReader(f))
+    assert csv_row["bytes_in"] == "10"
+    prometheus_lines = (tmp_path / "metrics.prom").read_text().splitlines()
+    assert 'unstructured_ingest_docs_total{node="Partitioner"} 1' in prometheus_lines
+    assert "# TYPE unstructured_ingest_elements_total counter" in prometheus_lines
+
+
+def test_process_documents_reports_metrics(tmp_path: Path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(2):
+        (input_dir / f"doc-{i}.txt").write_text(f"This is the content of document number {i}.")
+    metrics_path = tmp_path / "metrics.jsonl"
+
+    def run():
+        processor_config = ProcessorConfig(
+            output_dir=str(tmp_path / "output"),
+            work_dir=str(tmp_path / "work"),
+            num_processes=1,
+            metrics_output=str(metrics_path),
+            metrics_prometheus_file=str(tmp_path / "metrics.prom"),
+        )
+        process_documents(
+            processor_config=processor_config,
+            source_doc_connector=LocalSourceConnector(
+                processor_config=processor_config,
+                read_config=ReadConfig(),
+                connector_config=SimpleLocalConfig(input_path=str(input_dir)),
+            ),
+            partition_config=PartitionConfig(strategy="fast"),
+        )
+        return [json.loads(line) for line in metrics_path.read_text().splitlines()]
+
+    metrics = run()
+    partitioned = [metric for metric in metrics if metric["node"] == "Partitioner"]
+    assert sorted(metric["doc_id"] for metric in partitioned) == sorted(
+        str(input_dir / f"doc-{i}.txt") for i in range(2)
+    )
+    assert all(metric["elements"] and metric["bytes_in"] for metric in partitioned)
+    assert all(not metric["cache_hit"] for metric in partitioned)
+    assert {metric["node"] for metric in metrics} == {"Reader", "Partitioner", "Copier"}
+    assert (tmp_path / "metrics.prom").is_file()
+    # The metrics of a run are only kept until they're reported
+    assert list((tmp_path / "work" / "metrics").iterdir()) == []
+
+    # The partitioned content is picked up by the next run
+    metrics = run()
+    partitioned = [metric for metric in metrics if metric["node"] == "Partitioner"]
+    assert all(metric["cache_hit"] for metric in partitioned)
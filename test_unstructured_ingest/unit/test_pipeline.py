@@ -0,0 +1,514 @@
+import json
+import multiprocessing as mp
+import os
+import pickle
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+
+import pytest
+
+from unstructured.documents.elements import ElementMetadata, NarrativeText
+from unstructured.ingest.connector.delta_table import (
+    DeltaTableDestinationConnector,
+    DeltaTableWriteConfig,
+    SimpleDeltaTableConfig,
+)
+from unstructured.ingest.connector.local import (
+    LocalIngestDoc,
+    LocalSourceConnector,
+    SimpleLocalConfig,
+)
+from unstructured.ingest.interfaces import (
+    BaseSingleIngestDoc,
+    EmbeddingConfig,
+    IngestDocSessionHandleMixin,
+    PartitionConfig,
+    ProcessorConfig,
+    ReadConfig,
+)
+from unstructured.ingest.pipeline import (
+    DocFactory,
+    Embedder,
+    Partitioner,
+    Pipeline,
+    PipelineContext,
+    Reader,
+    source,
+)
+from unstructured.ingest.pipeline import utils as pipeline_utils
+from unstructured.ingest.pipeline.doc_state import SqliteDocStateStore
+from unstructured.ingest.pipeline.interfaces import PipelineNode, init_worker
+from unstructured.ingest.pipeline.reformat import embedding
+from unstructured.ingest.pipeline.utils import (
+    WorkerLostError,
+    bounded_imap_unordered,
+    get_ingest_doc_hash,
+)
+from unstructured.ingest.pipeline.write import Writer
+from unstructured.ingest.processor import process_documents
+
+
+@dataclass
+class DoublingNode(PipelineNode):
+    warmed_up: bool = False
+
+    def warm_up(self):
+        self.warmed_up = True
+
+    def run(self, value: int) -> t.Optional[int]:
+        return value * 2
+
+
+def test_bounded_imap_unordered_limits_in_flight():
+    lock = threading.Lock()
+    in_flight = 0
+    max_seen = 0
+
+    def square(x: int) -> int:
+        nonlocal in_flight, max_seen
+        with lock:
+            in_flight += 1
+            max_seen = max(max_seen, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return x * x
+
+    with ThreadPool(processes=8) as pool:
+        results = dict(bounded_imap_unordered(pool, square, range(20), max_in_flight=3))
+
+    assert results == {i: i * i for i in range(20)}
+    assert max_seen <= 3
+
+
+def test_bounded_imap_unordered_only_consumes_iterable_when_capacity_frees():
+    consumed = []
+
+    def produce():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    with ThreadPool(processes=2) as pool:
+        results = bounded_imap_unordered(pool, lambda x: x, produce(), max_in_flight=2)
+        next(results)
+        assert len(consumed) <= 3
+
+
+def test_bounded_imap_unordered_raises_errors():
+    def fail(x: int):
+        raise ValueError(f"failed on {x}")
+
+    with ThreadPool(processes=2) as pool, pytest.raises(ValueError, match="failed on"):
+        list(bounded_imap_unordered(pool, fail, range(3), max_in_flight=2))
+
+
+def exit_on_odd(x: int) -> int:
+    if x % 2:
+        time.sleep(0.1)
+        os._exit(1)
+    return x
+
+
+def test_bounded_imap_unordered_fails_pending_tasks_of_dead_worker(monkeypatch):
+    monkeypatch.setattr(pipeline_utils, "WORKER_POLL_INTERVAL", 0.1)
+    lost = []
+
+    def on_lost(x: int, error: Exception):
+        lost.append((x, type(error)))
+        return None
+
+    with mp.get_context("fork").Pool(processes=2) as pool:
+        results = dict(
+            bounded_imap_unordered(pool, exit_on_odd, range(4), max_in_flight=4, on_lost=on_lost),
+        )
+        assert [x for x, _ in lost] == [x for x, result in results.items() if result is None]
+        assert {1, 3} <= {x for x, _ in lost}
+        assert all(error is WorkerLostError for _, error in lost)
+
+        with pytest.raises(WorkerLostError, match="exit code 1"):
+            list(bounded_imap_unordered(pool, exit_on_odd, [1], max_in_flight=1))
+
+
+def test_write_batch_appends_after_first_batch(mocker, tmp_path: Path):
+    modes: t.List[str] = []
+    mocker.patch.object(
+        DeltaTableDestinationConnector,
+        "write",
+        autospec=True,
+        side_effect=lambda self, docs: modes.append(self.write_config.mode),
+    )
+    context = PipelineContext(work_dir=str(tmp_path / "work"))
+    context.ingest_docs_map = SqliteDocStateStore(path=tmp_path / "state.sqlite3")
+    json_paths = []
+    for i in range(3):
+        doc = LocalIngestDoc(
+            processor_config=context,
+            read_config=ReadConfig(),
+            connector_config=SimpleLocalConfig(input_path=str(tmp_path)),
+            path=str(tmp_path / f"doc-{i}.txt"),
+        ).to_dict()
+        doc_hash = get_ingest_doc_hash(doc)
+        context.ingest_docs_map[doc_hash] = doc
+        json_paths.append(str(tmp_path / f"{doc_hash}.json"))
+    dest_doc_connector = DeltaTableDestinationConnector(
+        write_config=DeltaTableWriteConfig(mode="overwrite"),
+        connector_config=SimpleDeltaTableConfig(table_uri=str(tmp_path / "table")),
+    )
+    pipeline = Pipeline(
+        pipeline_context=context,
+        doc_factory_node=mocker.Mock(),
+        source_node=mocker.Mock(),
+        write_node=Writer(pipeline_context=context, dest_doc_connector=dest_doc_connector),
+    )
+
+    for json_path in json_paths:
+        pipeline.write_batch(json_paths=[json_path])
+
+    assert modes == ["overwrite", "append", "append"]
+    assert dest_doc_connector.write_config.mode == "overwrite"
+
+
+def test_pipeline_context_pickles_without_worker_pool():
+    context = PipelineContext(num_processes=2)
+    with ThreadPool(processes=1) as pool:
+        context.worker_pool = pool
+        unpickled = pickle.loads(pickle.dumps(context))
+    assert context.worker_pool is pool
+    assert unpickled.worker_pool is None
+    assert unpickled.num_processes == 2
+
+
+def test_node_uses_shared_worker_pool(mocker):
+    context = PipelineContext(num_processes=2)
+    node = DoublingNode(pipeline_context=context)
+    with ThreadPool(processes=2) as pool:
+        apply_async_spy = mocker.spy(pool, "apply_async")
+        context.worker_pool = pool
+        assert node(iterable=[1, 2, 3]) == [2, 4, 6]
+    assert apply_async_spy.call_count == 3
+
+
+def test_source_node_prefers_fetch_pool(mocker):
+    context = PipelineContext(num_processes=2)
+    reader = Reader(pipeline_context=context, read_config=ReadConfig())
+    with ThreadPool(processes=1) as worker_pool, ThreadPool(processes=4) as fetch_pool:
+        context.worker_pool = worker_pool
+        assert reader.get_pool() is worker_pool
+        context.fetch_pool = fetch_pool
+        assert reader.get_pool() is fetch_pool
+        unpickled = pickle.loads(pickle.dumps(context))
+    assert unpickled.fetch_pool is None
+
+
+def test_source_node_keeps_a_session_handle_per_thread(mocker, tmp_path: Path):
+    class SessionDoc(IngestDocSessionHandleMixin, BaseSingleIngestDoc):
+        pass
+
+    def create_doc(ingest_doc_dict: dict):
+        doc = mocker.Mock(spec=SessionDoc)
+        doc.session_handle = object()
+        return doc
+
+    handles: t.Dict[str, t.Set[int]] = {}
+
+    def get_single(self, doc, ingest_doc_dict: dict) -> str:
+        handle = source.session_state.session_handle
+        handles.setdefault(threading.current_thread().name, set()).add(id(handle))
+        return ingest_doc_dict["unique_id"]
+
+    mocker.patch.object(source, "create_ingest_doc_from_dict", side_effect=create_doc)
+    mocker.patch.object(Reader, "get_single", autospec=True, side_effect=get_single)
+    context = PipelineContext(work_dir=str(tmp_path / "work"))
+    context.ingest_docs_map = SqliteDocStateStore(path=tmp_path / "state.sqlite3")
+    reader = Reader(pipeline_context=context, read_config=ReadConfig())
+
+    def fetch(thread_index: int):
+        for i in range(3):
+            reader.run({"unique_id": f"doc-{thread_index}-{i}"})
+
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(handles) == 2
+    assert all(len(thread_handles) == 1 for thread_handles in handles.values())
+    assert len(set.union(*handles.values())) == 2
+
+
+@pytest.mark.parametrize(
+    ("fetch_concurrency", "max_fetch_concurrency", "expected"),
+    [(None, None, None), (None, 3, None), (50, None, 50), (50, 3, 3), (2, 3, 2)],
+)
+def test_pipeline_fetch_concurrency_capped_by_connector(
+    mocker,
+    fetch_concurrency: t.Optional[int],
+    max_fetch_concurrency: t.Optional[int],
+    expected: t.Optional[int],
+):
+    mocker.patch.object(LocalSourceConnector, "max_fetch_concurrency", max_fetch_concurrency)
+    context = PipelineContext()
+    read_config = ReadConfig(fetch_concurrency=fetch_concurrency)
+    pipeline = Pipeline(
+        pipeline_context=context,
+        doc_factory_node=DocFactory(
+            pipeline_context=context,
+            source_doc_connector=LocalSourceConnector(
+                processor_config=context,
+                read_config=read_config,
+                connector_config=SimpleLocalConfig(input_path="."),
+            ),
+        ),
+        source_node=Reader(pipeline_context=context, read_config=read_config),
+    )
+    assert pipeline.get_fetch_concurrency() == expected
+
+
+def test_init_worker_warms_up_nodes():
+    nodes = [DoublingNode(pipeline_context=PipelineContext()) for _ in range(2)]
+    init_worker(log_level=20, nodes=nodes)
+    assert all(node.warmed_up for node in nodes)
+
+
+def test_embedder_is_loaded_once_per_process(mocker):
+    get_embedder = mocker.patch.object(EmbeddingConfig, "get_embedder")
+    mocker.patch.dict(embedding.embedders, clear=True)
+    embedder_config = EmbeddingConfig(provider="langchain-huggingface")
+    node = Embedder(pipeline_context=PipelineContext(), embedder_config=embedder_config)
+    node.warm_up()
+    assert node.get_embedder() is get_embedder.return_value
+    get_embedder.assert_called_once()
+
+
+def test_embedder_batches_elements_across_docs(mocker, tmp_path: Path):
+    batches: t.List[t.List[str]] = []
+
+    def embed_documents(elements):
+        batches.append([str(element) for element in elements])
+        for element in elements:
+            element.embeddings = [float(len(str(element)))]
+        return elements
+
+    embedder = mocker.Mock(embed_documents=mocker.Mock(side_effect=embed_documents))
+    mocker.patch.object(EmbeddingConfig, "get_embedder", return_value=embedder)
+    mocker.patch.dict(embedding.embedders, clear=True)
+    context = PipelineContext(work_dir=str(tmp_path / "work"), num_processes=1)
+    context.ingest_docs_map = SqliteDocStateStore(path=tmp_path / "state.sqlite3")
+    elements_jsons = []
+    for i in range(4):
+        doc_hash = f"doc{i}"
+        context.ingest_docs_map[doc_hash] = {"unique_id": doc_hash}
+        elements_json = tmp_path / f"{doc_hash}.json"
+        elements_json.write_text(
+            json.dumps(
+                [NarrativeText(text=f"document {i} element {j}").to_dict() for j in range(i + 1)],
+            ),
+        )
+        elements_jsons.append(str(elements_json))
+    node = Embedder(
+        pipeline_context=context,
+        embedder_config=EmbeddingConfig(provider="langchain-huggingface", max_batch_chars=60),
+    )
+
+    json_paths = node(iterable=elements_jsons)
+
+    # 10 elements of 20 characters each, embedded 3 at a time rather than per doc
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+    assert len(json_paths) == 4
+    for i, json_path in enumerate(json_paths):
+        elements = json.loads(Path(json_path).read_text())
+        assert [element["text"] for element in elements] == [
+            f"document {i} element {j}" for j in range(i + 1)
+        ]
+        assert all(element["embeddings"] == [20.0] for element in elements)
+
+
+def test_embedder_only_fails_docs_that_fail_on_their_own(mocker, tmp_path: Path):
+    def embed_documents(elements):
+        if any("document 2" in str(element) for element in elements):
+            raise ValueError("too long")
+        for element in elements:
+            element.embeddings = [1.0]
+        return elements
+
+    embedder = mocker.Mock(embed_documents=mocker.Mock(side_effect=embed_documents))
+    mocker.patch.object(EmbeddingConfig, "get_embedder", return_value=embedder)
+    mocker.patch.dict(embedding.embedders, clear=True)
+    context = PipelineContext(work_dir=str(tmp_path / "work"), num_processes=1)
+    context.ingest_docs_map = SqliteDocStateStore(path=tmp_path / "state.sqlite3")
+    elements_jsons = []
+    for i in range(4):
+        doc_hash = f"doc{i}"
+        context.ingest_docs_map[doc_hash] = {"unique_id": doc_hash}
+        elements_json = tmp_path / f"{doc_hash}.json"
+        elements_json.write_text(
+            json.dumps([NarrativeText(text=f"document {i}").to_dict()]),
+        )
+        elements_jsons.append(str(elements_json))
+    node = Embedder(
+        pipeline_context=context,
+        embedder_config=EmbeddingConfig(provider="langchain-huggingface"),
+    )
+    node.initialize()
+    record_failure = mocker.spy(node, "record_failure")
+
+    json_paths = node.run_batch(elements_jsons)
+
+    assert [json_path is not None for json_path in json_paths] == [True, True, False, True]
+    record_failure.assert_called_once()
+    assert record_failure.call_args.args[0] == elements_jsons[2]
+
+
+def test_partitioner_content_cache(mocker, tmp_path: Path):
+    def partition_file(doc, partition_config, **partition_kwargs):
+        return [
+            NarrativeText(
+                text=Path(doc.filename).read_text(),
+                metadata=ElementMetadata(
+                    filename=str(doc.filename),
+                    data_source=doc.data_source_metadata,
+                ),
+            ),
+        ]
+
+    partition_file_mock = mocker.patch.object(
+        LocalIngestDoc,
+        "partition_file",
+        autospec=True,
+        side_effect=partition_file,
+    )
+    input_dir = tmp_path / "input"
+    paths = [
+        input_dir / "a" / "x.txt",
+        input_dir / "b" / "y.TXT",
+        input_dir / "c" / "z.txt",
+        input_dir / "d" / "x.md",
+    ]
+    for path, content in zip(paths, ["duplicate", "duplicate", "different", "duplicate"]):
+        path.parent.mkdir(parents=True)
+        path.write_text(content)
+    context = PipelineContext(work_dir=str(tmp_path / "work"), content_cache=True)
+    context.ingest_docs_map = SqliteDocStateStore(path=tmp_path / "state.sqlite3")
+    partitioner = Partitioner(pipeline_context=context, partition_config=PartitionConfig())
+    partitioner.initialize()
+    connector_config = SimpleLocalConfig(input_path=str(input_dir), recursive=True)
+
+    def partition(path: Path) -> t.List[dict]:
+        doc = LocalIngestDoc(
+            processor_config=context,
+            read_config=ReadConfig(),
+            connector_config=connector_config,
+            path=str(path),
+        )
+        json_path = partitioner.run(doc.to_dict())
+        return json.loads(Path(json_path).read_text())
+
+    outputs = [partition(path) for path in paths]
+    # The same content with another file type is partitioned again
+    assert partition_file_mock.call_count == 3
+    assert [output[0]["text"] for output in outputs] == [
+        "duplicate",
+        "duplicate",
+        "different",
+        "duplicate",
+    ]
+    for path, output in zip(paths, outputs):
+        assert output[0]["metadata"]["filename"] == path.name
+        assert output[0]["metadata"]["file_directory"] == str(path.parent)
+        assert output[0]["metadata"]["data_source"]["url"] == str(path)
+    # Metadata the cached elements don't have is stamped onto them as well
+    assert outputs[1][0]["metadata"]["last_modified"] is not None
+
+    # An edited file at the same path is partitioned again
+    paths[0].write_text("edited")
+    assert partition(paths[0])[0]["text"] == "edited"
+    assert partition_file_mock.call_count == 4
+
+
+@pytest.mark.parametrize(
+    ("streaming", "doc_state_backend", "fetch_concurrency"),
+    [
+        (False, "sqlite", None),
+        (True, "sqlite", None),
+        (False, "manager", None),
+        (False, "sqlite", 4),
+        (True, "sqlite", 4),
+    ],
+)
+def test_process_documents(
+    mocker,
+    tmp_path: Path,
+    streaming: bool,
+    doc_state_backend: str,
+    fetch_concurrency: t.Optional[int],
+):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(5):
+        (input_dir / f"doc-{i}.txt").write_text(f"This is the content of document number {i}.")
+    output_dir = tmp_path / "output"
+    processor_config = ProcessorConfig(
+        output_dir=str(output_dir),
+        work_dir=str(tmp_path / "work"),
+        num_processes=2,
+        streaming=streaming,
+        stream_buffer_size=2,
+        doc_state_backend=doc_state_backend,
+    )
+    read_config = ReadConfig(fetch_concurrency=fetch_concurrency)
+    source_connector = LocalSourceConnector(
+        processor_config=processor_config,
+        read_config=read_config,
+        connector_config=SimpleLocalConfig(input_path=str(input_dir)),
+    )
+    fetch = mocker.spy(Reader, "run")
+
+    process_documents(
+        processor_config=processor_config,
+        source_doc_connector=source_connector,
+        partition_config=PartitionConfig(strategy="fast"),
+    )
+
+    # With a fetch concurrency, docs are fetched by threads of this process
+    assert fetch.call_count == (5 if fetch_concurrency else 0)
+
+    outputs = sorted(output_dir.iterdir())
+    assert [p.name for p in outputs] == [f"doc-{i}.txt.json" for i in range(5)]
+    for i, output in enumerate(outputs):
+        elements = json.loads(output.read_text())
+        assert elements[0]["text"] == f"This is the content of document number {i}."
+
+
+def test_doc_factory_lists_lazily_up_to_max_docs(mocker, tmp_path: Path):
+    for i in range(5):
+        (tmp_path / f"doc-{i}.txt").write_text(f"document {i}")
+    source_connector = LocalSourceConnector(
+        processor_config=ProcessorConfig(output_dir=str(tmp_path / "output")),
+        read_config=ReadConfig(max_docs=2),
+        connector_config=SimpleLocalConfig(input_path=str(tmp_path)),
+    )
+    listed: t.List[str] = []
+    list_files = source_connector._list_files
+
+    def spy_list_files():
+        for path in list_files():
+            listed.append(path)
+            yield path
+
+    mocker.patch.object(source_connector, "_list_files", side_effect=spy_list_files)
+    doc_factory = DocFactory(
+        pipeline_context=PipelineContext(),
+        source_doc_connector=source_connector,
+    )
+
+    dict_docs = doc_factory.run()
+    assert listed == []
+
+    assert len(list(dict_docs)) == 2
+    assert len(listed) == 2
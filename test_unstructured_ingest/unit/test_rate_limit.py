@@ -0,0 +1,100 @@
+import multiprocessing as mp
+import time
+from pathlib import Path
+
+from unstructured.documents.elements import Text
+from unstructured.embed.interfaces import BaseEmbeddingEncoder
+from unstructured.ingest.interfaces import EmbeddingConfig
+from unstructured.ingest.pipeline import PipelineContext
+from unstructured.ingest.pipeline.rate_limit import RateLimiter
+from unstructured.ingest.pipeline.reformat.embedding import Embedder, RateLimitedEmbeddingEncoder
+
+
+def acquire(path: str, num_requests: int, requests_per_second: float) -> None:
+    limiter = RateLimiter(path=path)
+    for _ in range(num_requests):
+        with limiter.limit("source:test", requests_per_second=requests_per_second):
+            pass
+
+
+def hold(path: str, max_concurrency: int) -> int:
+    limiter = RateLimiter(path=path)
+    with limiter.limit("destination:test", max_concurrency=max_concurrency):
+        in_flight = limiter.get_in_flight("destination:test")
+        time.sleep(0.1)
+    return in_flight
+
+
+def test_rate_limiter_shares_the_rate_across_processes(tmp_path: Path):
+    path = str(tmp_path / "rate_limits.sqlite3")
+    RateLimiter(path=path)
+    start = time.monotonic()
+    with mp.Pool(processes=4) as pool:
+        pool.starmap(acquire, [(path, 10, 20.0)] * 4)
+    elapsed = time.monotonic() - start
+
+    # A second worth of requests can go through right away, the rest at 20 per second
+    assert elapsed >= 0.9
+
+
+def test_rate_limiter_caps_concurrency_across_processes(tmp_path: Path):
+    path = str(tmp_path / "rate_limits.sqlite3")
+    limiter = RateLimiter(path=path)
+    with mp.Pool(processes=4) as pool:
+        in_flight = pool.starmap(hold, [(path, 2)] * 8)
+
+    assert max(in_flight) <= 2
+    assert limiter.get_in_flight("destination:test") == 0
+
+
+def test_rate_limiter_reclaims_slots_of_dead_processes(tmp_path: Path):
+    limiter = RateLimiter(path=tmp_path / "rate_limits.sqlite3")
+    process = mp.Process(target=time.sleep, args=(0,))
+    process.start()
+    process.join()
+    with limiter.connection:
+        limiter.connection.execute(
+            "INSERT INTO holders (name, pid, count) VALUES (?, ?, 1)",
+            ("destination:test", process.pid),
+        )
+
+    with limiter.limit("destination:test", max_concurrency=1):
+        assert limiter.get_holders("destination:test") != [process.pid]
+
+
+class FakeEmbeddingEncoder(BaseEmbeddingEncoder):
+    def initialize(self):
+        pass
+
+    def num_of_dimensions(self):
+        return (1,)
+
+    def is_unit_vector(self):
+        return False
+
+    def embed_query(self, query):
+        return [0.0]
+
+    def embed_documents(self, elements):
+        for element in elements:
+            element.embeddings = [0.0]
+        return elements
+
+
+def test_embedder_limits_requests_to_provider(mocker, tmp_path: Path):
+    mocker.patch.object(EmbeddingConfig, "get_embedder", return_value=FakeEmbeddingEncoder())
+    embedder = Embedder(
+        pipeline_context=PipelineContext(
+            work_dir=str(tmp_path),
+            embedding_requests_per_second=1.0,
+        ),
+        embedder_config=EmbeddingConfig(provider="rate-limited-test"),
+    )
+    encoder = embedder.get_embedder()
+    assert isinstance(encoder, RateLimitedEmbeddingEncoder)
+
+    start = time.monotonic()
+    for _ in range(2):
+        (element,) = encoder.embed_documents(elements=[Text("text")])
+    assert element.embeddings == [0.0]
+    assert time.monotonic() - start >= 0.9
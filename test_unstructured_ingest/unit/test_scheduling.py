@@ -0,0 +1,125 @@
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from unstructured.ingest.connector.local import LocalIngestDoc, SimpleLocalConfig
+from unstructured.ingest.interfaces import PartitionConfig, ProcessorConfig, ReadConfig
+from unstructured.ingest.pipeline import Partitioner, PipelineContext
+from unstructured.ingest.pipeline.scheduling import (
+    COST_UNITS_KEY,
+    DEFAULT_PDF_PAGE_BYTES,
+    PartitionTimings,
+    estimate_cost,
+    get_cost_units,
+    get_pdf_page_count,
+    schedule_batches,
+)
+
+EXAMPLE_DOCS_DIRECTORY = Path(__file__).parents[2] / "example-docs"
+
+
+def test_get_pdf_page_count():
+    assert get_pdf_page_count(EXAMPLE_DOCS_DIRECTORY / "DA-619p.pdf") == 619
+    assert get_pdf_page_count(EXAMPLE_DOCS_DIRECTORY / "fake-text.txt") is None
+
+
+def test_get_cost_units(tmp_path: Path):
+    (tmp_path / "doc.txt").write_text("a" * 2048)
+    assert get_cost_units(tmp_path / "doc.txt") == 2.0
+    assert get_cost_units(EXAMPLE_DOCS_DIRECTORY / "DA-619p.pdf") == 619.0
+    assert get_cost_units(tmp_path / "missing.txt") == 0.0
+    # Estimated from the file size rather than read from the pdf
+    pdf_size = (EXAMPLE_DOCS_DIRECTORY / "DA-619p.pdf").stat().st_size
+    assert get_cost_units(
+        EXAMPLE_DOCS_DIRECTORY / "DA-619p.pdf",
+        count_pages=False,
+    ) == pytest.approx(pdf_size / DEFAULT_PDF_PAGE_BYTES)
+
+
+def test_schedule_batches_largest_first():
+    costs = [1.0, 50.0, 1.0, 30.0, 2.0, 1.0]
+    items = [f"doc-{i}" for i in range(len(costs))]
+
+    batches = schedule_batches(items, costs=costs, num_workers=2)
+
+    # Each batch costs at least a sixteenth of the total, except the last one
+    assert batches == [["doc-1"], ["doc-3"], ["doc-4", "doc-0", "doc-2", "doc-5"]]
+    assert schedule_batches([], costs=[], num_workers=2) == []
+
+
+def test_estimate_cost_from_recorded_timings(tmp_path: Path):
+    (tmp_path / "doc.txt").write_text("a" * 1024)
+    timings = PartitionTimings(path=tmp_path / "timings.sqlite3")
+    default_cost = estimate_cost(tmp_path / "doc.txt", "fast", timings.get_seconds_per_unit())
+
+    timings.record(key=(".txt", "fast"), units=1.0, seconds=3.0)
+    timings.record(key=(".txt", "fast"), units=3.0, seconds=5.0)
+
+    assert timings.get_seconds_per_unit() == {(".txt", "fast"): 2.0}
+    cost = estimate_cost(tmp_path / "doc.txt", "fast", timings.get_seconds_per_unit())
+    assert cost > default_cost
+    assert cost == pytest.approx(2.0, abs=0.1)
+
+
+def test_partitioner_schedules_largest_docs_first(mocker, tmp_path: Path):
+    docs = []
+    for i, size in enumerate([10, 5000, 100]):
+        (tmp_path / f"doc-{i}.txt").write_text("a" * size)
+        docs.append(
+            LocalIngestDoc(
+                processor_config=ProcessorConfig(output_dir=str(tmp_path / "output")),
+                read_config=ReadConfig(),
+                connector_config=SimpleLocalConfig(input_path=str(tmp_path)),
+                path=str(tmp_path / f"doc-{i}.txt"),
+            ).to_dict(),
+        )
+    partitioner = Partitioner(
+        pipeline_context=PipelineContext(work_dir=str(tmp_path / "work"), num_processes=1),
+        partition_config=PartitionConfig(strategy="fast"),
+    )
+    partitioned: t.List[str] = []
+    mocker.patch.object(
+        partitioner,
+        "run",
+        side_effect=lambda doc: partitioned.append(Path(doc["path"]).name) or doc["path"],
+    )
+
+    json_paths = partitioner.map_run(map, docs)
+
+    assert partitioned == ["doc-1.txt", "doc-2.txt", "doc-0.txt"]
+    assert sorted(json_paths) == sorted(doc["path"] for doc in docs)
+
+
+def test_partitioner_schedules_by_the_cost_units_carried_by_docs(mocker, tmp_path: Path):
+    docs = []
+    for i, units in enumerate([10.0, None, 1000.0]):
+        (tmp_path / f"doc-{i}.pdf").write_bytes(b"a" * 100)
+        doc = LocalIngestDoc(
+            processor_config=ProcessorConfig(output_dir=str(tmp_path / "output")),
+            read_config=ReadConfig(),
+            connector_config=SimpleLocalConfig(input_path=str(tmp_path)),
+            path=str(tmp_path / f"doc-{i}.pdf"),
+        ).to_dict()
+        if units is not None:
+            doc[COST_UNITS_KEY] = units
+        docs.append(doc)
+    partitioner = Partitioner(
+        pipeline_context=PipelineContext(work_dir=str(tmp_path / "work"), num_processes=1),
+        partition_config=PartitionConfig(strategy="fast"),
+    )
+    partitioned: t.List[str] = []
+    mocker.patch.object(
+        partitioner,
+        "run",
+        side_effect=lambda doc: partitioned.append(Path(doc["path"]).name) or doc["path"],
+    )
+    get_pdf_page_count = mocker.patch(
+        "unstructured.ingest.pipeline.scheduling.get_pdf_page_count",
+    )
+
+    partitioner.map_run(map, docs)
+
+    # The pdf without cost units is estimated from its size, without parsing it
+    get_pdf_page_count.assert_not_called()
+    assert partitioned == ["doc-2.pdf", "doc-0.pdf", "doc-1.pdf"]
@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from unstructured.ingest.cli.cli import get_cmd
+from unstructured.ingest.connector.local import LocalSourceConnector, SimpleLocalConfig
+from unstructured.ingest.interfaces import ProcessorConfig, ReadConfig
+from unstructured.ingest.pipeline import DocFactory, PipelineContext
+from unstructured.ingest.utils.sharding import get_shard_index, merge_shard_outputs
+
+
+def test_get_shard_index_is_stable():
+    # Must not depend on the process, e.g. through the salted builtin hash
+    assert [get_shard_index(f"doc-{i}.txt", 4) for i in range(6)] == [1, 1, 3, 3, 1, 1]
+
+
+@pytest.mark.parametrize(("num_shards", "shard_index"), [(0, 0), (2, 2), (2, -1)])
+def test_read_config_rejects_invalid_shards(num_shards: int, shard_index: int):
+    with pytest.raises(ValueError):
+        ReadConfig(num_shards=num_shards, shard_index=shard_index)
+
+
+def test_doc_factory_shards_are_disjoint(tmp_path: Path):
+    for i in range(20):
+        (tmp_path / f"doc-{i}.txt").write_text(f"document {i}")
+
+    def list_shard(num_shards: int, shard_index: int):
+        doc_factory = DocFactory(
+            pipeline_context=PipelineContext(),
+            source_doc_connector=LocalSourceConnector(
+                processor_config=ProcessorConfig(output_dir=str(tmp_path / "output")),
+                read_config=ReadConfig(num_shards=num_shards, shard_index=shard_index),
+                connector_config=SimpleLocalConfig(input_path=str(tmp_path)),
+            ),
+        )
+        return [doc["unique_id"] for doc in doc_factory.run()]
+
+    all_docs = list_shard(num_shards=1, shard_index=0)
+    shards = [list_shard(num_shards=3, shard_index=i) for i in range(3)]
+
+    assert all(shards)
+    assert sorted(sum(shards, [])) == sorted(all_docs)
+
+
+@pytest.fixture()
+def shard_output_dirs(tmp_path: Path):
+    shard_output_dirs = []
+    for shard_index, filenames in enumerate([["a.txt.json", "nested/b.txt.json"], ["c.txt.json"]]):
+        shard_output_dir = tmp_path / f"shard-{shard_index}"
+        for filename in filenames:
+            (shard_output_dir / filename).parent.mkdir(parents=True, exist_ok=True)
+            (shard_output_dir / filename).write_text(json.dumps([{"text": filename}] * 2))
+        shard_output_dirs.append(shard_output_dir)
+    return shard_output_dirs
+
+
+def test_merge_shard_outputs(tmp_path: Path, shard_output_dirs):
+    stats = merge_shard_outputs(shard_output_dirs, output_dir=tmp_path / "merged")
+
+    merged = sorted(str(p.relative_to(tmp_path / "merged")) for p in tmp_path.rglob("merged/**/*"))
+    assert merged == ["a.txt.json", "c.txt.json", "nested", "nested/b.txt.json"]
+    assert (stats["docs"], stats["elements"]) == (3, 6)
+    assert [shard["docs"] for shard in stats["shards"]] == [2, 1]
+
+
+def test_merge_shard_outputs_rejects_overlapping_shards(tmp_path: Path, shard_output_dirs):
+    (shard_output_dirs[1] / "a.txt.json").write_text("[]")
+    with pytest.raises(ValueError, match="a.txt.json"):
+        merge_shard_outputs(shard_output_dirs, output_dir=tmp_path / "merged")
+
+
+def test_merge_shards_cli(tmp_path: Path, shard_output_dirs):
+    stats_path = tmp_path / "stats.json"
+    result = CliRunner().invoke(
+        get_cmd(),
+        [
+            "merge-shards",
+            "--output-dir",
+            str(tmp_path / "merged"),
+            "--stats-path",
+            str(stats_path),
+            *map(str, shard_output_dirs),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(stats_path.read_text())["docs"] == 3
+    assert (tmp_path / "merged" / "nested" / "b.txt.json").exists()
@@ -0,0 +1,115 @@
+import os
+import signal
+import time
+from pathlib import Path
+
+import pytest
+
+from unstructured.ingest.connector.local import LocalIngestDoc, SimpleLocalConfig
+from unstructured.ingest.interfaces import PartitionConfig, ProcessorConfig, ReadConfig
+from unstructured.ingest.pipeline import Partitioner, PipelineContext, watchdog
+from unstructured.ingest.pipeline import utils as pipeline_utils
+from unstructured.ingest.pipeline.journal import CheckpointJournal
+from unstructured.ingest.pipeline.utils import WorkerLostError, map_with_pool
+from unstructured.ingest.pipeline.watchdog import (
+    DocTimeoutError,
+    RecyclingPool,
+    WorkerMemoryError,
+    get_rss,
+    guard_doc,
+)
+
+
+def test_guard_doc_times_out():
+    with pytest.raises(DocTimeoutError):
+        with guard_doc(timeout=0.1):
+            time.sleep(5)
+
+    # The timer is cancelled once the guarded code returns
+    with guard_doc(timeout=0.1):
+        pass
+    time.sleep(0.2)
+
+
+def test_guard_doc_aborts_on_memory():
+    with pytest.raises(WorkerMemoryError):
+        with guard_doc(max_memory=1):
+            time.sleep(5)
+
+
+def test_recycling_pool_replaces_workers():
+    with RecyclingPool(processes=2, max_memory=1) as pool:
+        assert pool.map(abs, range(-10, 0)) == list(range(10, 0, -1))
+        assert pool.num_recycled.value > 0
+
+
+def hang_on_odd(x: int) -> int:
+    with guard_doc(timeout=0.1):
+        if x % 2:
+            # Like native code that never returns to the interpreter to handle the alarm
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+            time.sleep(60)
+    return x
+
+
+def exit_on_odd(x: int) -> int:
+    if x % 2:
+        os._exit(1)
+    return x
+
+
+@pytest.mark.parametrize(
+    ("func", "error_type"),
+    [(hang_on_odd, DocTimeoutError), (exit_on_odd, WorkerLostError)],
+)
+def test_recycling_pool_fails_lost_tasks(monkeypatch, func, error_type):
+    monkeypatch.setattr(pipeline_utils, "WORKER_POLL_INTERVAL", 0.1)
+    monkeypatch.setattr(watchdog, "WORKER_KILL_GRACE_PERIOD", 0.1)
+    lost = []
+
+    def on_lost(x: int, error: Exception):
+        lost.append((x, error))
+        return -1
+
+    with RecyclingPool(processes=2) as pool:
+        results = map_with_pool(pool, func, range(4), on_lost=on_lost)
+        # The pool replaced the lost workers
+        assert pool.map(abs, [-1, -2]) == [1, 2]
+
+    assert results == [0, -1, 2, -1]
+    assert sorted(x for x, _ in lost) == [1, 3]
+    assert all(isinstance(error, error_type) for _, error in lost)
+
+
+def test_get_rss():
+    assert get_rss() > 0
+
+
+def test_partitioner_records_timeout(mocker, tmp_path: Path):
+    (tmp_path / "doc.txt").write_text("This is the content of the doc.")
+    doc = LocalIngestDoc(
+        processor_config=ProcessorConfig(output_dir=str(tmp_path / "output")),
+        read_config=ReadConfig(),
+        connector_config=SimpleLocalConfig(input_path=str(tmp_path)),
+        path=str(tmp_path / "doc.txt"),
+    )
+    pipeline_context = PipelineContext(
+        work_dir=str(tmp_path / "work"),
+        num_processes=1,
+        doc_timeout=0.1,
+    )
+    pipeline_context.ingest_docs_map = {}
+    journal = CheckpointJournal(path=tmp_path / "journal.sqlite3")
+    pipeline_context.journal = journal
+    partitioner = Partitioner(
+        pipeline_context=pipeline_context,
+        partition_config=PartitionConfig(strategy="fast"),
+    )
+    mocker.patch.object(LocalIngestDoc, "process_file", side_effect=lambda **_: time.sleep(5))
+
+    assert partitioner.run(doc.to_dict()) is None
+
+    ((failure),) = journal.get_failures().values()
+    assert failure.error.startswith("DocTimeoutError")
+    assert failure.node == "Partitioner"
+    journal.close()
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import sqlite3
+import struct
+import threading
+import time
+import typing as t
+import unicodedata
+from pathlib import Path
+
+from unstructured.documents.elements import Element
+from unstructured.embed.interfaces import BaseEmbeddingEncoder
+
+# SQLite limits the number of host parameters in a single statement
+SQLITE_MAX_BATCH_SIZE = 500
+# Counting the cached embeddings scans the whole table, so each process only checks for
+# embeddings to evict once it inserted this many, or a tenth of max_entries if fewer
+EVICTION_INTERVAL = 10_000
+
+
+def normalize_text(text: str) -> str:
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def get_embedding_cache_key(namespace: str, text: str) -> str:
+    return hashlib.sha256(f"{namespace}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+def pack_embedding(embedding: t.Sequence[float]) -> bytes:
+    return struct.pack(f"<{len(embedding)}d", *embedding)
+
+
+def unpack_embedding(data: bytes) -> t.List[float]:
+    return list(struct.unpack(f"<{len(data) // 8}d", data))
+
+
+class EmbeddingCache:
+    """
+    Persists embeddings in a SQLite database in WAL mode, keyed by a hash of the embedding
+    model and the normalized text, so that it can be shared by every process and across
+    runs. Once it holds more than max_entries embeddings, the least recently used ones
+    are evicted, which is checked every so many inserts so the cache may briefly hold more.
+    """
+
+    def __init__(self, path: t.Union[str, Path], max_entries: t.Optional[int] = None):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Inserted by this process since the last check for embeddings to evict
+        self._inserted = 0
+        self._connections: t.Dict[t.Tuple[int, int], sqlite3.Connection] = {}
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection
+
+    def __getstate__(self):
+        # Connections can't be shared across processes, each one opens its own
+        state = self.__dict__.copy()
+        state["_connections"] = {}
+        state["_inserted"] = 0
+        return state
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        key = (os.getpid(), threading.get_ident())
+        if key not in self._connections:
+            connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, embedding BLOB NOT NULL, last_used REAL NOT NULL)",
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)",
+            )
+            self._connections[key] = connection
+        return self._connections[key]
+
+    def get_many(self, keys: t.List[str]) -> t.Dict[str, t.List[float]]:
+        """Returns the cached embedding of each key found, marking them as recently used."""
+        embeddings: t.Dict[str, t.List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for i in range(0, len(unique_keys), SQLITE_MAX_BATCH_SIZE):
+            batch = unique_keys[i : i + SQLITE_MAX_BATCH_SIZE]  # noqa: E203
+            rows = self.connection.execute(
+                "SELECT key, embedding FROM embeddings "
+                f"WHERE key IN ({', '.join('?' * len(batch))})",
+                batch,
+            )
+            embeddings.update({key: unpack_embedding(embedding) for key, embedding in rows})
+        if embeddings:
+            now = time.time()
+            with self.connection:
+                self.connection.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in embeddings],
+                )
+        hits = sum(1 for key in keys if key in embeddings)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return embeddings
+
+    def update(self, embeddings: t.Dict[str, t.Sequence[float]]) -> None:
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, embedding, last_used) VALUES (?, ?, ?)",
+                [(key, pack_embedding(embedding), now) for key, embedding in embeddings.items()],
+            )
+        if self.max_entries is None:
+            return
+        self._inserted += len(embeddings)
+        if self._inserted >= max(1, min(EVICTION_INTERVAL, self.max_entries // 10)):
+            self.evict(max_entries=self.max_entries)
+            self._inserted = 0
+
+    def evict(self, max_entries: int) -> int:
+        """Deletes the least recently used embeddings beyond max_entries."""
+        with self.connection:
+            (count,) = self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count <= max_entries:
+                return 0
+            self.connection.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (count - max_entries,),
+            )
+        return count - max_entries
+
+    def close(self) -> None:
+        pid = os.getpid()
+        for key in [key for key in self._connections if key[0] == pid]:
+            self._connections.pop(key).close()
+
+
+class CachedEmbeddingEncoder(BaseEmbeddingEncoder):
+    """
+    Wraps an embedding encoder to only embed the elements whose text isn't in the cache
+    yet, each distinct text only once. The namespace identifies the embedding model, e.g.
+    its provider and model name, so that embeddings of different models are never mixed.
+    """
+
+    def __init__(self, encoder: BaseEmbeddingEncoder, cache: EmbeddingCache, namespace: str):
+        self.encoder = encoder
+        self.cache = cache
+        self.namespace = namespace
+
+    def initialize(self):
+        self.encoder.initialize()
+
+    def num_of_dimensions(self):
+        return self.encoder.num_of_dimensions()
+
+    def is_unit_vector(self):
+        return self.encoder.is_unit_vector()
+
+    def embed_query(self, query):
+        return self.encoder.embed_query(query)
+
+    def embed_documents(self, elements: t.List[Element]) -> t.List[Element]:
+        keys = [get_embedding_cache_key(self.namespace, str(element)) for element in elements]
+        embeddings = self.cache.get_many(keys)
+        missing: t.Dict[str, Element] = {}
+        for key, element in zip(keys, elements):
+            if key not in embeddings and key not in missing:
+                missing[key] = element
+        if missing:
+            embedded_elements = self.encoder.embed_documents(elements=list(missing.values()))
+            new_embeddings = {
+                key: [float(value) for value in element.embeddings]
+                for key, element in zip(missing, embedded_elements)
+                if element.embeddings is not None
+            }
+            self.cache.update(new_embeddings)
+            embeddings.update(new_embeddings)
+        for key, element in zip(keys, elements):
+            element.embeddings = embeddings.get(key)
+        return elements
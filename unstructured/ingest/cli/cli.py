@@ -1,6 +1,12 @@
+import json
+import time
+from pathlib import Path
+
 import click
 
 from unstructured.ingest.cli import dest, src
+from unstructured.ingest.pipeline.cache import MIN_EVICTION_AGE, get_cache_stats, prune_cache
+from unstructured.ingest.utils.sharding import merge_shard_outputs
 
 
 @click.group()
@@ -8,6 +14,110 @@ def ingest():
     pass
 
 
+@click.command(name="merge-shards")
+@click.argument(
+    "shard_output_dirs",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--output-dir",
+    required=True,
+    help="Where to copy the outputs of every shard to.",
+)
+@click.option(
+    "--stats-path",
+    default=None,
+    help="If specified, also write the merge stats as json to this file.",
+)
+def merge_shards(shard_output_dirs, output_dir, stats_path):
+    """
+    Merges the --output-dir of each shard of a run split with --num-shards into one
+    output dir, and reports how many docs and elements each shard produced.
+    """
+    stats = merge_shard_outputs(shard_output_dirs=list(shard_output_dirs), output_dir=output_dir)
+    stats_json = json.dumps(stats, indent=2)
+    if stats_path:
+        with open(stats_path, "w") as stats_f:
+            stats_f.write(stats_json)
+    click.echo(stats_json)
+
+
+work_dir_option = click.option(
+    "--work-dir",
+    default=str((Path.home() / ".cache" / "unstructured" / "ingest" / "pipeline").resolve()),
+    show_default=True,
+    help="The --work-dir of the runs whose cached outputs to manage.",
+)
+
+
+@click.group(name="cache")
+def cache():
+    """Manages the outputs each step of the pipeline caches in the work dir."""
+
+
+@cache.command(name="stats")
+@work_dir_option
+def cache_stats(work_dir):
+    """
+    Reports how many files, and bytes, each cache dir and SQLite store in the work dir holds,
+    and how many days ago the least and most recently used of them were last used.
+    """
+    now = time.time()
+    stats = get_cache_stats(work_dir=work_dir)
+    for dir_stats in stats.values():
+        for key in ["oldest", "newest"]:
+            if dir_stats[key] is not None:
+                dir_stats[key] = round((now - dir_stats[key]) / (24 * 60 * 60), 2)
+    click.echo(json.dumps(stats, indent=2))
+
+
+@cache.command(name="prune")
+@work_dir_option
+@click.option(
+    "--max-size",
+    type=click.IntRange(min=0),
+    default=None,
+    help="In MiB, evict the least recently used outputs until they take up no more than this.",
+)
+@click.option(
+    "--max-age",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="In days, evict the outputs no run used for longer than this.",
+)
+@click.option(
+    "--min-age",
+    type=click.FloatRange(min=0),
+    default=MIN_EVICTION_AGE / 60,
+    show_default=True,
+    help="In minutes, never evict outputs used more recently than this, since a run still in "
+    "progress may yet read them.",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Only report what would be evicted.",
+)
+def cache_prune(work_dir, max_size, max_age, min_age, dry_run):
+    """
+    Evicts the outputs cached, and SQLite databases kept, in the work dir beyond the given size
+    and age. The manifests of incremental runs are never evicted.
+    """
+    if max_size is None and max_age is None:
+        raise click.UsageError("at least one of --max-size and --max-age is required")
+    evicted = prune_cache(
+        work_dir=work_dir,
+        max_size=max_size * 2**20 if max_size is not None else None,
+        max_age=max_age * 24 * 60 * 60 if max_age is not None else None,
+        min_age=min_age * 60,
+        dry_run=dry_run,
+    )
+    click.echo(json.dumps(evicted, indent=2))
+
+
 def get_cmd() -> click.Command:
     cmd = ingest
     # Add all subcommands
@@ -16,4 +126,6 @@ def get_cmd() -> click.Command:
         for dest_subcommand in dest:
             src_subcommand.add_command(dest_subcommand)
         cmd.add_command(src_subcommand)
+    cmd.add_command(merge_shards)
+    cmd.add_command(cache)
     return cmd
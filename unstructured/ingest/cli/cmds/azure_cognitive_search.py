@@ -49,6 +49,18 @@ class AzureCognitiveSearchCliWriteConfig(AzureCognitiveSearchWriteConfig, CliCon
                 type=str,
                 help="The name of the index to connect to",
             ),
+            click.Option(
+                ["--batch-size"],
+                default=1000,
+                type=int,
+                help="Maximum number of elements uploaded per request",
+            ),
+            click.Option(
+                ["--max-batch-bytes"],
+                default=15 * 1024 * 1024,
+                type=int,
+                help="Maximum size in bytes of the elements uploaded per request",
+            ),
         ]
         return options
 
@@ -70,6 +70,12 @@ class DeltaTableCliWriteConfig(DeltaTableWriteConfig, CliConfig):
                 "If 'overwrite', will replace table with new data. "
                 "If 'ignore', will not write anything if table already exists.",
             ),
+            click.Option(
+                ["--batch-size"],
+                default=10000,
+                type=int,
+                help="Maximum number of rows held in memory and written per record batch",
+            ),
         ]
         return options
 
@@ -40,6 +40,12 @@ class MongoDBCliWriteConfig(MongoDBWriteConfig, CliConfig):
             click.Option(
                 ["--collection"], required=True, type=str, help="collection name to connect to"
             ),
+            click.Option(
+                ["--batch-size"],
+                default=1000,
+                type=int,
+                help="Number of records inserted per request",
+            ),
         ]
         return options
 
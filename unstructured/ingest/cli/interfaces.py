@@ -20,6 +20,8 @@ from unstructured.ingest.interfaces import (
     ReadConfig,
     RetryStrategyConfig,
 )
+from unstructured.ingest.pipeline.doc_state import DOC_STATE_BACKENDS
+from unstructured.ingest.pipeline.intermediate import INTERMEDIATE_FORMATS
 
 
 class Dict(click.ParamType):
@@ -196,12 +198,50 @@ class CliProcessorConfig(ProcessorConfig, CliMixin):
                 show_default=True,
                 help="Where to place working files when processing each step",
             ),
+            click.Option(
+                ["--work-dir-max-size"],
+                type=click.IntRange(min=0),
+                default=None,
+                help="If set, in MiB, at the end of each run the least recently used outputs "
+                "and databases in --work-dir are evicted until they take up no more than this. "
+                "The manifests of incremental runs are never evicted.",
+            ),
+            click.Option(
+                ["--work-dir-max-age"],
+                type=click.FloatRange(min=0),
+                default=None,
+                help="If set, in days, at the end of each run the outputs cached in --work-dir "
+                "that no run used for longer than this are evicted.",
+            ),
             click.Option(
                 ["--num-processes"],
                 default=2,
                 show_default=True,
                 help="Number of parallel processes with which to process docs",
             ),
+            click.Option(
+                ["--max-tasks-per-worker"],
+                type=int,
+                default=None,
+                help="If set, each worker process is replaced with a fresh one after "
+                "completing this many tasks. By default workers live for the whole run.",
+            ),
+            click.Option(
+                ["--max-worker-memory"],
+                type=click.IntRange(min=1),
+                default=None,
+                help="If set, in MiB, each worker process whose memory grows beyond this is "
+                "replaced with a fresh one once done with its current task, and a doc is "
+                "failed if the memory of the worker processing it grows beyond twice this.",
+            ),
+            click.Option(
+                ["--doc-timeout"],
+                type=click.FloatRange(min=0, min_open=True),
+                default=None,
+                help="If set, in seconds, partitioning a doc that takes longer than this is "
+                "interrupted and the doc is failed. Workers still busy with it shortly after are "
+                "killed and replaced.",
+            ),
             click.Option(
                 ["--raise-on-error"],
                 is_flag=True,
@@ -209,6 +249,138 @@ class CliProcessorConfig(ProcessorConfig, CliMixin):
                 help="Is set, will raise error if any doc in the pipeline fail. Otherwise will "
                 "log error and continue with other docs",
             ),
+            click.Option(
+                ["--doc-state-backend"],
+                type=click.Choice(DOC_STATE_BACKENDS),
+                default="sqlite",
+                show_default=True,
+                help="Where to keep the state of each doc shared across pipeline steps. sqlite "
+                "persists it in a database under the work dir, deleted at the end of the "
+                "run, that every process opens directly, manager keeps it in memory in a "
+                "separate process.",
+            ),
+            click.Option(
+                ["--content-cache"],
+                is_flag=True,
+                default=False,
+                help="Cache partitioned content by a hash of the downloaded file content rather "
+                "than its path, so that renamed, moved or duplicated files are only partitioned "
+                "once across runs and source connectors sharing the same work dir.",
+            ),
+            click.Option(
+                ["--incremental"],
+                is_flag=True,
+                default=False,
+                help="Keep a manifest of the source version of every doc written to the "
+                "destination under the work dir, and skip docs whose version did not change "
+                "since the last run before downloading them.",
+            ),
+            click.Option(
+                ["--incremental-delete"],
+                is_flag=True,
+                default=False,
+                help="When running incrementally, delete the output of docs that no longer "
+                "exist on the source, or are no longer listed by it, from the destination. "
+                "Requires a destination that supports deletes.",
+            ),
+            click.Option(
+                ["--intermediate-format"],
+                type=click.Choice(INTERMEDIATE_FORMATS),
+                default="json",
+                show_default=True,
+                help="Format of the files passed between pipeline steps under the work dir. The "
+                "json lines formats are more compact and faster to encode, store embeddings as "
+                "binary and can be compressed with gzip or zstd. The json output is then only "
+                "rendered when copied to the output dir.",
+            ),
+            click.Option(
+                ["--streaming"],
+                is_flag=True,
+                default=False,
+                help="Stream each doc through all pipeline steps independently so that "
+                "downloading, partitioning and writing overlap, rather than running each step "
+                "over all docs before starting the next one.",
+            ),
+            click.Option(
+                ["--stream-buffer-size"],
+                type=int,
+                default=10,
+                show_default=True,
+                help="When streaming, the maximum number of docs in flight per step, "
+                "bounding how far a step can get ahead of the next one.",
+            ),
+            click.Option(
+                ["--write-batch-size"],
+                type=int,
+                default=50,
+                show_default=True,
+                help="When streaming, how many processed docs to hand to the destination "
+                "connector at a time.",
+            ),
+            click.Option(
+                ["--resume"],
+                is_flag=True,
+                default=False,
+                help="Resume the last run of the same command from its checkpoint journal in "
+                "--work-dir, skipping listing the source if it completed, fetching docs that "
+                "were already downloaded and processing docs that were already written.",
+            ),
+            click.Option(
+                ["--metrics-output"],
+                type=str,
+                default=None,
+                help="If set, the metrics of every doc at each step of the pipeline are "
+                "written to this path, as CSV if it ends with .csv and as JSON lines otherwise.",
+            ),
+            click.Option(
+                ["--metrics-prometheus-file"],
+                type=str,
+                default=None,
+                help="If set, the totals per step of the pipeline are written to this path in "
+                "the Prometheus text format, e.g. for the textfile collector of node_exporter.",
+            ),
+            click.Option(
+                ["--source-requests-per-second"],
+                type=click.FloatRange(min=0, min_open=True),
+                default=None,
+                help="If set, the max number of requests per second to the source connector, "
+                "shared by all processes using the same --work-dir.",
+            ),
+            click.Option(
+                ["--source-max-concurrency"],
+                type=click.IntRange(min=1),
+                default=None,
+                help="If set, the max number of requests to the source in flight at a time, "
+                "shared by all processes using the same --work-dir.",
+            ),
+            click.Option(
+                ["--destination-requests-per-second"],
+                type=click.FloatRange(min=0, min_open=True),
+                default=None,
+                help="If set, the max number of requests per second to the destination connector, "
+                "shared by all processes using the same --work-dir.",
+            ),
+            click.Option(
+                ["--destination-max-concurrency"],
+                type=click.IntRange(min=1),
+                default=None,
+                help="If set, the max number of requests to the destination in flight at a time, "
+                "shared by all processes using the same --work-dir.",
+            ),
+            click.Option(
+                ["--embedding-requests-per-second"],
+                type=click.FloatRange(min=0, min_open=True),
+                default=None,
+                help="If set, the max number of requests per second to the embedding provider, "
+                "shared by all processes using the same --work-dir.",
+            ),
+            click.Option(
+                ["--embedding-max-concurrency"],
+                type=click.IntRange(min=1),
+                default=None,
+                help="If set, the max number of requests to the embedding in flight at a time, "
+                "shared by all processes using the same --work-dir.",
+            ),
             click.Option(["-v", "--verbose"], is_flag=True, default=False),
         ]
         return options
@@ -251,6 +423,32 @@ class CliReadConfig(ReadConfig, CliMixin):
                 type=int,
                 help="If specified, process at most the specified number of documents.",
             ),
+            click.Option(
+                ["--fetch-concurrency"],
+                default=None,
+                type=int,
+                help="If specified, download documents using this many threads rather than "
+                "the worker processes used for partitioning, so that network bound sources "
+                "can have many more downloads in flight than --num-processes. Some connectors "
+                "cap this to stay within the limits of their API.",
+            ),
+            click.Option(
+                ["--num-shards"],
+                default=1,
+                type=click.IntRange(min=1),
+                show_default=True,
+                help="Split the documents listed by the source into this many disjoint shards, "
+                "by a stable hash of their id, so that independent runs of the same command "
+                "can each process one of them, e.g. on separate machines. Use "
+                "`unstructured-ingest merge-shards` to combine their outputs.",
+            ),
+            click.Option(
+                ["--shard-index"],
+                default=0,
+                type=click.IntRange(min=0),
+                show_default=True,
+                help="Which shard, from 0 to --num-shards - 1, this run processes.",
+            ),
         ]
         return options
 
@@ -339,6 +537,29 @@ class CliPartitionConfig(PartitionConfig, CliMixin):
                 help="If partitioning via api, use the following host. "
                 "Default: https://api.unstructured.io/general/v0/general",
             ),
+            click.Option(
+                ["--api-max-concurrency"],
+                type=click.IntRange(min=1),
+                default=4,
+                show_default=True,
+                help="If partitioning via api, the max number of requests each worker process "
+                "has in flight at a time.",
+            ),
+            click.Option(
+                ["--api-max-retries"],
+                type=click.IntRange(min=0),
+                default=3,
+                show_default=True,
+                help="If partitioning via api, how many times a request that fails to connect "
+                "or gets a 429 or 5xx response is retried, with exponential backoff.",
+            ),
+            click.Option(
+                ["--api-split-pdf-page-range"],
+                type=click.IntRange(min=1),
+                default=None,
+                help="If partitioning via api, pdfs with more pages than this are split in "
+                "ranges of this many pages that are partitioned concurrently.",
+            ),
             click.Option(
                 ["--api-key"],
                 default=None,
@@ -430,6 +651,33 @@ class CliEmbeddingConfig(EmbeddingConfig, CliMixin):
                 type=str,
                 default=None,
             ),
+            click.Option(
+                ["--embedding-max-batch-docs"],
+                help="Maximum number of docs whose elements are embedded together by a worker.",
+                type=int,
+                default=50,
+            ),
+            click.Option(
+                ["--embedding-max-batch-chars"],
+                help="Maximum number of characters of text embedded in a single batch.",
+                type=int,
+                default=200000,
+            ),
+            click.Option(
+                ["--embedding-cache"],
+                is_flag=True,
+                default=False,
+                help="Cache embeddings under the work dir, keyed by the embedding model and "
+                "a hash of the text, so that repeated text is only embedded once across docs "
+                "and runs.",
+            ),
+            click.Option(
+                ["--embedding-cache-max-entries"],
+                help="Maximum number of cached embeddings, beyond which the least recently "
+                "used ones are evicted.",
+                type=int,
+                default=100000,
+            ),
         ]
         return options
 
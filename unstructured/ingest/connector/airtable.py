@@ -210,6 +210,8 @@ class AirtableSourceConnector(SourceConnectorCleanupMixin, BaseSourceConnector):
     """Fetches tables or views from an Airtable org."""
 
     connector_config: SimpleAirtableConfig
+    # Airtable allows five requests per second per base
+    max_fetch_concurrency: t.ClassVar[t.Optional[int]] = 5
     _api: t.Optional["Api"] = field(init=False, default=None)
 
     @property
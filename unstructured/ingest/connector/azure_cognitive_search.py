@@ -13,6 +13,7 @@ from unstructured.ingest.interfaces import (
     WriteConfig,
 )
 from unstructured.ingest.logger import logger
+from unstructured.ingest.utils.data_prep import batch_generator, iter_elements_dicts
 from unstructured.utils import requires_dependencies
 
 if t.TYPE_CHECKING:
@@ -33,6 +34,9 @@ class SimpleAzureCognitiveSearchStorageConfig(BaseConnectorConfig):
 @dataclass
 class AzureCognitiveSearchWriteConfig(WriteConfig):
     index: str
+    batch_size: int = 1000
+    # Azure Cognitive Search rejects indexing requests larger than 16 MB
+    max_batch_bytes: int = 15 * 1024 * 1024
 
 
 @dataclass
@@ -145,15 +149,14 @@ class AzureCognitiveSearchDestinationConnector(BaseDestinationConnector):
             )
 
     def write(self, docs: t.List[BaseSingleIngestDoc]) -> None:
-        json_list: t.List[t.Dict[str, t.Any]] = []
-        for doc in docs:
-            local_path = doc._output_filename
-            with open(local_path) as json_file:
-                json_content = json.load(json_file)
-                for content in json_content:
-                    self.conform_dict(data=content)
-                logger.info(
-                    f"appending {len(json_content)} json elements from content in {local_path}",
-                )
-                json_list.extend(json_content)
-        self.write_dict(elements_dict=json_list)
+        def conformed_elements_dicts() -> t.Iterator[t.Dict[str, t.Any]]:
+            for element_dict in iter_elements_dicts(docs):
+                self.conform_dict(data=element_dict)
+                yield element_dict
+
+        for batch in batch_generator(
+            conformed_elements_dicts(),
+            batch_size=self.write_config.batch_size,
+            max_batch_bytes=self.write_config.max_batch_bytes,
+        ):
+            self.write_dict(elements_dict=batch)
@@ -151,6 +151,8 @@ class BiomedSourceConnector(SourceConnectorCleanupMixin, BaseSourceConnector):
     """Objects of this class support fetching documents from Biomedical literature FTP directory"""
 
     connector_config: SimpleBiomedConfig
+    # NCBI asks for no more than three requests per second without an API key
+    max_fetch_concurrency: t.ClassVar[t.Optional[int]] = 3
 
     def get_base_endpoints_url(self) -> str:
         endpoint_url = "https://www.ncbi.nlm.nih.gov/pmc/utils/oa/oa.fcgi?format=pdf"
@@ -194,6 +194,8 @@ class ConfluenceSourceConnector(SourceConnectorCleanupMixin, BaseSourceConnector
     """Fetches body fields from all documents within all spaces in a Confluence Cloud instance."""
 
     connector_config: SimpleConfluenceConfig
+    # Confluence Cloud rate limits requests per user, and answers bursts with 429s
+    max_fetch_concurrency: t.ClassVar[t.Optional[int]] = 5
     _confluence: t.Optional["Confluence"] = field(init=False, default=None)
 
     @property
@@ -1,7 +1,7 @@
 import json
 import os
 import typing as t
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime as dt
 from multiprocessing import Process
 from pathlib import Path
@@ -20,10 +20,12 @@ from unstructured.ingest.interfaces import (
     WriteConfig,
 )
 from unstructured.ingest.logger import logger
+from unstructured.ingest.utils.data_prep import batch_generator, iter_elements_dicts
 from unstructured.ingest.utils.table import convert_to_pandas_dataframe
 from unstructured.utils import requires_dependencies
 
 if t.TYPE_CHECKING:
+    import pyarrow as pa
     from deltalake import DeltaTable
 
 
@@ -158,6 +160,7 @@ class DeltaTableWriteConfig(WriteConfig):
     drop_empty_cols: bool = False
     overwrite_schema: bool = False
     mode: t.Literal["error", "append", "overwrite", "ignore"] = "error"
+    batch_size: int = 10000
 
 
 @dataclass
@@ -167,11 +170,31 @@ class DeltaTableDestinationConnector(BaseDestinationConnector):
 
     @requires_dependencies(["deltalake"], extras="delta-table")
     def initialize(self):
-        pass
+        from deltalake import DeltaTable
+        from deltalake.exceptions import TableNotFoundError
+
+        self.table_existed = True
+        if self.write_config.mode == "ignore":
+            try:
+                DeltaTable(
+                    table_uri=self.connector_config.table_uri,
+                    storage_options=self.connector_config.storage_options,
+                    without_files=True,
+                )
+            except TableNotFoundError:
+                self.table_existed = False
 
     def check_connection(self):
         pass
 
+    def get_append_connector(self) -> "DeltaTableDestinationConnector":
+        # With the ignore mode, nothing the run writes goes to a table that already existed
+        if self.write_config.mode == "append" or (
+            self.write_config.mode == "ignore" and getattr(self, "table_existed", True)
+        ):
+            return self
+        return replace(self, write_config=replace(self.write_config, mode="append"))
+
     def write_dict(self, *args, elements_dict: t.List[t.Dict[str, t.Any]], **kwargs) -> None:
         from deltalake.writer import write_deltalake
 
@@ -199,13 +222,67 @@ class DeltaTableDestinationConnector(BaseDestinationConnector):
         writer.start()
         writer.join()
 
+    def get_schema(self, docs: t.List[BaseSingleIngestDoc]) -> "pa.Schema":
+        """
+        Infers a single arrow schema covering the elements of all docs, loading one doc at a
+        time, so that the record batches of every doc can be written to the table at once.
+        """
+        import pyarrow as pa
+
+        schema = pa.schema([])
+        non_empty_cols: t.Set[str] = set()
+        for doc in docs:
+            with open(doc._output_filename) as json_file:
+                df = convert_to_pandas_dataframe(elements_dict=json.load(json_file))
+            non_empty_cols.update(df.columns[df.notna().any()])
+            schema = pa.unify_schemas(
+                [schema, pa.Schema.from_pandas(df, preserve_index=False).remove_metadata()],
+                promote_options="permissive",
+            )
+        if self.write_config.drop_empty_cols:
+            schema = pa.schema([field for field in schema if field.name in non_empty_cols])
+        return schema
+
+    def iter_record_batches(
+        self,
+        docs: t.List[BaseSingleIngestDoc],
+        schema: "pa.Schema",
+    ) -> t.Iterator["pa.RecordBatch"]:
+        import pyarrow as pa
+
+        for elements_dict in batch_generator(
+            iter_elements_dicts(docs),
+            batch_size=self.write_config.batch_size,
+        ):
+            df = convert_to_pandas_dataframe(elements_dict=elements_dict)
+            # Not every batch has all the columns of the table
+            df = df.reindex(columns=schema.names)
+            yield pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False)
+
+    def write_docs(self, docs: t.List[BaseSingleIngestDoc]) -> None:
+        import pyarrow as pa
+        from deltalake.writer import write_deltalake
+
+        schema = self.get_schema(docs=docs)
+        logger.info(
+            f"writing rows from {len(docs)} docs to destination table "
+            f"at {self.connector_config.table_uri}\nschema: {schema}",
+        )
+        write_deltalake(
+            table_or_uri=self.connector_config.table_uri,
+            data=pa.RecordBatchReader.from_batches(
+                schema,
+                self.iter_record_batches(docs=docs, schema=schema),
+            ),
+            mode=self.write_config.mode,
+            overwrite_schema=self.write_config.overwrite_schema,
+        )
+
     @requires_dependencies(["deltalake"], extras="delta-table")
     def write(self, docs: t.List[BaseSingleIngestDoc]) -> None:
-        elements_dict: t.List[t.Dict[str, t.Any]] = []
-        for doc in docs:
-            local_path = doc._output_filename
-            with open(local_path) as json_file:
-                element_dict = json.load(json_file)
-                logger.info(f"converting {len(element_dict)} rows from content in {local_path}")
-                elements_dict.extend(element_dict)
-        self.write_dict(elements_dict=elements_dict)
+        # Rather than building a single dataframe of every element, the elements are streamed
+        # to the table as arrow record batches of at most batch_size rows. See write_dict for
+        # why the writer runs in a separate process.
+        writer = Process(target=self.write_docs, kwargs={"docs": docs})
+        writer.start()
+        writer.join()
@@ -125,32 +125,11 @@ class DropboxSourceConnector(FsspecSourceConnector):
                 "There is no folder by that name. For root try `dropbox:// /`",
             )
 
-    def _list_files(self):
+    @property
+    def _list_path(self) -> str:
         # Dropbox requires a forward slash at the front of the folder path. This
         # creates some complications in path joining so a custom path is created here.
-        if not self.connector_config.recursive:
-            # fs.ls does not walk directories
-            # directories that are listed in cloud storage can cause problems because they are seen
-            # as 0byte files
-            return [
-                x.get("name")
-                for x in self.fs.ls(
-                    f"/{self.connector_config.path_without_protocol}",
-                    detail=True,
-                )
-                if x.get("size")
-            ]
-        else:
-            # fs.find will recursively walk directories
-            # "size" is a common key for all the cloud protocols with fs
-            return [
-                k
-                for k, v in self.fs.find(
-                    f"/{self.connector_config.path_without_protocol}",
-                    detail=True,
-                ).items()
-                if v.get("size")
-            ]
+        return f"/{self.connector_config.path_without_protocol}"
 
 
 @dataclass
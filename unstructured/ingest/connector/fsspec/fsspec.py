@@ -3,8 +3,8 @@ import json
 import os
 import typing as t
 from abc import ABC
-from contextlib import suppress
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path, PurePath
 
 from unstructured.ingest.enhanced_dataclass import EnhancedDataClassJsonMixin
@@ -16,10 +16,13 @@ from unstructured.ingest.error import (
 from unstructured.ingest.interfaces import (
     BaseConnectorConfig,
     BaseDestinationConnector,
+    BaseSessionHandle,
     BaseSingleIngestDoc,
     BaseSourceConnector,
+    ConfigSessionHandleMixin,
     FsspecConfig,
     IngestDocCleanupMixin,
+    IngestDocSessionHandleMixin,
     SourceConnectorCleanupMixin,
     SourceMetadata,
     WriteConfig,
@@ -34,6 +37,9 @@ from unstructured.utils import (
     requires_dependencies,
 )
 
+if t.TYPE_CHECKING:
+    from fsspec import AbstractFileSystem
+
 SUPPORTED_REMOTE_FSSPEC_PROTOCOLS = [
     "s3",
     "s3a",
@@ -47,13 +53,43 @@ SUPPORTED_REMOTE_FSSPEC_PROTOCOLS = [
 ]
 
 
+# Keys used by the different fsspec implementations in the details of a listed file
+CREATED_DATE_KEYS = ["created", "creation_time", "timeCreated", "created_at"]
+MODIFIED_DATE_KEYS = [
+    "LastModified",
+    "last_modified",
+    "updated",
+    "mtime",
+    "modified_at",
+    "server_modified",
+]
+VERSION_KEYS = ["ETag", "etag", "content_hash", "rev", "sha1"]
+
+
 @dataclass
-class SimpleFsspecConfig(FsspecConfig, BaseConnectorConfig):
-    pass
+class FsspecSessionHandle(BaseSessionHandle):
+    fs: "AbstractFileSystem"
 
 
 @dataclass
-class FsspecIngestDoc(IngestDocCleanupMixin, BaseSingleIngestDoc):
+class SimpleFsspecConfig(ConfigSessionHandleMixin, FsspecConfig, BaseConnectorConfig):
+    @requires_dependencies(["fsspec"])
+    def create_session_handle(self) -> FsspecSessionHandle:
+        from fsspec import get_filesystem_class
+
+        fs = get_filesystem_class(self.protocol)(**self.get_access_config())
+        return FsspecSessionHandle(fs=fs)
+
+
+def get_info_value(info: t.Dict[str, t.Any], keys: t.List[str]) -> t.Optional[str]:
+    for key in keys:
+        if value := info.get(key):
+            return value.isoformat() if isinstance(value, datetime) else str(value)
+    return None
+
+
+@dataclass
+class FsspecIngestDoc(IngestDocSessionHandleMixin, IngestDocCleanupMixin, BaseSingleIngestDoc):
     """Class encapsulating fetching a doc and writing processed results (but not
     doing the processing!).
 
@@ -95,50 +131,45 @@ class FsspecIngestDoc(IngestDocCleanupMixin, BaseSingleIngestDoc):
     @BaseSingleIngestDoc.skip_if_file_exists
     def get_file(self):
         """Fetches the file from the current filesystem and stores it locally."""
-        from fsspec import AbstractFileSystem, get_filesystem_class
-
         self._create_full_tmp_dir_path()
-        fs: AbstractFileSystem = get_filesystem_class(self.connector_config.protocol)(
-            **self.connector_config.get_access_config(),
-        )
-        self._get_file(fs=fs)
-        fs.get(rpath=self.remote_file_path, lpath=self._tmp_download_file().as_posix())
-        self.update_source_metadata()
+        self._get_file(fs=self.session_handle.fs)
+        # Metadata is usually already populated from the listing of the source connector
+        if self._source_metadata is None:
+            self.update_source_metadata()
 
     @SourceConnectionNetworkError.wrap
     def _get_file(self, fs):
         fs.get(rpath=self.remote_file_path, lpath=self._tmp_download_file().as_posix())
 
-    @requires_dependencies(["fsspec"])
-    def update_source_metadata(self):
-        from fsspec import AbstractFileSystem, get_filesystem_class
-
-        fs: AbstractFileSystem = get_filesystem_class(self.connector_config.protocol)(
-            **self.connector_config.get_access_config(),
-        )
-
-        date_created = None
-        with suppress(NotImplementedError):
-            date_created = fs.created(self.remote_file_path).isoformat()
+    def update_source_metadata_from_info(self, info: t.Dict[str, t.Any]):
+        """Populates the source metadata from the details fsspec returns for a file, which
+        are included when listing files so no additional requests are needed."""
+        version = get_info_value(info, VERSION_KEYS)
+        if version is None:
+            # Fall back to a hash of all details, like AbstractFileSystem.checksum() does
+            from fsspec.utils import tokenize
 
-        date_modified = None
-        with suppress(NotImplementedError):
-            date_modified = fs.modified(self.remote_file_path).isoformat()
-
-        version = (
-            fs.checksum(self.remote_file_path)
-            if self.connector_config.protocol != "gs"
-            else fs.info(self.remote_file_path).get("etag", "")
-        )
-        file_exists = fs.exists(self.remote_file_path)
+            version = str(int(tokenize(info), 16))
         self.source_metadata = SourceMetadata(
-            date_created=date_created,
-            date_modified=date_modified,
+            date_created=get_info_value(info, CREATED_DATE_KEYS),
+            date_modified=get_info_value(info, MODIFIED_DATE_KEYS),
             version=version,
             source_url=f"{self.connector_config.protocol}://{self.remote_file_path}",
-            exists=file_exists,
+            exists=True,
         )
 
+    @requires_dependencies(["fsspec"])
+    def update_source_metadata(self):
+        try:
+            info = self.session_handle.fs.info(self.remote_file_path)
+        except FileNotFoundError:
+            self.source_metadata = SourceMetadata(
+                source_url=f"{self.connector_config.protocol}://{self.remote_file_path}",
+                exists=False,
+            )
+            return
+        self.update_source_metadata_from_info(info)
+
     @property
     def filename(self):
         """The filename of the file after downloading from cloud"""
@@ -192,27 +223,32 @@ class FsspecSourceConnector(
                 f"No objects found in {self.connector_config.remote_url}.",
             )
 
-    def _list_files(self):
+    @property
+    def _list_path(self) -> str:
+        return self.connector_config.path_without_protocol
+
+    def _list_files(self) -> t.Iterator[t.Tuple[str, t.Dict[str, t.Any]]]:
+        """
+        Lazily yields the path and details of each file found. Recursive listings walk one
+        directory at a time rather than collecting every key with fs.find, so that docs can be
+        processed while the rest of the source is still being listed.
+        """
         if not self.connector_config.recursive:
             # fs.ls does not walk directories
-            # directories that are listed in cloud storage can cause problems
-            # because they are seen as 0 byte files
-            return [
-                x.get("name")
-                for x in self.fs.ls(self.connector_config.path_without_protocol, detail=True)
-                if x.get("size") > 0
+            listings: t.Iterable[t.Iterable[t.Dict[str, t.Any]]] = [
+                self.fs.ls(self._list_path, detail=True),
             ]
         else:
-            # fs.find will recursively walk directories
-            # "size" is a common key for all the cloud protocols with fs
-            return [
-                k
-                for k, v in self.fs.find(
-                    self.connector_config.path_without_protocol,
-                    detail=True,
-                ).items()
-                if v.get("size") > 0
-            ]
+            listings = (
+                files.values() for _, _, files in self.fs.walk(self._list_path, detail=True)
+            )
+        for listing in listings:
+            for info in listing:
+                # directories that are listed in cloud storage can cause problems
+                # because they are seen as 0 byte files
+                # "size" is a common key for all the cloud protocols with fs
+                if info.get("type") != "directory" and info.get("size"):
+                    yield info["name"], info
 
     def does_path_match_glob(self, path: str) -> bool:
         if self.connector_config.file_glob is None:
@@ -224,47 +260,42 @@ class FsspecSourceConnector(
         logger.debug(f"The file {path!r} is discarded as it does not match any given glob.")
         return False
 
-    def get_ingest_docs(self):
-        raw_files = self._list_files()
-        # If glob filters provided, use to fiter on filepaths
-        files = [f for f in raw_files if self.does_path_match_glob(f)]
-        # remove compressed files
+    def iter_ingest_docs(self) -> t.Iterator[BaseSingleIngestDoc]:
         compressed_file_ext = TAR_FILE_EXT + ZIP_FILE_EXT
-        compressed_files = []
-        uncompressed_files = []
-        docs: t.List[BaseSingleIngestDoc] = []
-        for file in files:
+        for file, info in self._list_files():
+            # If glob filters provided, use to fiter on filepaths
+            if not self.does_path_match_glob(file):
+                continue
             if any(file.endswith(ext) for ext in compressed_file_ext):
-                compressed_files.append(file)
-            else:
-                uncompressed_files.append(file)
-        docs.extend(
-            [
-                self.ingest_doc_cls(
-                    read_config=self.read_config,
-                    connector_config=self.connector_config,
-                    processor_config=self.processor_config,
-                    remote_file_path=file,
-                )
-                for file in uncompressed_files
-            ],
-        )
-        if not self.connector_config.uncompress:
-            return docs
-        for compressed_file in compressed_files:
-            compressed_doc = self.ingest_doc_cls(
+                if self.connector_config.uncompress:
+                    yield from self.iter_compressed_docs(file)
+                continue
+            doc = self.ingest_doc_cls(
                 read_config=self.read_config,
-                processor_config=self.processor_config,
                 connector_config=self.connector_config,
-                remote_file_path=compressed_file,
+                processor_config=self.processor_config,
+                remote_file_path=file,
             )
-            try:
-                local_ingest_docs = self.process_compressed_doc(doc=compressed_doc)
-                logger.info(f"adding {len(local_ingest_docs)} from {compressed_file}")
-                docs.extend(local_ingest_docs)
-            finally:
-                compressed_doc.cleanup_file()
-        return docs
+            # Avoid requesting the metadata of each file again when it's fetched
+            doc.update_source_metadata_from_info(info)
+            yield doc
+
+    def iter_compressed_docs(self, compressed_file: str) -> t.Iterator[BaseSingleIngestDoc]:
+        compressed_doc = self.ingest_doc_cls(
+            read_config=self.read_config,
+            processor_config=self.processor_config,
+            connector_config=self.connector_config,
+            remote_file_path=compressed_file,
+        )
+        try:
+            local_ingest_docs = self.process_compressed_doc(doc=compressed_doc)
+            logger.info(f"adding {len(local_ingest_docs)} from {compressed_file}")
+        finally:
+            compressed_doc.cleanup_file()
+        yield from local_ingest_docs
+
+    def get_ingest_docs(self):
+        return list(self.iter_ingest_docs())
 
 
 @dataclass
@@ -306,6 +337,15 @@ class FsspecDestinationConnector(BaseDestinationConnector):
             logger.error(f"failed to validate connection: {e}", exc_info=True)
             raise DestinationConnectionError(f"failed to validate connection: {e}")
 
+    def get_full_output_path(self, filename: t.Optional[str] = None) -> str:
+        output_folder = self.connector_config.path_without_protocol
+        output_folder = os.path.join(output_folder)  # Make sure folder ends with file seperator
+        filename = (
+            filename.strip(os.sep) if filename else filename
+        )  # Make sure filename doesn't begin with file seperator
+        output_path = str(PurePath(output_folder, filename)) if filename else output_folder
+        return f"{self.connector_config.protocol}://{output_path}"
+
     def write_dict(
         self,
         *args,
@@ -323,13 +363,7 @@ class FsspecDestinationConnector(BaseDestinationConnector):
 
         logger.info(f"Writing content using filesystem: {type(fs).__name__}")
 
-        output_folder = self.connector_config.path_without_protocol
-        output_folder = os.path.join(output_folder)  # Make sure folder ends with file seperator
-        filename = (
-            filename.strip(os.sep) if filename else filename
-        )  # Make sure filename doesn't begin with file seperator
-        output_path = str(PurePath(output_folder, filename)) if filename else output_folder
-        full_output_path = f"{self.connector_config.protocol}://{output_path}"
+        full_output_path = self.get_full_output_path(filename=filename)
         logger.debug(f"uploading content to {full_output_path}")
         write_text_configs = self.write_config.get_write_text_config() if self.write_config else {}
         fs.write_text(
@@ -347,3 +381,18 @@ class FsspecDestinationConnector(BaseDestinationConnector):
                 logger.debug(f"uploading content from {doc._output_filename}")
                 json_list = json.load(json_file)
                 self.write_dict(elements_dict=json_list, filename=filename)
+
+    def delete(self, docs: t.List[BaseSingleIngestDoc]) -> None:
+        from fsspec import AbstractFileSystem, get_filesystem_class
+
+        fs: AbstractFileSystem = get_filesystem_class(self.connector_config.protocol)(
+            **self.connector_config.get_access_config(),
+        )
+        for doc in docs:
+            # Unlike writes, deleting the whole output folder is never intended
+            if not doc.base_output_filename:
+                continue
+            full_output_path = self.get_full_output_path(filename=doc.base_output_filename)
+            if fs.exists(full_output_path):
+                logger.debug(f"deleting {full_output_path}")
+                fs.rm(full_output_path)
@@ -125,6 +125,9 @@ class GitHubIngestDoc(GitIngestDoc):
 @dataclass
 class GitHubSourceConnector(GitSourceConnector):
     connector_config: SimpleGitHubConfig
+    # GitHub's secondary rate limits allow 900 requests per minute to REST endpoints and
+    # are triggered by concurrent requests
+    max_fetch_concurrency: t.ClassVar[t.Optional[int]] = 5
 
     @requires_dependencies(["github"], extras="github")
     def check_connection(self):
@@ -252,6 +252,8 @@ class GoogleDriveSourceConnector(SourceConnectorCleanupMixin, BaseSourceConnecto
     """Objects of this class support fetching documents from Google Drive"""
 
     connector_config: SimpleGoogleDriveConfig
+    # Drive answers bursts of requests from the same user with userRateLimitExceeded errors
+    max_fetch_concurrency: t.ClassVar[t.Optional[int]] = 10
 
     def _list_objects(self, drive_id, recursive=False):
         files = []
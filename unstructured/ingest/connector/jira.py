@@ -347,6 +347,8 @@ class JiraSourceConnector(SourceConnectorCleanupMixin, BaseSourceConnector):
     """Fetches issues from projects in an Atlassian (Jira) Cloud instance."""
 
     connector_config: SimpleJiraConfig
+    # Jira Cloud rate limits requests per user, and answers bursts with 429s
+    max_fetch_concurrency: t.ClassVar[t.Optional[int]] = 5
     _jira: t.Optional["Jira"] = field(init=False, default=None)
 
     @property
@@ -105,16 +105,16 @@ class LocalSourceConnector(BaseSourceConnector):
     def initialize(self):
         """Not applicable to local file system"""
 
-    def _list_files(self):
+    def _list_files(self) -> t.Iterator[str]:
         if self.connector_config.input_path_is_file:
-            return glob.glob(f"{self.connector_config.input_path}")
+            return glob.iglob(f"{self.connector_config.input_path}")
         elif self.connector_config.recursive:
-            return glob.glob(
+            return glob.iglob(
                 f"{self.connector_config.input_path}/**",
                 recursive=self.connector_config.recursive,
             )
         else:
-            return glob.glob(f"{self.connector_config.input_path}/*")
+            return glob.iglob(f"{self.connector_config.input_path}/*")
 
     def does_path_match_glob(self, path: str) -> bool:
         if self.connector_config.file_glob is None:
@@ -126,14 +126,15 @@ class LocalSourceConnector(BaseSourceConnector):
         logger.debug(f"The file {path!r} is discarded as it does not match any given glob.")
         return False
 
+    def iter_ingest_docs(self) -> t.Iterator[LocalIngestDoc]:
+        for file in self._list_files():
+            if os.path.isfile(file) and self.does_path_match_glob(file):
+                yield self.ingest_doc_cls(
+                    connector_config=self.connector_config,
+                    processor_config=self.processor_config,
+                    read_config=self.read_config,
+                    path=file,
+                )
+
     def get_ingest_docs(self):
-        return [
-            self.ingest_doc_cls(
-                connector_config=self.connector_config,
-                processor_config=self.processor_config,
-                read_config=self.read_config,
-                path=file,
-            )
-            for file in self._list_files()
-            if os.path.isfile(file) and self.does_path_match_glob(file)
-        ]
+        return list(self.iter_ingest_docs())
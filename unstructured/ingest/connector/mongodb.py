@@ -1,4 +1,3 @@
-import json
 import typing as t
 from dataclasses import dataclass, field
 from urllib.parse import unquote_plus
@@ -13,6 +12,7 @@ from unstructured.ingest.interfaces import (
     WriteConfig,
 )
 from unstructured.ingest.logger import logger
+from unstructured.ingest.utils.data_prep import batch_generator, iter_elements_dicts
 from unstructured.utils import requires_dependencies
 
 if t.TYPE_CHECKING:
@@ -86,6 +86,7 @@ class SimpleMongoDBStorageConfig(BaseConnectorConfig):
 class MongoDBWriteConfig(WriteConfig):
     database: str
     collection: str
+    batch_size: int = 1000
 
 
 @dataclass
@@ -149,15 +150,13 @@ class MongoDBDestinationConnector(BaseDestinationConnector):
             raise WriteError(f"failed to write records: {e}")
 
     def write(self, docs: t.List[BaseSingleIngestDoc]) -> None:
-        json_list: t.List[t.Dict[str, t.Any]] = []
-        for doc in docs:
-            local_path = doc._output_filename
-            with open(local_path) as json_file:
-                json_content = json.load(json_file)
-                for content in json_content:
-                    self.conform_dict(data=content)
-                logger.info(
-                    f"appending {len(json_content)} json elements from content in {local_path}",
-                )
-                json_list.extend(json_content)
-        self.write_dict(elements_dict=json_list)
+        def conformed_elements_dicts() -> t.Iterator[t.Dict[str, t.Any]]:
+            for element_dict in iter_elements_dicts(docs):
+                self.conform_dict(data=element_dict)
+                yield element_dict
+
+        for batch in batch_generator(
+            conformed_elements_dicts(),
+            batch_size=self.write_config.batch_size,
+        ):
+            self.write_dict(elements_dict=batch)
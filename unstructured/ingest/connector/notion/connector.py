@@ -296,6 +296,8 @@ class NotionSourceConnector(SourceConnectorCleanupMixin, BaseSourceConnector):
 
     connector_config: SimpleNotionConfig
     retry_strategy_config: t.Optional[RetryStrategyConfig] = None
+    # Notion allows an average of three requests per second per integration
+    max_fetch_concurrency: t.ClassVar[t.Optional[int]] = 3
     _client: t.Optional["NotionClient"] = field(init=False, default=None)
 
     @property
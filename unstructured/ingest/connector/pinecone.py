@@ -17,6 +17,7 @@ from unstructured.ingest.interfaces import (
     WriteConfig,
 )
 from unstructured.ingest.logger import logger
+from unstructured.ingest.utils.data_prep import iter_elements_dicts
 from unstructured.staging.base import flatten_dict
 from unstructured.utils import requires_dependencies
 
@@ -101,7 +102,9 @@ class PineconeDestinationConnector(IngestDocSessionHandleMixin, BaseDestinationC
             f"Upserting {len(dict_list)} elements to destination "
             f"index at {self.connector_config.index_name}",
         )
+        self.upsert_batches(dict_list=dict_list)
 
+    def upsert_batches(self, dict_list: t.Iterable[t.Dict[str, t.Any]]) -> None:
         pinecone_batch_size = self.write_config.batch_size
 
         logger.info(f"using {self.write_config.num_processes} processes to upload")
@@ -113,37 +116,39 @@ class PineconeDestinationConnector(IngestDocSessionHandleMixin, BaseDestinationC
             with mp.Pool(
                 processes=self.write_config.num_processes,
             ) as pool:
-                pool.map(self.upsert_batch, list(self.chunks(dict_list, pinecone_batch_size)))
+                # Hand the pool a group of chunks at a time, rather than all of them at once,
+                # to only ever hold num_processes chunks in memory
+                for chunks in self.chunks(
+                    self.chunks(dict_list, pinecone_batch_size),
+                    self.write_config.num_processes,
+                ):
+                    pool.map(self.upsert_batch, chunks)
+
+    @staticmethod
+    def conform_dict(element: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        # we assign embeddings to "values", and other fields to "metadata"
+        # While flatten_dict enables indexing on various fields,
+        # element_serialized enables easily reloading the element object to memory.
+        # element_serialized is formed without text/embeddings to avoid data bloating.
+        return {
+            "id": str(uuid.uuid4()),
+            "values": element.pop("embeddings", None),
+            "metadata": {
+                "text": element.pop("text", None),
+                "element_serialized": json.dumps(element),
+                **flatten_dict(
+                    element,
+                    separator="-",
+                    flatten_lists=True,
+                ),
+            },
+        }
 
     def write(self, docs: t.List[BaseIngestDoc]) -> None:
-        dict_list: t.List[t.Dict[str, t.Any]] = []
-        for doc in docs:
-            local_path = doc._output_filename
-            with open(local_path) as json_file:
-                dict_content = json.load(json_file)
-
-                # we assign embeddings to "values", and other fields to "metadata"
-                dict_content = [
-                    # While flatten_dict enables indexing on various fields,
-                    # element_serialized enables easily reloading the element object to memory.
-                    # element_serialized is formed without text/embeddings to avoid data bloating.
-                    {
-                        "id": str(uuid.uuid4()),
-                        "values": element.pop("embeddings", None),
-                        "metadata": {
-                            "text": element.pop("text", None),
-                            "element_serialized": json.dumps(element),
-                            **flatten_dict(
-                                element,
-                                separator="-",
-                                flatten_lists=True,
-                            ),
-                        },
-                    }
-                    for element in dict_content
-                ]
-                logger.info(
-                    f"appending {len(dict_content)} json elements from content in {local_path}",
-                )
-                dict_list.extend(dict_content)
-        self.write_dict(dict_list=dict_list)
+        logger.info(
+            f"Upserting elements from {len(docs)} docs to destination "
+            f"index at {self.connector_config.index_name}",
+        )
+        self.upsert_batches(
+            dict_list=(self.conform_dict(element) for element in iter_elements_dicts(docs)),
+        )
@@ -12,6 +12,7 @@ from unstructured.ingest.interfaces import (
     WriteConfig,
 )
 from unstructured.ingest.logger import logger
+from unstructured.ingest.utils.data_prep import iter_elements_dicts
 from unstructured.utils import requires_dependencies
 
 if t.TYPE_CHECKING:
@@ -152,6 +153,10 @@ class WeaviateDestinationConnector(BaseDestinationConnector):
             f"class {self.connector_config.class_name} "
             f"at {self.connector_config.host_url}",
         )
+        self.add_data_objects(json_list=json_list)
+
+    def add_data_objects(self, json_list: t.Iterable[t.Dict[str, t.Any]]) -> None:
+        """The weaviate batch uploads the objects every batch_size objects added to it."""
         self.client.batch.configure(batch_size=self.write_config.batch_size)
         with self.client.batch as b:
             for e in json_list:
@@ -165,13 +170,9 @@ class WeaviateDestinationConnector(BaseDestinationConnector):
 
     @requires_dependencies(["weaviate"], extras="weaviate")
     def write(self, docs: t.List[BaseIngestDoc]) -> None:
-        json_list: t.List[t.Dict[str, t.Any]] = []
-        for doc in docs:
-            local_path = doc._output_filename
-            with open(local_path) as json_file:
-                json_content = json.load(json_file)
-                logger.info(
-                    f"appending {len(json_content)} json elements from content in {local_path}",
-                )
-                json_list.extend(json_content)
-        self.write_dict(json_list=json_list)
+        logger.info(
+            f"writing objects from {len(docs)} docs to destination "
+            f"class {self.connector_config.class_name} "
+            f"at {self.connector_config.host_url}",
+        )
+        self.add_data_objects(json_list=iter_elements_dicts(docs))
@@ -10,7 +10,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
-from dataclasses_json import DataClassJsonMixin
+from dataclasses_json import DataClassJsonMixin, config
 from dataclasses_json.core import Json, _decode_dataclass
 
 from unstructured.chunking.title import chunk_by_title
@@ -21,7 +21,7 @@ from unstructured.ingest.enhanced_dataclass import EnhancedDataClassJsonMixin, e
 from unstructured.ingest.enhanced_dataclass.core import _asdict
 from unstructured.ingest.error import PartitionError, SourceConnectionError
 from unstructured.ingest.logger import logger
-from unstructured.partition.api import partition_via_api
+from unstructured.partition.api import PartitionApiClient
 from unstructured.partition.auto import partition
 from unstructured.staging.base import convert_to_dict, flatten_dict
 
@@ -79,6 +79,11 @@ class RetryStrategyConfig(BaseConfig):
     max_retry_time: t.Optional[float] = None
 
 
+# module-level variable to store api clients, so that each process reuses its connections to
+# the api across docs
+api_clients: t.Dict[t.Tuple[t.Any, ...], PartitionApiClient] = {}
+
+
 @dataclass
 class PartitionConfig(BaseConfig):
     # where to write structured data outputs
@@ -97,17 +102,63 @@ class PartitionConfig(BaseConfig):
     partition_endpoint: t.Optional[str] = "https://api.unstructured.io/general/v0/general"
     partition_by_api: bool = False
     api_key: t.Optional[str] = enhanced_field(default=None, sensitive=True)
+    api_max_concurrency: int = 4
+    api_max_retries: int = 3
+    api_split_pdf_page_range: t.Optional[int] = None
     hi_res_model_name: t.Optional[str] = None
 
+    def get_api_client(self) -> PartitionApiClient:
+        key = (
+            self.partition_endpoint,
+            self.api_key,
+            self.api_max_concurrency,
+            self.api_max_retries,
+        )
+        if key not in api_clients:
+            api_clients[key] = PartitionApiClient(
+                api_url=self.partition_endpoint,
+                api_key=self.api_key or "",
+                max_concurrency=self.api_max_concurrency,
+                max_retries=self.api_max_retries,
+            )
+        return api_clients[key]
+
 
 @dataclass
 class ProcessorConfig(BaseConfig):
     reprocess: bool = False
     verbose: bool = False
     work_dir: str = str((Path.home() / ".cache" / "unstructured" / "ingest" / "pipeline").resolve())
+    # in MiB, the cached outputs in the work dir are pruned down to this at the end of a run
+    work_dir_max_size: t.Optional[int] = None
+    # in days, cached outputs in the work dir not used for this long are pruned
+    work_dir_max_age: t.Optional[float] = None
     output_dir: str = "structured-output"
     num_processes: int = 2
+    max_tasks_per_worker: t.Optional[int] = None
+    # in MiB
+    max_worker_memory: t.Optional[int] = None
+    # in seconds
+    doc_timeout: t.Optional[float] = None
     raise_on_error: bool = False
+    doc_state_backend: str = "sqlite"
+    content_cache: bool = False
+    incremental: bool = False
+    incremental_delete: bool = False
+    intermediate_format: str = "json"
+    streaming: bool = False
+    stream_buffer_size: int = 10
+    write_batch_size: int = 50
+    resume: bool = False
+    metrics_output: t.Optional[str] = None
+    metrics_prometheus_file: t.Optional[str] = None
+    # Limits on requests to each service, shared by all processes using the same work dir
+    source_requests_per_second: t.Optional[float] = None
+    source_max_concurrency: t.Optional[int] = None
+    destination_requests_per_second: t.Optional[float] = None
+    destination_max_concurrency: t.Optional[int] = None
+    embedding_requests_per_second: t.Optional[float] = None
+    embedding_max_concurrency: t.Optional[int] = None
 
 
 @dataclass
@@ -180,6 +231,19 @@ class ReadConfig(BaseConfig):
     preserve_downloads: bool = False
     download_only: bool = False
     max_docs: t.Optional[int] = None
+    fetch_concurrency: t.Optional[int] = None
+    # only process the docs that hash to shard_index out of num_shards
+    num_shards: int = 1
+    shard_index: int = 0
+
+    def __post_init__(self):
+        if self.num_shards < 1:
+            raise ValueError(f"num_shards must be at least 1, got {self.num_shards}")
+        if not 0 <= self.shard_index < self.num_shards:
+            raise ValueError(
+                f"shard_index must be between 0 and num_shards - 1 ({self.num_shards - 1}), "
+                f"got {self.shard_index}",
+            )
 
 
 @dataclass
@@ -187,6 +251,15 @@ class EmbeddingConfig(BaseConfig):
     provider: str
     api_key: t.Optional[str] = enhanced_field(default=None, sensitive=True)
     model_name: t.Optional[str] = None
+    # Elements of different docs are embedded together in batches bounded by both
+    max_batch_docs: int = 50
+    max_batch_chars: int = 200000
+    cache: bool = False
+    cache_max_entries: t.Optional[int] = 100000
+
+    def get_cache_namespace(self) -> str:
+        """Identifies the embedding model, e.g. to key cached embeddings."""
+        return f"{self.provider}:{self.model_name or ''}"
 
     def get_embedder(self) -> BaseEmbeddingEncoder:
         kwargs = {}
@@ -453,6 +526,19 @@ class BaseSingleIngestDoc(BaseIngestDoc, IngestDocJsonMixin, ABC):
             self.update_source_metadata()
         return self.source_metadata.permissions_data  # type: ignore
 
+    @property
+    def data_source_metadata(self) -> DataSourceMetadata:
+        """The metadata about the source document added to each of its elements."""
+        return DataSourceMetadata(
+            url=self.source_url,
+            version=self.version,
+            record_locator=self.record_locator,
+            date_created=self.date_created,
+            date_modified=self.date_modified,
+            date_processed=self.date_processed,
+            permissions_data=self.permissions_data,
+        )
+
     @abstractmethod
     def cleanup_file(self):
         """Removes the local copy the file (or anything else) after successful processing."""
@@ -507,15 +593,7 @@ class BaseSingleIngestDoc(BaseIngestDoc, IngestDocJsonMixin, ABC):
             logger.debug("Using local partition")
             elements = partition(
                 filename=str(self.filename),
-                data_source_metadata=DataSourceMetadata(
-                    url=self.source_url,
-                    version=self.version,
-                    record_locator=self.record_locator,
-                    date_created=self.date_created,
-                    date_modified=self.date_modified,
-                    date_processed=self.date_processed,
-                    permissions_data=self.permissions_data,
-                ),
+                data_source_metadata=self.data_source_metadata,
                 **partition_kwargs,
             )
         else:
@@ -523,14 +601,10 @@ class BaseSingleIngestDoc(BaseIngestDoc, IngestDocJsonMixin, ABC):
 
             logger.debug(f"Using remote partition ({endpoint})")
 
-            passthrough_partition_kwargs = {
-                k: str(v) for k, v in partition_kwargs.items() if v is not None
-            }
-            elements = partition_via_api(
+            elements = partition_config.get_api_client().partition(
                 filename=str(self.filename),
-                api_key=partition_config.api_key,
-                api_url=endpoint,
-                **passthrough_partition_kwargs,
+                split_pdf_page_range=partition_config.api_split_pdf_page_range,
+                **partition_kwargs,
             )
             # TODO: add m_data_source_metadata to unstructured-api pipeline_api and then
             # pass the stringified json here
@@ -547,7 +621,16 @@ class BaseSingleIngestDoc(BaseIngestDoc, IngestDocJsonMixin, ABC):
         logger.info(f"Processing {self.filename}")
 
         isd_elems_raw = self.partition_file(partition_config=partition_config, **partition_kwargs)
-        isd_elems = convert_to_dict(isd_elems_raw)
+        return self.process_elements(elements=isd_elems_raw, partition_config=partition_config)
+
+    def process_elements(
+        self,
+        elements: t.List[Element],
+        partition_config: PartitionConfig,
+    ) -> t.List[t.Dict[str, t.Any]]:
+        """Converts the partitioned elements to dictionaries, applying the field and metadata
+        filters from the partition config."""
+        isd_elems = convert_to_dict(elements)
 
         self.isd_elems_no_filename: t.List[t.Dict[str, t.Any]] = []
         for elem in isd_elems:
@@ -612,6 +695,8 @@ class BaseSourceConnector(BaseConnector, ABC):
     processor_config: ProcessorConfig
     read_config: ReadConfig
     connector_config: BaseConnectorConfig
+    # Caps read_config.fetch_concurrency for sources that throttle concurrent requests
+    max_fetch_concurrency: t.ClassVar[t.Optional[int]] = None
 
     @abstractmethod
     def cleanup(self, cur_dir=None):
@@ -632,6 +717,12 @@ class BaseSourceConnector(BaseConnector, ABC):
         rather each IngestDoc is capable of fetching its content (in another process)
         with IngestDoc.get_file()."""
 
+    def iter_ingest_docs(self) -> t.Iterator[BaseIngestDoc]:
+        """Lazily yields all ingest docs, so that the pipeline can start processing them
+        while the source is still being listed. Connectors that can list their content
+        incrementally should override this, by default it wraps get_ingest_docs()."""
+        yield from self.get_ingest_docs()
+
 
 @dataclass
 class BaseDestinationConnector(BaseConnector, ABC):
@@ -655,6 +746,20 @@ class BaseDestinationConnector(BaseConnector, ABC):
     def write_dict(self, *args, elements_dict: t.List[t.Dict[str, t.Any]], **kwargs) -> None:
         pass
 
+    def get_append_connector(self) -> "BaseDestinationConnector":
+        """
+        The connector to write any later batch of a run with, once a first batch was written.
+        Destinations with a write mode that would fail on, or replace, the content written
+        earlier in the same run should return one that appends to it instead.
+        """
+        return self
+
+    def delete(self, docs: t.List[BaseSingleIngestDoc]) -> None:
+        """Removes any content previously written for the docs from the destination."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support deleting content from the destination",
+        )
+
     def write_elements(self, elements: t.List[Element], *args, **kwargs) -> None:
         elements_dict = [e.to_dict() for e in elements]
         self.write_dict(*args, elements_dict=elements_dict, **kwargs)
@@ -743,7 +848,12 @@ class ConfigSessionHandleMixin:
 @dataclass
 class IngestDocSessionHandleMixin:
     connector_config: ConfigSessionHandleMixin
-    _session_handle: t.Optional[BaseSessionHandle] = field(default=None, init=False)
+    # Session handles are local to a process and never serialized with the doc
+    _session_handle: t.Optional[BaseSessionHandle] = field(
+        default=None,
+        init=False,
+        metadata=config(encoder=lambda handle: None, exclude=lambda handle: True),
+    )
 
     @property
     def session_handle(self):
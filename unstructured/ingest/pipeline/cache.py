@@ -0,0 +1,181 @@
+import os
+import time
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+from unstructured.ingest.logger import logger
+from unstructured.ingest.pipeline.utils import delete_sqlite
+
+# The directories within the work dir that pipeline nodes cache their outputs in, relative
+# to it. The content cache lives within the partitioned dir but is tracked on its own.
+CACHE_DIRS = ["partitioned", "partitioned/content", "chunked", "embedded"]
+# The SQLite databases kept in the work dir, relative to it. Directories hold a database per
+# run, or per destination. Each database is evicted as a whole, along with the files WAL
+# mode keeps next to it, the per-run ones are only left behind by runs that crashed.
+SQLITE_STORES = [
+    "doc_state",
+    "metrics",
+    "journals",
+    "manifests",
+    "embeddings.sqlite3",
+    "partition_timings.sqlite3",
+    "rate_limits.sqlite3",
+]
+# Incremental runs rely on the manifests to tell which docs changed since they were last
+# written, so they are reported but never evicted
+UNEVICTABLE_STORES = ["manifests"]
+# Files used more recently than this, in seconds, are never evicted, since a run still in
+# progress may yet read them
+MIN_EVICTION_AGE = 60 * 60
+
+
+@dataclass
+class CacheFile:
+    path: str
+    size: int
+    # When a run last wrote or reused the file, cache hits touch its modification time
+    # since access times aren't reliably kept by every filesystem
+    last_used: float
+    # Whether the file is a SQLite database, whose size and last use include its WAL files
+    sqlite: bool = False
+
+
+def touch_cache_file(path: t.Union[str, Path]) -> None:
+    """Marks a cached output as just used, so that it's the last to be evicted."""
+    try:
+        os.utime(path)
+    except OSError as e:
+        logger.debug(f"failed to touch {path}: {e}")
+
+
+def get_sqlite_file(path: t.Union[str, Path]) -> t.Optional[CacheFile]:
+    """The SQLite database at the path along with its WAL files, None if it doesn't exist."""
+    stats = []
+    for suffix in ["", "-wal", "-shm"]:
+        try:
+            stats.append(os.stat(f"{path}{suffix}"))
+        except FileNotFoundError:
+            if not suffix:
+                return None
+    return CacheFile(
+        path=str(path),
+        size=sum(stat.st_size for stat in stats),
+        last_used=max(stat.st_mtime for stat in stats),
+        sqlite=True,
+    )
+
+
+def iter_sqlite_files(work_dir: t.Union[str, Path]) -> t.Iterator[t.Tuple[str, CacheFile]]:
+    """Yields every SQLite database in the work dir along with the store it belongs to."""
+    for store in SQLITE_STORES:
+        store_path = Path(work_dir) / store
+        if store_path.is_dir():
+            paths = [path for path in store_path.iterdir() if path.suffix == ".sqlite3"]
+        else:
+            paths = [store_path]
+        for path in paths:
+            if sqlite_file := get_sqlite_file(path):
+                yield store, sqlite_file
+
+
+def iter_cache_files(work_dir: t.Union[str, Path]) -> t.Iterator[t.Tuple[str, CacheFile]]:
+    """
+    Yields every cached output and SQLite database in the work dir along with the cache dir
+    or store it's in.
+    """
+    for cache_dir in CACHE_DIRS:
+        try:
+            entries = os.scandir(Path(work_dir) / cache_dir)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    # Evicted or replaced meanwhile
+                    continue
+                yield cache_dir, CacheFile(
+                    path=entry.path,
+                    size=stat.st_size,
+                    last_used=stat.st_mtime,
+                )
+    yield from iter_sqlite_files(work_dir)
+
+
+def get_cache_stats(work_dir: t.Union[str, Path]) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """
+    How many files, and bytes, each cache dir and SQLite store holds and when they were first
+    and last used.
+    """
+    stats: t.Dict[str, t.Dict[str, t.Any]] = {
+        cache_dir: {"files": 0, "bytes": 0, "oldest": None, "newest": None}
+        for cache_dir in CACHE_DIRS + SQLITE_STORES
+    }
+    for cache_dir, cache_file in iter_cache_files(work_dir):
+        dir_stats = stats[cache_dir]
+        dir_stats["files"] += 1
+        dir_stats["bytes"] += cache_file.size
+        if dir_stats["oldest"] is None or cache_file.last_used < dir_stats["oldest"]:
+            dir_stats["oldest"] = cache_file.last_used
+        if dir_stats["newest"] is None or cache_file.last_used > dir_stats["newest"]:
+            dir_stats["newest"] = cache_file.last_used
+    return stats
+
+
+def prune_cache(
+    work_dir: t.Union[str, Path],
+    max_size: t.Optional[int] = None,
+    max_age: t.Optional[float] = None,
+    min_age: float = MIN_EVICTION_AGE,
+    dry_run: bool = False,
+) -> t.Dict[str, int]:
+    """
+    Evicts the cached outputs and SQLite databases in the work dir not used for longer than
+    max_age seconds, then the least recently used ones until all of them together take up at
+    most max_size bytes. Those used within the last min_age seconds are kept regardless, so
+    the cache may stay above max_size. The manifests of incremental runs are never evicted,
+    nor counted. Returns how many files, and bytes, were evicted and how many bytes remain.
+    """
+    now = time.time()
+    cache_files = sorted(
+        (
+            cache_file
+            for cache_dir, cache_file in iter_cache_files(work_dir)
+            if cache_dir not in UNEVICTABLE_STORES
+        ),
+        key=lambda cache_file: cache_file.last_used,
+    )
+    evicted: t.List[CacheFile] = []
+    unexpired: t.List[CacheFile] = []
+    for cache_file in cache_files:
+        age = now - cache_file.last_used
+        if max_age is not None and age > max(max_age, min_age):
+            evicted.append(cache_file)
+        else:
+            unexpired.append(cache_file)
+    remaining_bytes = sum(cache_file.size for cache_file in unexpired)
+    if max_size is not None:
+        # Least recently used first
+        for cache_file in unexpired:
+            if remaining_bytes <= max_size or now - cache_file.last_used < min_age:
+                break
+            evicted.append(cache_file)
+            remaining_bytes -= cache_file.size
+    if not dry_run:
+        for cache_file in evicted:
+            try:
+                if cache_file.sqlite:
+                    delete_sqlite(cache_file.path)
+                else:
+                    Path(cache_file.path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"failed to evict {cache_file.path}: {e}")
+    return {
+        "files": len(evicted),
+        "bytes": sum(cache_file.size for cache_file in evicted),
+        "remaining_bytes": remaining_bytes,
+    }
@@ -1,12 +1,28 @@
+import itertools
 import typing as t
 from dataclasses import dataclass
 
 from unstructured.ingest.pipeline.interfaces import DocFactoryNode
+from unstructured.ingest.utils.sharding import get_shard_index
 
 
 @dataclass
 class DocFactory(DocFactoryNode):
-    def run(self, *args, **kwargs) -> t.Iterable[dict]:
-        docs = self.source_doc_connector.get_ingest_docs()
-        json_docs = [doc.to_dict() for doc in docs]
-        return json_docs
+    def run(self, *args, **kwargs) -> t.Iterator[dict]:
+        """
+        Lazily yields each ingest doc as the source connector lists it. Since max_docs is
+        applied before anything is materialized, listing stops once enough docs were found.
+        When the run is one of several shards, only the docs of its shard are kept, and
+        max_docs applies to those.
+        """
+        read_config = self.source_doc_connector.read_config
+        docs = self.source_doc_connector.iter_ingest_docs()
+        if read_config.num_shards > 1:
+            docs = (
+                doc
+                for doc in docs
+                if get_shard_index(doc.unique_id, read_config.num_shards) == read_config.shard_index
+            )
+        if max_docs := read_config.max_docs:
+            docs = itertools.islice(docs, max_docs)
+        return (doc.to_dict() for doc in docs)
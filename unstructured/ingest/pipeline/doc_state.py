@@ -0,0 +1,166 @@
+import multiprocessing as mp
+import pickle
+import sqlite3
+import typing as t
+import uuid
+from abc import ABC, abstractmethod
+from multiprocessing.managers import DictProxy, SyncManager
+from pathlib import Path
+
+from unstructured.ingest.pipeline.utils import (
+    SqliteConnectionMixin,
+    delete_sqlite,
+    join_connector_config,
+    split_connector_config,
+)
+
+DOC_STATE_BACKENDS = ["sqlite", "manager"]
+# SQLite limits the number of host parameters in a single statement
+SQLITE_MAX_BATCH_SIZE = 500
+
+
+class BaseDocStateStore(ABC):
+    """
+    Abstract Base Class for the store that maps the hashes used to name the files written by
+    each pipeline node back to the serialized ingest doc they were generated from. The store
+    is shared by the main process and every worker process.
+    """
+
+    @abstractmethod
+    def get_many(self, keys: t.List[str]) -> t.List[dict]:
+        """Returns the docs for all keys, raising a KeyError if any of them is missing."""
+
+    @abstractmethod
+    def update(self, docs: t.Dict[str, dict]) -> None:
+        """Inserts or replaces all docs in a single batch."""
+
+    @abstractmethod
+    def __contains__(self, key: str) -> bool:
+        pass
+
+    def __getitem__(self, key: str) -> dict:
+        return self.get_many([key])[0]
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        self.update({key: value})
+
+    def close(self) -> None:
+        """Releases any resources held by the store in the current process."""
+
+    def delete(self) -> None:
+        """Closes the store and removes the docs it holds, the store only lives for the run."""
+        self.close()
+
+
+class ManagerDocStateStore(BaseDocStateStore):
+    """
+    Keeps all docs in memory in a multiprocessing manager process. Every access is a round
+    trip to the manager process and nothing survives the end of the run.
+    """
+
+    def __init__(self):
+        self._manager: t.Optional[SyncManager] = mp.Manager()
+        self.docs: DictProxy = self._manager.dict()
+
+    def __getstate__(self):
+        # The manager itself is owned by the parent process, workers only need the proxy
+        state = self.__dict__.copy()
+        state["_manager"] = None
+        return state
+
+    def get_many(self, keys: t.List[str]) -> t.List[dict]:
+        return [self.docs[key] for key in keys]
+
+    def update(self, docs: t.Dict[str, dict]) -> None:
+        self.docs.update(docs)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.docs
+
+    def close(self) -> None:
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+class SqliteDocStateStore(SqliteConnectionMixin, BaseDocStateStore):
+    """
+    Persists all docs in a SQLite database in WAL mode, which every process opens directly
+    so that lookups don't go through another process. Each run gets a database of its own,
+    which is deleted at the end of the run. When given the connector config of the run, it
+    is split out of every doc rather than written to disk, and put back when read.
+    """
+
+    def __init__(self, path: t.Union[str, Path], connector_config: t.Optional[dict] = None):
+        self.path = str(path)
+        self.connector_config = connector_config
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # Create the table up front so readers never race the first writer
+        self.connection
+
+    def create_tables(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS ingest_docs "
+            "(doc_hash TEXT PRIMARY KEY, doc BLOB NOT NULL)",
+        )
+
+    def get_many(self, keys: t.List[str]) -> t.List[dict]:
+        docs: t.Dict[str, dict] = {}
+        for i in range(0, len(keys), SQLITE_MAX_BATCH_SIZE):
+            batch = keys[i : i + SQLITE_MAX_BATCH_SIZE]  # noqa: E203
+            rows = self.connection.execute(
+                "SELECT doc_hash, doc FROM ingest_docs "
+                f"WHERE doc_hash IN ({', '.join('?' * len(batch))})",
+                batch,
+            )
+            docs.update({doc_hash: self.load(doc) for doc_hash, doc in rows})
+        missing = [key for key in keys if key not in docs]
+        if missing:
+            raise KeyError(", ".join(missing))
+        return [docs[key] for key in keys]
+
+    def update(self, docs: t.Dict[str, dict]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO ingest_docs (doc_hash, doc) VALUES (?, ?)",
+                [(doc_hash, self.dump(doc)) for doc_hash, doc in docs.items()],
+            )
+
+    def dump(self, doc: dict) -> bytes:
+        if self.connector_config is None:
+            return pickle.dumps(dict(doc))
+        return pickle.dumps(split_connector_config(doc))
+
+    def load(self, data: bytes) -> dict:
+        doc = pickle.loads(data)
+        if self.connector_config is None:
+            return doc
+        return join_connector_config(doc, self.connector_config)
+
+    def __contains__(self, key: str) -> bool:
+        row = self.connection.execute(
+            "SELECT 1 FROM ingest_docs WHERE doc_hash = ?",
+            (key,),
+        ).fetchone()
+        return row is not None
+
+    def delete(self) -> None:
+        self.close()
+        delete_sqlite(self.path)
+
+
+def get_doc_state_store(
+    backend: str,
+    work_dir: str,
+    connector_config: t.Optional[dict] = None,
+) -> BaseDocStateStore:
+    if backend == "sqlite":
+        return SqliteDocStateStore(
+            path=Path(work_dir) / "doc_state" / f"{uuid.uuid4().hex}.sqlite3",
+            connector_config=connector_config,
+        )
+    if backend == "manager":
+        return ManagerDocStateStore()
+    raise ValueError(
+        f"doc state backend not recognized: {backend}, expected one of {DOC_STATE_BACKENDS}"
+    )
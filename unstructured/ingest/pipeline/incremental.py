@@ -0,0 +1,60 @@
+import typing as t
+from dataclasses import dataclass
+
+from unstructured.ingest.connector.registry import create_ingest_doc_from_dict
+from unstructured.ingest.interfaces import BaseSingleIngestDoc
+from unstructured.ingest.logger import logger
+from unstructured.ingest.pipeline.interfaces import FilterNode
+from unstructured.ingest.pipeline.manifest import get_source_version
+
+
+@dataclass
+class SourceVersionFilter(FilterNode):
+    """
+    Fetches only the source metadata of each doc and drops those whose version matches
+    the one recorded in the manifest when they were last written, so that unchanged docs
+    are never downloaded. Docs that no longer exist on the source are only kept if they
+    were previously written and deletes were requested, so the pipeline can remove them
+    from the destination.
+    """
+
+    def run(self, ingest_doc_dict: dict) -> t.Optional[dict]:
+        try:
+            manifest = self.pipeline_context.source_manifest
+            if manifest is None:
+                raise ValueError("source manifest never initialized")
+            doc = create_ingest_doc_from_dict(ingest_doc_dict)
+            # Batches are only expanded into single docs once their content is downloaded
+            if not isinstance(doc, BaseSingleIngestDoc):
+                return ingest_doc_dict
+            # Some connectors already populate the metadata when listing docs
+            if doc._source_metadata is None:
+                self.call_source(doc, doc.update_source_metadata)
+            ingest_doc_dict.update(doc.to_dict())
+            unique_id = ingest_doc_dict["unique_id"]
+            entry = manifest.get(unique_id)
+            if doc.exists is False:
+                if entry is not None and self.pipeline_context.incremental_delete:
+                    logger.info(f"{unique_id} no longer exists on the source, deleting")
+                    return ingest_doc_dict
+                logger.debug(f"{unique_id} no longer exists on the source, skipping")
+                return None
+            version = get_source_version(ingest_doc_dict)
+            if (
+                not self.pipeline_context.reprocess
+                and entry is not None
+                and version is not None
+                and entry.version == version
+            ):
+                logger.info(f"{unique_id} unchanged since version {version}, skipping")
+                return None
+            return ingest_doc_dict
+        except Exception as e:
+            if self.pipeline_context.raise_on_error:
+                raise
+            # Rather than dropping the doc, let it go through the pipeline as usual
+            logger.error(
+                f"failed to check source version of doc: {ingest_doc_dict}, {e}",
+                exc_info=True,
+            )
+            return ingest_doc_dict
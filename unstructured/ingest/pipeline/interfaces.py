@@ -1,11 +1,14 @@
+import contextlib
+import functools
 import hashlib
 import json
 import logging
 import multiprocessing as mp
+import time
 import typing as t
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from multiprocessing.managers import DictProxy
+from multiprocessing.pool import Pool
 from pathlib import Path
 
 import backoff
@@ -22,6 +25,18 @@ from unstructured.ingest.interfaces import (
     RetryStrategyConfig,
 )
 from unstructured.ingest.logger import ingest_log_streaming_init, logger
+from unstructured.ingest.pipeline.doc_state import BaseDocStateStore
+from unstructured.ingest.pipeline.intermediate import get_intermediate_suffix
+from unstructured.ingest.pipeline.journal import CheckpointJournal, JournalEntry
+from unstructured.ingest.pipeline.manifest import SourceVersionManifest
+from unstructured.ingest.pipeline.metrics import DocMetric, MetricsStore, get_size, measure_docs
+from unstructured.ingest.pipeline.rate_limit import get_rate_limiter
+from unstructured.ingest.pipeline.utils import (
+    get_doc_hash_from_path,
+    get_ingest_doc_hash,
+    map_with_pool,
+)
+from unstructured.ingest.pipeline.watchdog import report_to_parent
 
 
 @dataclass
@@ -31,18 +46,86 @@ class PipelineContext(ProcessorConfig):
     """
 
     def __post_init__(self):
-        self._ingest_docs_map: t.Optional[DictProxy] = None
+        self._ingest_docs_map: t.Optional[BaseDocStateStore] = None
+        self._worker_pool: t.Optional[Pool] = None
+        self._fetch_pool: t.Optional[Pool] = None
+        self._source_manifest: t.Optional[SourceVersionManifest] = None
+        self._journal: t.Optional[CheckpointJournal] = None
+        self._metrics: t.Optional[MetricsStore] = None
+
+    def __getstate__(self):
+        # The pools are owned by the parent process and can't be sent to its workers
+        state = self.__dict__.copy()
+        state["_worker_pool"] = None
+        state["_fetch_pool"] = None
+        return state
 
     @property
-    def ingest_docs_map(self) -> DictProxy:
+    def ingest_docs_map(self) -> BaseDocStateStore:
         if self._ingest_docs_map is None:
             raise ValueError("ingest_docs_map never initialized")
         return self._ingest_docs_map
 
     @ingest_docs_map.setter
-    def ingest_docs_map(self, value: DictProxy):
+    def ingest_docs_map(self, value: BaseDocStateStore):
         self._ingest_docs_map = value
 
+    @property
+    def worker_pool(self) -> t.Optional[Pool]:
+        return self._worker_pool
+
+    @worker_pool.setter
+    def worker_pool(self, value: t.Optional[Pool]):
+        self._worker_pool = value
+
+    @property
+    def fetch_pool(self) -> t.Optional[Pool]:
+        """Pool of threads in the parent process used for downloading, if configured."""
+        return self._fetch_pool
+
+    @fetch_pool.setter
+    def fetch_pool(self, value: t.Optional[Pool]):
+        self._fetch_pool = value
+
+    @property
+    def source_manifest(self) -> t.Optional[SourceVersionManifest]:
+        """Only set when running incrementally."""
+        return self._source_manifest
+
+    @source_manifest.setter
+    def source_manifest(self, value: t.Optional[SourceVersionManifest]):
+        self._source_manifest = value
+
+    @property
+    def journal(self) -> t.Optional[CheckpointJournal]:
+        return self._journal
+
+    @journal.setter
+    def journal(self, value: t.Optional[CheckpointJournal]):
+        self._journal = value
+
+    @property
+    def metrics(self) -> t.Optional[MetricsStore]:
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, value: t.Optional[MetricsStore]):
+        self._metrics = value
+
+
+def init_worker(log_level: int, nodes: t.List["PipelineNode"]):
+    """
+    Initializer for each process in the pool shared across pipeline nodes. Sets up logging
+    and gives each node the chance to load any expensive resources once per process rather
+    than once per doc.
+    """
+    ingest_log_streaming_init(log_level)
+    for node in nodes:
+        try:
+            node.warm_up()
+        except Exception as e:
+            logger.warning(f"failed to warm up {node.__class__.__name__}: {e}", exc_info=True)
+
 
 @dataclass
 class PipelineNode(DataClassJsonMixin, ABC):
@@ -65,9 +148,11 @@ class PipelineNode(DataClassJsonMixin, ABC):
                 self.result = self.run(iterable)
             else:
                 self.result = self.run()
+        elif pool := self.get_pool():
+            self.result = self.map_run(self.get_map_func(pool), iterable)
         elif self.pipeline_context.num_processes == 1:
             if iterable:
-                self.result = [self.run(it) for it in iterable]
+                self.result = self.map_run(map, iterable)
             else:
                 self.result = self.run()
         else:
@@ -76,7 +161,7 @@ class PipelineNode(DataClassJsonMixin, ABC):
                 initializer=ingest_log_streaming_init,
                 initargs=(logging.DEBUG if self.pipeline_context.verbose else logging.INFO,),
             ) as pool:
-                self.result = pool.map(self.run, iterable)
+                self.result = self.map_run(self.get_map_func(pool), iterable)
         # Remove None which may be caused by failed docs that didn't raise an error
         if isinstance(self.result, t.Iterable):
             self.result = [r for r in self.result if r is not None]
@@ -85,6 +170,88 @@ class PipelineNode(DataClassJsonMixin, ABC):
     def supported_multiprocessing(self) -> bool:
         return True
 
+    def get_map_func(
+        self,
+        pool: Pool,
+    ) -> t.Callable[[t.Callable[[t.Any], t.Any], t.Iterable[t.Any]], t.List[t.Any]]:
+        """Maps over the pool, failing the items whose worker is lost rather than hanging."""
+        return functools.partial(map_with_pool, pool, on_lost=self.fail_lost)
+
+    def fail_lost(self, item: t.Any, error: Exception) -> None:
+        """
+        Fails the item, a doc or a batch of them, whose worker was lost while the node ran
+        over it, e.g. killed by the OOM killer or for running past the doc timeout.
+        """
+        if self.pipeline_context.raise_on_error:
+            raise error
+        items = item if isinstance(item, list) else [item]
+        logger.error(f"{self.__class__.__name__} failed on {len(items)} docs: {error}")
+        for single_item in items:
+            self.record_failure(single_item, error)
+
+    def map_run(
+        self,
+        map_func: t.Callable[[t.Callable[[t.Any], t.Any], t.Iterable[t.Any]], t.Iterable[t.Any]],
+        iterable: t.Iterable[t.Any],
+    ) -> t.List[t.Any]:
+        """Runs the node over each item with map_func, e.g. the map of a pool of workers."""
+        return list(map_func(functools.partial(self.measured_run, queued_at=time.time()), iterable))
+
+    def measured_run(self, item: t.Any, queued_at: t.Optional[float] = None) -> t.Any:
+        """Runs the node over a single doc, recording its metrics if they're collected."""
+        report_to_parent("node", self.__class__.__name__)
+        with self.measure([item], queued_at=queued_at) as metrics:
+            result = self.run(item)
+            for metric in metrics:
+                metric.bytes_out = get_size(result)
+        return result
+
+    def measure(
+        self,
+        items: t.List[t.Any],
+        queued_at: t.Optional[float] = None,
+    ) -> t.ContextManager[t.List[DocMetric]]:
+        """Measures the node running over the docs, given as dicts or paths of their json."""
+        metrics = []
+        if self.pipeline_context.metrics is not None:
+            metrics = [self.get_doc_metric(item) for item in items]
+        return measure_docs(self.pipeline_context.metrics, metrics=metrics, queued_at=queued_at)
+
+    def get_ingest_doc_dict(self, item: t.Any) -> t.Optional[dict]:
+        """The doc the node runs over, given as a dict or the path of its json, if known."""
+        if isinstance(item, dict):
+            return item
+        if isinstance(item, str):
+            try:
+                return self.pipeline_context.ingest_docs_map[get_doc_hash_from_path(item)]
+            except Exception:
+                return None
+        return None
+
+    def get_doc_metric(self, item: t.Any) -> DocMetric:
+        metric = DocMetric(node=self.__class__.__name__)
+        ingest_doc_dict = self.get_ingest_doc_dict(item)
+        if isinstance(item, str):
+            metric.bytes_in = get_size(item)
+            if ingest_doc_dict is None:
+                metric.doc_id = item
+        if ingest_doc_dict is not None:
+            metric.doc_hash = get_ingest_doc_hash(ingest_doc_dict)
+            metric.doc_id = ingest_doc_dict.get("unique_id")
+            if isinstance(item, dict):
+                metric.bytes_in = get_size(ingest_doc_dict.get("filename"))
+        return metric
+
+    def get_pool(self) -> t.Optional[Pool]:
+        """The pool shared across the run that this node should map its docs over, if any."""
+        return self.pipeline_context.worker_pool
+
+    def warm_up(self):
+        """
+        Called once in each worker process of the shared pool, used to load any resources
+        that are expensive to create so they can be reused across docs.
+        """
+
     @abstractmethod
     def run(self, *args, **kwargs) -> t.Optional[t.Any]:
         pass
@@ -98,6 +265,65 @@ class PipelineNode(DataClassJsonMixin, ABC):
     def get_path(self) -> t.Optional[Path]:
         return None
 
+    def get_intermediate_suffix(self) -> str:
+        """The suffix of the files this node writes for the following nodes to read."""
+        return get_intermediate_suffix(self.pipeline_context.intermediate_format)
+
+    def limit_requests(
+        self,
+        service: str,
+        requests_per_second: t.Optional[float] = None,
+        max_concurrency: t.Optional[int] = None,
+    ) -> t.ContextManager[None]:
+        """Waits for the limits on requests to the service, if any, to allow one more."""
+        if requests_per_second is None and max_concurrency is None:
+            return contextlib.nullcontext()
+        return get_rate_limiter(self.pipeline_context.work_dir).limit(
+            service,
+            requests_per_second=requests_per_second,
+            max_concurrency=max_concurrency,
+        )
+
+    def call_source(self, doc: t.Any, func: t.Callable[[], t.Any]) -> t.Any:
+        """Calls func, which makes requests to the source of the doc, within its limits."""
+        with self.limit_requests(
+            f"source:{getattr(doc, 'registry_name', doc.__class__.__name__)}",
+            requests_per_second=self.pipeline_context.source_requests_per_second,
+            max_concurrency=self.pipeline_context.source_max_concurrency,
+        ):
+            return func()
+
+    def record_checkpoint(
+        self,
+        stage: str,
+        doc_hash: str,
+        doc: t.Optional[dict] = None,
+        path: t.Optional[str] = None,
+        error: t.Optional[str] = None,
+    ):
+        """Records in the run's journal, if any, that the doc completed the stage."""
+        if journal := self.pipeline_context.journal:
+            journal.record(
+                stage,
+                [JournalEntry(doc_hash=doc_hash, doc=doc, path=path, error=error)],
+            )
+
+    def record_failure(self, item: t.Any, error: Exception):
+        """Records in the run's journal, if any, that the node failed on the doc."""
+        journal = self.pipeline_context.journal
+        if journal is None or (ingest_doc_dict := self.get_ingest_doc_dict(item)) is None:
+            return
+        journal.record(
+            "failed",
+            [
+                JournalEntry(
+                    doc_hash=get_ingest_doc_hash(ingest_doc_dict),
+                    error=f"{type(error).__name__}: {error}",
+                    node=getattr(error, "node", None) or self.__class__.__name__,
+                ),
+            ],
+        )
+
 
 @dataclass
 class DocFactoryNode(PipelineNode):
@@ -123,6 +349,26 @@ class DocFactoryNode(PipelineNode):
         return False
 
 
+@dataclass
+class FilterNode(PipelineNode):
+    """
+    Encapsulated logic to drop ingest docs that don't need to be processed before any
+    content associated with them is downloaded
+    """
+
+    def initialize(self):
+        logger.info("Running filter node to skip ingest docs that don't need processing")
+        super().initialize()
+
+    def get_pool(self) -> t.Optional[Pool]:
+        # Filtering typically only needs to fetch metadata from the source
+        return self.pipeline_context.fetch_pool or super().get_pool()
+
+    @abstractmethod
+    def run(self, ingest_doc_dict: dict) -> t.Optional[dict]:
+        pass
+
+
 @dataclass
 class SourceNode(PipelineNode):
     """
@@ -151,6 +397,9 @@ class SourceNode(PipelineNode):
         logger.info("Running source node to download data associated with ingest docs")
         super().initialize()
 
+    def get_pool(self) -> t.Optional[Pool]:
+        return self.pipeline_context.fetch_pool or super().get_pool()
+
     @abstractmethod
     def run(self, ingest_doc_json: str) -> t.Optional[str]:
         pass
@@ -173,8 +422,24 @@ class PartitionNode(PipelineNode):
         )
         super().initialize()
 
+    def warm_up(self):
+        if self.partition_config.partition_by_api or self.partition_config.strategy != "hi_res":
+            return
+        from unstructured_inference.models.base import get_model
+
+        from unstructured.partition.pdf_image.pdf import default_hi_res_model
+
+        model_name = self.partition_config.hi_res_model_name or default_hi_res_model(
+            self.partition_config.pdf_infer_table_structure,
+        )
+        logger.debug(f"Loading layout model {model_name} in worker")
+        get_model(model_name=model_name)
+
     def create_hash(self) -> str:
         hash_dict = self.partition_config.to_dict()
+        # How requests to the api are made doesn't change the elements
+        for key in ["api_max_concurrency", "api_max_retries"]:
+            hash_dict.pop(key, None)
         hash_dict["partition_kwargs"] = self.partition_kwargs
         return hashlib.sha256(json.dumps(hash_dict, sort_keys=True).encode()).hexdigest()[:32]
 
@@ -0,0 +1,122 @@
+import base64
+import gzip
+import json
+import struct
+import typing as t
+from pathlib import Path
+
+from unstructured.utils import dependency_exists, requires_dependencies
+
+ORJSON_AVAILABLE = dependency_exists("orjson")
+if ORJSON_AVAILABLE:
+    import orjson
+
+INTERMEDIATE_FORMATS = ["json", "jsonl", "jsonl.gz", "jsonl.zst"]
+# Embeddings are stored as base64 encoded little endian float64s under this key instead
+PACKED_EMBEDDINGS_KEY = "embeddings_packed"
+
+
+def get_intermediate_suffix(intermediate_format: str) -> str:
+    if intermediate_format not in INTERMEDIATE_FORMATS:
+        raise ValueError(
+            f"intermediate format not recognized: {intermediate_format}, "
+            f"expected one of {INTERMEDIATE_FORMATS}",
+        )
+    return f".{intermediate_format}"
+
+
+def pack_embeddings(element_dict: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    embeddings = element_dict.get("embeddings")
+    if not isinstance(embeddings, list) or not all(isinstance(e, float) for e in embeddings):
+        return element_dict
+    packed = base64.b64encode(struct.pack(f"<{len(embeddings)}d", *embeddings)).decode()
+    # Keep the position of the key so that the rendered json is unchanged
+    return {
+        (PACKED_EMBEDDINGS_KEY if key == "embeddings" else key): (
+            packed if key == "embeddings" else value
+        )
+        for key, value in element_dict.items()
+    }
+
+
+def unpack_embeddings(element_dict: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    packed = element_dict.get(PACKED_EMBEDDINGS_KEY)
+    if packed is None:
+        return element_dict
+    data = base64.b64decode(packed)
+    embeddings = list(struct.unpack(f"<{len(data) // 8}d", data))
+    return {
+        ("embeddings" if key == PACKED_EMBEDDINGS_KEY else key): (
+            embeddings if key == PACKED_EMBEDDINGS_KEY else value
+        )
+        for key, value in element_dict.items()
+    }
+
+
+def dumps_line(element_dict: t.Dict[str, t.Any], sort_keys: bool = False) -> bytes:
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(element_dict, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+        except TypeError:
+            # e.g. integers that don't fit in 64 bits, which the json module supports
+            pass
+    return json.dumps(element_dict, ensure_ascii=False, sort_keys=sort_keys).encode("utf8")
+
+
+def loads_line(line: bytes) -> t.Dict[str, t.Any]:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+@requires_dependencies(["zstandard"])
+def open_zstd(path: t.Union[str, Path], mode: str) -> t.BinaryIO:
+    import zstandard
+
+    return zstandard.open(path, mode)
+
+
+def open_intermediate(path: t.Union[str, Path], mode: str) -> t.BinaryIO:
+    """Opens an intermediate file in binary mode, (de)compressing it according to its suffix."""
+    path = str(path)
+    if path.endswith(".gz"):
+        # Without a fixed mtime in the header, the same content would hash differently
+        return gzip.GzipFile(filename=path, mode=mode, mtime=0)  # type: ignore
+    if path.endswith(".zst"):
+        return open_zstd(path, mode)
+    return open(path, mode)  # type: ignore # noqa: SIM115
+
+
+def write_elements_dicts(
+    path: t.Union[str, Path],
+    elements_dicts: t.List[t.Dict[str, t.Any]],
+    sort_keys: bool = False,
+) -> None:
+    """
+    Writes the element dicts passed between pipeline nodes in the format given by the
+    suffix of the path. Plain json is the same as the final output, while json lines are
+    encoded with orjson, if installed, and store embeddings as packed binary.
+    """
+    if str(path).endswith(".json"):
+        with open(path, "w", encoding="utf8") as output_f:
+            json.dump(elements_dicts, output_f, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+        return
+    with open_intermediate(path, "wb") as output_f:
+        for element_dict in elements_dicts:
+            output_f.write(dumps_line(pack_embeddings(element_dict), sort_keys=sort_keys))
+            output_f.write(b"\n")
+
+
+def read_elements_dicts(path: t.Union[str, Path]) -> t.List[t.Dict[str, t.Any]]:
+    if str(path).endswith(".json"):
+        with open(path, encoding="utf8") as input_f:
+            return json.load(input_f)
+    with open_intermediate(path, "rb") as input_f:
+        return [unpack_embeddings(loads_line(line)) for line in input_f if line.strip()]
+
+
+def render_elements_json(path: t.Union[str, Path], output_path: t.Union[str, Path]) -> None:
+    """Renders an intermediate file as the user facing json output."""
+    elements_dicts = read_elements_dicts(path)
+    with open(output_path, "w", encoding="utf8") as output_f:
+        json.dump(elements_dicts, output_f, ensure_ascii=False, indent=2)
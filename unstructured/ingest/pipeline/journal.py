@@ -0,0 +1,221 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+from unstructured.ingest.pipeline.doc_state import SQLITE_MAX_BATCH_SIZE
+from unstructured.ingest.pipeline.utils import (
+    SqliteConnectionMixin,
+    delete_sqlite,
+    join_connector_config,
+    split_connector_config,
+)
+
+JOURNAL_STAGES = ["listed", "fetched", "partitioned", "chunked", "embedded", "written", "failed"]
+# Recorded once the source was listed in full, without a doc
+LISTING_COMPLETE = "listing_complete"
+
+
+def get_journal_path(work_dir: str, run: t.Dict[str, t.Any]) -> Path:
+    run_hash = hashlib.sha256(
+        json.dumps(run, sort_keys=True, default=str).encode(),
+    ).hexdigest()[:32]
+    return Path(work_dir) / "journals" / f"{run_hash}.sqlite3"
+
+
+@dataclass
+class JournalEntry:
+    doc_hash: str
+    doc: t.Optional[dict] = None
+    path: t.Optional[str] = None
+    error: t.Optional[str] = None
+    # The pipeline node a doc failed in
+    node: t.Optional[str] = None
+
+
+class CheckpointJournal(SqliteConnectionMixin):
+    """
+    Append-only record of each stage every doc completed during a run, persisted in a SQLite
+    database in WAL mode so that every worker process can record the docs it processed and
+    the record survives the run crashing. A run started with resume picks up from it. When
+    given the connector config of the run, it is split out of every doc rather than written
+    to disk, and put back when read.
+    """
+
+    def __init__(self, path: t.Union[str, Path], connector_config: t.Optional[dict] = None):
+        self.path = str(path)
+        self.connector_config = connector_config
+        self._lock_connection: t.Optional[sqlite3.Connection] = None
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        # Only the process running the pipeline holds the lock
+        state["_lock_connection"] = None
+        return state
+
+    @property
+    def lock_path(self) -> str:
+        return f"{self.path}.lock"
+
+    def lock(self) -> None:
+        """
+        Holds an exclusive lock on the journal until it's closed, so that another run of the
+        same command fails rather than clearing, or recording into, the journal of this one.
+        The lock is released when the process dies, so crashed runs can still be resumed.
+        """
+        connection = sqlite3.connect(self.lock_path, timeout=0, isolation_level=None)
+        try:
+            connection.execute("BEGIN EXCLUSIVE")
+        except sqlite3.OperationalError:
+            connection.close()
+            raise RuntimeError(
+                f"the checkpoint journal {self.path} is in use by another run of the same "
+                "command, wait for it to complete or use a different work dir",
+            )
+        self._lock_connection = connection
+
+    def create_tables(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS journal "
+            "(seq INTEGER PRIMARY KEY AUTOINCREMENT, stage TEXT NOT NULL, doc_hash TEXT, "
+            "doc BLOB, path TEXT, error TEXT, node TEXT)",
+        )
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(journal)")]
+        if "node" not in columns:
+            # Journals recorded before failures were attributed to a node
+            connection.execute("ALTER TABLE journal ADD COLUMN node TEXT")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS journal_stage_doc_hash ON journal (stage, doc_hash)",
+        )
+
+    def record(self, stage: str, entries: t.List[JournalEntry]) -> None:
+        if stage not in JOURNAL_STAGES:
+            raise ValueError(f"journal stage not recognized: {stage}, expected {JOURNAL_STAGES}")
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO journal (stage, doc_hash, doc, path, error, node) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        stage,
+                        entry.doc_hash,
+                        None if entry.doc is None else self.dump(entry.doc),
+                        entry.path,
+                        entry.error,
+                        entry.node,
+                    )
+                    for entry in entries
+                ],
+            )
+
+    def record_listing_complete(self) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO journal (stage) VALUES (?)",
+                (LISTING_COMPLETE,),
+            )
+
+    def is_listing_complete(self) -> bool:
+        row = self.connection.execute(
+            "SELECT 1 FROM journal WHERE stage = ? LIMIT 1",
+            (LISTING_COMPLETE,),
+        ).fetchone()
+        return row is not None
+
+    def get_many(self, stage: str, doc_hashes: t.List[str]) -> t.Dict[str, JournalEntry]:
+        """Returns the latest entry recorded at the stage for each doc, omitting the others."""
+        entries: t.Dict[str, JournalEntry] = {}
+        for i in range(0, len(doc_hashes), SQLITE_MAX_BATCH_SIZE):
+            batch = doc_hashes[i : i + SQLITE_MAX_BATCH_SIZE]  # noqa: E203
+            rows = self.connection.execute(
+                "SELECT doc_hash, doc, path FROM journal WHERE seq IN "
+                "(SELECT MAX(seq) FROM journal WHERE stage = ? "
+                f"AND doc_hash IN ({', '.join('?' * len(batch))}) GROUP BY doc_hash)",
+                [stage, *batch],
+            )
+            entries.update(
+                {
+                    doc_hash: JournalEntry(
+                        doc_hash=doc_hash,
+                        doc=None if doc is None else self.load(doc),
+                        path=path,
+                    )
+                    for doc_hash, doc, path in rows
+                },
+            )
+        return entries
+
+    def iter_listed_docs(self) -> t.Iterator[dict]:
+        """Lazily yields each listed doc once, in the order they were first listed."""
+        last_seq = 0
+        while True:
+            # Read a page at a time since the run keeps appending to the journal meanwhile
+            rows = self.connection.execute(
+                "SELECT seq, doc FROM journal AS listed WHERE stage = 'listed' AND seq > ? "
+                "AND NOT EXISTS (SELECT 1 FROM journal WHERE stage = 'listed' "
+                "AND doc_hash = listed.doc_hash AND seq < listed.seq) "
+                "ORDER BY seq LIMIT ?",
+                (last_seq, SQLITE_MAX_BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                return
+            for last_seq, doc in rows:
+                yield self.load(doc)
+
+    def count_docs(self) -> t.Dict[str, int]:
+        """How many distinct docs completed each stage."""
+        rows = self.connection.execute(
+            "SELECT stage, COUNT(DISTINCT doc_hash) FROM journal "
+            "WHERE doc_hash IS NOT NULL GROUP BY stage",
+        )
+        counts = dict(rows.fetchall())
+        return {stage: counts.get(stage, 0) for stage in JOURNAL_STAGES}
+
+    def get_failures(self) -> t.Dict[str, JournalEntry]:
+        """
+        The last failure of each doc, with its error and the node it failed in, unless the
+        doc completed a stage since, i.e. when a resumed run processed it.
+        """
+        rows = self.connection.execute(
+            "SELECT doc_hash, error, node FROM journal AS failed WHERE stage = 'failed' "
+            "AND NOT EXISTS (SELECT 1 FROM journal WHERE doc_hash = failed.doc_hash "
+            "AND stage != 'listed' AND seq > failed.seq)",
+        )
+        return {
+            doc_hash: JournalEntry(doc_hash=doc_hash, error=error, node=node)
+            for doc_hash, error, node in rows
+        }
+
+    def dump(self, doc: dict) -> bytes:
+        if self.connector_config is None:
+            return pickle.dumps(dict(doc))
+        return pickle.dumps(split_connector_config(doc))
+
+    def load(self, data: bytes) -> dict:
+        doc = pickle.loads(data)
+        if self.connector_config is None:
+            return doc
+        return join_connector_config(doc, self.connector_config)
+
+    def clear(self) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM journal")
+
+    def close(self) -> None:
+        super().close()
+        if (connection := getattr(self, "_lock_connection", None)) is not None:
+            self._lock_connection = None
+            connection.rollback()
+            connection.close()
+
+    def delete(self) -> None:
+        # Removed while still locked, another run can't lock the file about to go away
+        if self._lock_connection is not None:
+            Path(self.lock_path).unlink(missing_ok=True)
+        self.close()
+        delete_sqlite(self.path)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import sqlite3
+import typing as t
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from unstructured.ingest.pipeline.doc_state import SQLITE_MAX_BATCH_SIZE
+from unstructured.ingest.pipeline.utils import SqliteConnectionMixin, split_connector_config
+
+
+def get_source_version(ingest_doc_dict: dict) -> t.Optional[str]:
+    """
+    The version of a serialized ingest doc as reported by the source system, falling back
+    to the date it was last modified for connectors that don't expose an explicit version.
+    """
+    return ingest_doc_dict.get("version") or ingest_doc_dict.get("date_modified")
+
+
+def get_manifest_path(work_dir: str, destination: t.Dict[str, t.Any]) -> Path:
+    destination_hash = hashlib.sha256(
+        json.dumps(destination, sort_keys=True, default=str).encode(),
+    ).hexdigest()[:32]
+    return Path(work_dir) / "manifests" / f"{destination_hash}.sqlite3"
+
+
+@dataclass
+class ManifestEntry:
+    unique_id: str
+    version: t.Optional[str] = None
+    output_hash: t.Optional[str] = None
+    # The serialized ingest doc, without its connector config, so that docs that are no
+    # longer listed by the source can be deleted from the destination
+    doc: t.Optional[dict] = field(default=None, compare=False)
+
+
+class SourceVersionManifest(SqliteConnectionMixin):
+    """
+    Tracks the source version and a hash of the final output of every doc that was
+    successfully written to a destination, persisted in a SQLite database so that the
+    next run against the same destination only has to process docs that changed.
+    """
+
+    def __init__(self, path: t.Union[str, Path]):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection
+
+    def create_tables(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS manifest "
+            "(unique_id TEXT PRIMARY KEY, version TEXT, output_hash TEXT, doc TEXT)",
+        )
+        # Manifests written before docs were recorded in them
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(manifest)")]
+        if "doc" not in columns:
+            connection.execute("ALTER TABLE manifest ADD COLUMN doc TEXT")
+
+    def get_many(self, unique_ids: t.List[str]) -> t.Dict[str, ManifestEntry]:
+        """Returns the entries found for the unique ids, omitting any that are missing."""
+        entries: t.Dict[str, ManifestEntry] = {}
+        for i in range(0, len(unique_ids), SQLITE_MAX_BATCH_SIZE):
+            batch = unique_ids[i : i + SQLITE_MAX_BATCH_SIZE]  # noqa: E203
+            rows = self.connection.execute(
+                "SELECT unique_id, version, output_hash FROM manifest "
+                f"WHERE unique_id IN ({', '.join('?' * len(batch))})",
+                batch,
+            )
+            entries.update({row[0]: ManifestEntry(*row) for row in rows})
+        return entries
+
+    def get(self, unique_id: str) -> t.Optional[ManifestEntry]:
+        return self.get_many([unique_id]).get(unique_id)
+
+    def update(self, entries: t.List[ManifestEntry]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO manifest (unique_id, version, output_hash, doc) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        e.unique_id,
+                        e.version,
+                        e.output_hash,
+                        json.dumps(split_connector_config(e.doc)) if e.doc else None,
+                    )
+                    for e in entries
+                ],
+            )
+
+    def iter_missing(self, unique_ids: t.Set[str]) -> t.Iterator[ManifestEntry]:
+        """Yields the entries, along with their doc, of every doc not in unique_ids."""
+        rows = self.connection.execute(
+            "SELECT unique_id, version, output_hash, doc FROM manifest",
+        ).fetchall()
+        for unique_id, version, output_hash, doc in rows:
+            if unique_id in unique_ids:
+                continue
+            yield ManifestEntry(
+                unique_id=unique_id,
+                version=version,
+                output_hash=output_hash,
+                doc=json.loads(doc) if doc else None,
+            )
+
+    def remove(self, unique_ids: t.List[str]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM manifest WHERE unique_id = ?",
+                [(unique_id,) for unique_id in unique_ids],
+            )
@@ -0,0 +1,255 @@
+import contextvars
+import csv
+import json
+import os
+import sqlite3
+import time
+import typing as t
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+from tabulate import tabulate
+
+from unstructured.ingest.pipeline.utils import SqliteConnectionMixin
+
+# The metrics of the docs the current thread is running a node over, so that the node can
+# note what only it knows about them, e.g. that it found its output already cached
+current_metrics: contextvars.ContextVar[t.Optional[t.List["DocMetric"]]] = contextvars.ContextVar(
+    "current_metrics",
+    default=None,
+)
+
+PROMETHEUS_PREFIX = "unstructured_ingest"
+
+
+@dataclass
+class DocMetric:
+    node: str
+    doc_hash: t.Optional[str] = None
+    doc_id: t.Optional[str] = None
+    pid: int = 0
+    started_at: float = 0.0
+    wall_seconds: float = 0.0
+    # CPU time of the whole process, which includes any threads running meanwhile
+    cpu_seconds: float = 0.0
+    # How long the doc waited for a worker once the node started, if known
+    queue_wait_seconds: t.Optional[float] = None
+    bytes_in: int = 0
+    bytes_out: int = 0
+    elements: t.Optional[int] = None
+    cache_hit: bool = False
+    failed: bool = False
+
+
+def note_doc_metric(index: int = 0, **kwargs):
+    """
+    Updates the metric of the doc at the index of those being measured in the current
+    thread, does nothing when no metrics are being collected.
+    """
+    metrics = current_metrics.get()
+    if metrics is None or index >= len(metrics):
+        return
+    for k, v in kwargs.items():
+        setattr(metrics[index], k, v)
+
+
+def get_size(paths: t.Any) -> int:
+    """The total size in bytes of the file or files, ignoring anything that isn't one."""
+    if isinstance(paths, (str, Path)):
+        try:
+            return os.path.getsize(paths)
+        except OSError:
+            return 0
+    if isinstance(paths, (list, tuple)):
+        return sum(get_size(path) for path in paths)
+    return 0
+
+
+class MetricsStore(SqliteConnectionMixin):
+    """
+    Metrics of every doc each pipeline node ran over during a run, persisted in a SQLite
+    database in WAL mode so that every worker process can record its own.
+    """
+
+    def __init__(self, path: t.Union[str, Path]):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection
+
+    def create_tables(self, connection: sqlite3.Connection) -> None:
+        columns = ", ".join(f.name for f in fields(DocMetric))
+        connection.execute(f"CREATE TABLE IF NOT EXISTS metrics ({columns})")
+
+    def record(self, metrics: t.List[DocMetric]) -> None:
+        names = [f.name for f in fields(DocMetric)]
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO metrics ({', '.join(names)}) "
+                f"VALUES ({', '.join('?' * len(names))})",
+                [[getattr(metric, name) for name in names] for metric in metrics],
+            )
+
+    def iter_metrics(self) -> t.Iterator[DocMetric]:
+        names = [f.name for f in fields(DocMetric)]
+        rows = self.connection.execute(f"SELECT {', '.join(names)} FROM metrics ORDER BY rowid")
+        for row in rows:
+            metric = DocMetric(**dict(zip(names, row)))
+            metric.cache_hit = bool(metric.cache_hit)
+            metric.failed = bool(metric.failed)
+            yield metric
+
+    def summarize(self) -> t.List[t.Dict[str, t.Any]]:
+        """Totals per node, in the order the nodes first recorded a doc."""
+        rows = self.connection.execute(
+            "SELECT node, COUNT(*), SUM(failed), SUM(cache_hit), SUM(wall_seconds), "
+            "MAX(wall_seconds), SUM(cpu_seconds), SUM(queue_wait_seconds), SUM(bytes_in), "
+            "SUM(bytes_out), SUM(elements) FROM metrics GROUP BY node ORDER BY MIN(rowid)",
+        )
+        return [
+            {
+                "node": node,
+                "docs": docs,
+                "failed": failed,
+                "cache_hits": cache_hits,
+                "wall_seconds": wall_seconds,
+                "max_wall_seconds": max_wall_seconds,
+                "cpu_seconds": cpu_seconds,
+                "queue_wait_seconds": queue_wait_seconds or 0.0,
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+                "elements": elements or 0,
+            }
+            for (
+                node,
+                docs,
+                failed,
+                cache_hits,
+                wall_seconds,
+                max_wall_seconds,
+                cpu_seconds,
+                queue_wait_seconds,
+                bytes_in,
+                bytes_out,
+                elements,
+            ) in rows
+        ]
+
+
+@contextmanager
+def measure_docs(
+    store: t.Optional[MetricsStore],
+    metrics: t.List[DocMetric],
+    queued_at: t.Optional[float] = None,
+) -> t.Generator[t.List[DocMetric], None, None]:
+    """
+    Measures the node running over the docs together, splitting the time evenly between
+    them, and records their metrics in the store once done. The docs are flagged as failed
+    if an error is raised.
+    """
+    if store is None:
+        yield metrics
+        return
+    started_at = time.time()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    token = current_metrics.set(metrics)
+    try:
+        yield metrics
+    except BaseException:
+        for metric in metrics:
+            metric.failed = True
+        raise
+    finally:
+        current_metrics.reset(token)
+        wall_seconds = (time.perf_counter() - start_wall) / max(1, len(metrics))
+        cpu_seconds = (time.process_time() - start_cpu) / max(1, len(metrics))
+        for metric in metrics:
+            metric.pid = os.getpid()
+            metric.started_at = started_at
+            metric.wall_seconds = wall_seconds
+            metric.cpu_seconds = cpu_seconds
+            if queued_at is not None:
+                metric.queue_wait_seconds = max(0.0, started_at - queued_at)
+        store.record(metrics)
+
+
+def write_metrics_report(metrics: t.Iterable[DocMetric], path: t.Union[str, Path]):
+    """Writes the metric of every doc as CSV if the path ends with .csv, as JSON lines if not."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        if str(path).endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(DocMetric)])
+            writer.writeheader()
+            for metric in metrics:
+                writer.writerow(asdict(metric))
+        else:
+            for metric in metrics:
+                f.write(json.dumps(asdict(metric)) + "\n")
+
+
+def write_prometheus_textfile(summary: t.List[t.Dict[str, t.Any]], path: t.Union[str, Path]):
+    """
+    Writes the totals per node in the Prometheus text format, e.g. for the textfile
+    collector of the node exporter. The file is replaced atomically so that it's never
+    scraped half written.
+    """
+    descriptions = {
+        "docs": "Docs each pipeline node ran over.",
+        "failed": "Docs each pipeline node failed on.",
+        "cache_hits": "Docs whose output each pipeline node found already cached.",
+        "wall_seconds": "Wall time each pipeline node spent on docs.",
+        "cpu_seconds": "CPU time each pipeline node spent on docs.",
+        "queue_wait_seconds": "Time docs waited for a worker of each pipeline node.",
+        "bytes_in": "Size of the files each pipeline node read.",
+        "bytes_out": "Size of the files each pipeline node wrote.",
+        "elements": "Elements each pipeline node output.",
+    }
+    lines = []
+    for key, description in descriptions.items():
+        name = f"{PROMETHEUS_PREFIX}_{key}_total"
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for row in summary:
+            lines.append(f'{name}{{node="{row["node"]}"}} {row[key]}')
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def format_summary_table(summary: t.List[t.Dict[str, t.Any]]) -> str:
+    return tabulate(
+        [
+            [
+                row["node"],
+                row["docs"],
+                row["failed"],
+                row["cache_hits"],
+                row["wall_seconds"],
+                row["wall_seconds"] / row["docs"],
+                row["max_wall_seconds"],
+                row["cpu_seconds"],
+                row["queue_wait_seconds"],
+                row["bytes_in"] / 2**20,
+                row["bytes_out"] / 2**20,
+                row["elements"],
+            ]
+            for row in summary
+        ],
+        headers=[
+            "node",
+            "docs",
+            "failed",
+            "cached",
+            "wall s",
+            "mean s",
+            "max s",
+            "cpu s",
+            "queue s",
+            "MiB in",
+            "MiB out",
+            "elements",
+        ],
+        floatfmt=".2f",
+    )
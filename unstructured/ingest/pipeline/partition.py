@@ -1,29 +1,135 @@
+import functools
 import hashlib
 import json
+import os
+import time
 import typing as t
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from unstructured.documents.elements import Element
 from unstructured.ingest.connector.registry import create_ingest_doc_from_dict
 from unstructured.ingest.error import PartitionError
+from unstructured.ingest.interfaces import BaseSingleIngestDoc
 from unstructured.ingest.logger import logger
+from unstructured.ingest.pipeline.cache import touch_cache_file
 from unstructured.ingest.pipeline.interfaces import PartitionNode
-from unstructured.ingest.pipeline.utils import get_ingest_doc_hash
+from unstructured.ingest.pipeline.intermediate import write_elements_dicts
+from unstructured.ingest.pipeline.manifest import get_source_version
+from unstructured.ingest.pipeline.metrics import note_doc_metric
+from unstructured.ingest.pipeline.scheduling import (
+    COST_UNITS_KEY,
+    PartitionTimings,
+    estimate_cost,
+    get_cost_key,
+    get_cost_units,
+    get_doc_cost_units,
+    schedule_batches,
+)
+from unstructured.ingest.pipeline.utils import get_file_content_hash, get_ingest_doc_hash
+from unstructured.ingest.pipeline.watchdog import DOC_MEMORY_LIMIT_FACTOR, guard_doc
+from unstructured.partition.common import get_last_modified_date
+from unstructured.staging.base import convert_to_dict, dict_to_elements
+
+# module-level variable to store the partition timings store of each process, keyed by path
+partition_timings: t.Dict[str, PartitionTimings] = {}
 
 
 @dataclass
 class Partitioner(PartitionNode):
+    def map_run(self, map_func, iterable) -> t.List[t.Optional[str]]:
+        """
+        Schedules the docs onto the workers by their estimated cost, largest first, with
+        the smaller ones grouped in batches. The pool hands out one batch at a time as
+        workers free up, rather than splitting the docs in contiguous chunks up front.
+        The cost units of each doc were computed by the worker that downloaded it, so
+        nothing is parsed here.
+        """
+        ingest_doc_dicts = list(iterable)
+        seconds_per_unit = self.get_timings().get_seconds_per_unit()
+        costs = []
+        for ingest_doc_dict in ingest_doc_dicts:
+            filename = create_ingest_doc_from_dict(ingest_doc_dict).filename
+            costs.append(
+                estimate_cost(
+                    filename,
+                    strategy=self.partition_config.strategy,
+                    seconds_per_unit=seconds_per_unit,
+                    units=get_doc_cost_units(ingest_doc_dict, filename),
+                ),
+            )
+        batches = schedule_batches(
+            ingest_doc_dicts,
+            costs=costs,
+            num_workers=self.pipeline_context.num_processes,
+        )
+        logger.info(
+            f"scheduling {len(ingest_doc_dicts)} docs in {len(batches)} batches, "
+            f"estimated to take {sum(costs):.1f}s of partitioning",
+        )
+        return [
+            json_path
+            for json_paths in map_func(
+                functools.partial(self.run_batch, queued_at=time.time()),
+                batches,
+            )
+            for json_path in json_paths
+        ]
+
+    def run_batch(
+        self,
+        ingest_doc_dicts: t.List[dict],
+        queued_at: t.Optional[float] = None,
+    ) -> t.List[t.Optional[str]]:
+        return [
+            self.measured_run(ingest_doc_dict, queued_at=queued_at)
+            for ingest_doc_dict in ingest_doc_dicts
+        ]
+
+    def get_timings(self) -> PartitionTimings:
+        path = str((Path(self.pipeline_context.work_dir) / "partition_timings.sqlite3").resolve())
+        if path not in partition_timings:
+            partition_timings[path] = PartitionTimings(path=path)
+        return partition_timings[path]
+
+    def record_timing(
+        self,
+        filename: t.Union[str, Path],
+        seconds: float,
+        units: t.Optional[float] = None,
+    ):
+        """Records how long partitioning the file took to refine the estimates of later runs."""
+        try:
+            self.get_timings().record(
+                key=get_cost_key(filename, self.partition_config.strategy),
+                units=units if units is not None else get_cost_units(filename),
+                seconds=seconds,
+            )
+        except Exception as e:
+            logger.warning(f"failed to record the partition timing of {filename}: {e}")
+
     @PartitionError.wrap
     def run(self, ingest_doc_dict) -> Optional[str]:
         try:
             doc = create_ingest_doc_from_dict(ingest_doc_dict)
             doc_filename_hash = get_ingest_doc_hash(ingest_doc_dict)
+            # The same doc might have been edited since it was last partitioned, so when
+            # that can be detected, name the output after the content or version being
+            # partitioned. Outputs of an earlier edit are then never picked up by this or
+            # any of the following nodes.
+            content_hash = None
+            if self.pipeline_context.content_cache:
+                content_hash = get_file_content_hash(doc.filename)
+                doc_filename_hash += content_hash
+            elif self.pipeline_context.incremental:
+                doc_filename_hash += get_source_version(ingest_doc_dict) or ""
             hashed_filename = hashlib.sha256(
                 f"{self.create_hash()}{doc_filename_hash}".encode(),
             ).hexdigest()[:32]
             self.pipeline_context.ingest_docs_map[hashed_filename] = ingest_doc_dict
-            doc_filename = f"{hashed_filename}.json"
+            doc_filename = f"{hashed_filename}{self.get_intermediate_suffix()}"
             json_path = (Path(self.get_path()) / doc_filename).resolve()
             if (
                 not self.pipeline_context.reprocess
@@ -31,6 +137,13 @@ class Partitioner(PartitionNode):
                 and json_path.stat().st_size
             ):
                 logger.info(f"File exists: {json_path}, skipping partition")
+                note_doc_metric(cache_hit=True)
+                touch_cache_file(json_path)
+                self.record_checkpoint(
+                    "partitioned",
+                    get_ingest_doc_hash(ingest_doc_dict),
+                    path=str(json_path),
+                )
                 return str(json_path)
             partition_kwargs: t.Dict[str, t.Any] = {
                 "strategy": self.partition_config.strategy,
@@ -45,16 +158,114 @@ class Partitioner(PartitionNode):
                 ] = self.partition_config.skip_infer_table_types
             if self.partition_config.additional_partition_args:
                 partition_kwargs.update(self.partition_config.additional_partition_args)
-            elements = doc.process_file(
-                partition_config=self.partition_config,
-                **partition_kwargs,
+            max_worker_memory = self.pipeline_context.max_worker_memory
+            with guard_doc(
+                timeout=self.pipeline_context.doc_timeout,
+                max_memory=max_worker_memory * 2**20 * DOC_MEMORY_LIMIT_FACTOR
+                if max_worker_memory
+                else None,
+            ):
+                if content_hash is not None:
+                    elements = self.process_file_with_content_cache(
+                        doc=doc,
+                        content_hash=content_hash,
+                        cost_units=ingest_doc_dict.get(COST_UNITS_KEY),
+                        **partition_kwargs,
+                    )
+                else:
+                    start = time.monotonic()
+                    elements = doc.process_file(
+                        partition_config=self.partition_config,
+                        **partition_kwargs,
+                    )
+                    self.record_timing(
+                        doc.filename,
+                        time.monotonic() - start,
+                        units=ingest_doc_dict.get(COST_UNITS_KEY),
+                    )
+            note_doc_metric(elements=len(elements))
+            logger.info(f"writing partitioned content to {json_path}")
+            write_elements_dicts(json_path, elements, sort_keys=True)
+            self.record_checkpoint(
+                "partitioned",
+                get_ingest_doc_hash(ingest_doc_dict),
+                path=str(json_path),
             )
-            with open(json_path, "w", encoding="utf8") as output_f:
-                logger.info(f"writing partitioned content to {json_path}")
-                json.dump(elements, output_f, ensure_ascii=False, indent=2, sort_keys=True)
             return str(json_path)
         except Exception as e:
+            note_doc_metric(failed=True)
+            self.record_failure(ingest_doc_dict, e)
             if self.pipeline_context.raise_on_error:
                 raise
             logger.error(f"failed to partition doc: {ingest_doc_dict}, {e}", exc_info=True)
             return None
+
+    def process_file_with_content_cache(
+        self,
+        doc: BaseSingleIngestDoc,
+        content_hash: str,
+        cost_units: t.Optional[float] = None,
+        **partition_kwargs,
+    ) -> t.List[t.Dict[str, t.Any]]:
+        """
+        Looks up the partitioned elements by a hash of the downloaded content rather than the
+        doc's id, so that renamed, moved or duplicated files are only partitioned once across
+        runs and source connectors. The file type is detected from the extension as well as
+        the content, so the lowercased extension is part of the key too.
+        """
+        doc._date_processed = datetime.utcnow().isoformat()
+        extension = os.path.splitext(str(doc.filename))[1].lower()
+        cache_key = hashlib.sha256(
+            f"{self.create_hash()}{content_hash}{extension}".encode(),
+        ).hexdigest()[:32]
+        cache_path = self.get_content_cache_path() / f"{cache_key}.json"
+        if (
+            not self.pipeline_context.reprocess
+            and cache_path.is_file()
+            and cache_path.stat().st_size
+        ):
+            logger.info(f"Content of {doc.filename} found in {cache_path}, skipping partition")
+            note_doc_metric(cache_hit=True)
+            touch_cache_file(cache_path)
+            with open(cache_path, encoding="utf8") as cache_f:
+                elements = dict_to_elements(json.load(cache_f))
+            self.update_doc_metadata(doc=doc, elements=elements)
+        else:
+            logger.info(f"Processing {doc.filename}")
+            start = time.monotonic()
+            elements = doc.partition_file(
+                partition_config=self.partition_config,
+                **partition_kwargs,
+            )
+            self.record_timing(doc.filename, time.monotonic() - start, units=cost_units)
+            # Write to a temporary file first since another worker may be partitioning the
+            # same content concurrently
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf8") as cache_f:
+                json.dump(convert_to_dict(elements), cache_f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        return doc.process_elements(elements=elements, partition_config=self.partition_config)
+
+    @staticmethod
+    def update_doc_metadata(doc: BaseSingleIngestDoc, elements: t.List[Element]):
+        """
+        Elements pulled from the content cache may have been partitioned from a different doc
+        with the same content, so replace all metadata tied to the doc itself.
+        """
+        filename = str(doc.filename)
+        last_modified = get_last_modified_date(filename)
+        data_source_metadata = doc.data_source_metadata
+        for element in elements:
+            metadata = element.metadata
+            metadata.filename = os.path.basename(filename)
+            metadata.file_directory = os.path.dirname(filename)
+            metadata.last_modified = last_modified
+            metadata.data_source = data_source_metadata
+
+    def get_content_cache_path(self) -> Path:
+        return self.get_path() / "content"
+
+    def initialize(self):
+        super().initialize()
+        if self.pipeline_context.content_cache:
+            self.get_content_cache_path().mkdir(parents=True, exist_ok=True)
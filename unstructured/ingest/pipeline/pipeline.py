@@ -1,14 +1,27 @@
+import functools
+import itertools
 import logging
-import multiprocessing as mp
 import typing as t
+import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
 
 from dataclasses_json import DataClassJsonMixin
 
 from unstructured.ingest.connector.registry import create_ingest_doc_from_dict
-from unstructured.ingest.interfaces import BaseIngestDocBatch, BaseSingleIngestDoc
+from unstructured.ingest.enhanced_dataclass.core import _asdict
+from unstructured.ingest.interfaces import (
+    BaseDestinationConnector,
+    BaseIngestDocBatch,
+    BaseSingleIngestDoc,
+)
 from unstructured.ingest.logger import ingest_log_streaming_init, logger
+from unstructured.ingest.pipeline.cache import MIN_EVICTION_AGE, prune_cache
 from unstructured.ingest.pipeline.copy import Copier
+from unstructured.ingest.pipeline.doc_state import get_doc_state_store
+from unstructured.ingest.pipeline.incremental import SourceVersionFilter
 from unstructured.ingest.pipeline.interfaces import (
     DocFactoryNode,
     PartitionNode,
@@ -16,9 +29,87 @@ from unstructured.ingest.pipeline.interfaces import (
     ReformatNode,
     SourceNode,
     WriteNode,
+    init_worker,
+)
+from unstructured.ingest.pipeline.journal import (
+    CheckpointJournal,
+    JournalEntry,
+    get_journal_path,
+)
+from unstructured.ingest.pipeline.manifest import (
+    ManifestEntry,
+    SourceVersionManifest,
+    get_manifest_path,
+    get_source_version,
+)
+from unstructured.ingest.pipeline.metrics import (
+    MetricsStore,
+    format_summary_table,
+    write_metrics_report,
+    write_prometheus_textfile,
 )
 from unstructured.ingest.pipeline.permissions import PermissionsDataCleaner
-from unstructured.ingest.pipeline.utils import get_ingest_doc_hash
+from unstructured.ingest.pipeline.utils import (
+    bounded_imap_unordered,
+    delete_sqlite,
+    get_doc_hash_from_path,
+    get_file_content_hash,
+    get_ingest_doc_hash,
+    join_connector_config,
+)
+from unstructured.ingest.pipeline.watchdog import RecyclingPool
+from unstructured.ingest.utils.data_prep import batch_generator
+
+
+def process_doc(
+    partition_node: PartitionNode,
+    reformat_nodes: t.List[ReformatNode],
+    copier: Copier,
+    ingest_doc_dict: dict,
+) -> t.Optional[str]:
+    """
+    Runs a single fetched doc through partitioning, every reformat node and the copier,
+    returning the path of the final json or None if any node failed on the doc.
+    """
+    json_path = partition_node.measured_run(ingest_doc_dict)
+    for reformat_node in reformat_nodes:
+        if not json_path:
+            return None
+        json_path = reformat_node.measured_run(json_path)
+    if not json_path:
+        return None
+    copier.measured_run(json_path)
+    return json_path
+
+
+def fetch_doc(
+    source_node: SourceNode,
+    item: t.Tuple[dict, bool],
+) -> t.Optional[t.Union[str, t.List[str]]]:
+    """
+    Runs the source node over the doc, unless it's flagged as already fetched by the run
+    being resumed, in which case the doc is passed on as is.
+    """
+    ingest_doc_dict, fetched = item
+    if fetched:
+        return ingest_doc_dict["unique_id"]
+    return source_node.measured_run(ingest_doc_dict)
+
+
+def get_listed_ids(
+    dict_docs: t.Iterable[dict],
+    listed_ids: t.Optional[t.Set[str]] = None,
+) -> t.Optional[t.Set[str]]:
+    """
+    Adds the unique ids of the listed docs to listed_ids, or returns None if any of them is
+    a batch of docs, whose unique ids are only known once it's downloaded.
+    """
+    listed_ids = set() if listed_ids is None else listed_ids
+    for doc in dict_docs:
+        if "ingest_docs" in doc:
+            return None
+        listed_ids.add(doc["unique_id"])
+    return listed_ids
 
 
 @dataclass
@@ -35,7 +126,10 @@ class Pipeline(DataClassJsonMixin):
         ingest_log_streaming_init(logging.DEBUG if self.pipeline_context.verbose else logging.INFO)
 
     def get_nodes_str(self):
-        nodes = [self.doc_factory_node, self.source_node, self.partition_node]
+        nodes: t.List[t.Any] = [self.doc_factory_node]
+        if self.pipeline_context.incremental:
+            nodes.append(SourceVersionFilter(pipeline_context=self.pipeline_context))
+        nodes.extend([self.source_node, self.partition_node])
         nodes.extend(self.reformat_nodes)
         if self.write_node:
             nodes.append(self.write_node)
@@ -57,35 +151,161 @@ class Pipeline(DataClassJsonMixin):
                 )
         return expanded_docs
 
+    def get_fetch_concurrency(self) -> t.Optional[int]:
+        fetch_concurrency = self.source_node.read_config.fetch_concurrency
+        max_fetch_concurrency = self.doc_factory_node.source_doc_connector.max_fetch_concurrency
+        if fetch_concurrency and max_fetch_concurrency:
+            return min(fetch_concurrency, max_fetch_concurrency)
+        return fetch_concurrency
+
+    @contextmanager
+    def fetch_pool(self) -> t.Generator[None, None, None]:
+        """
+        Downloading is mostly waiting on the network, so when a fetch concurrency is set,
+        docs are fetched by a pool of threads sized independently from the worker pool.
+        """
+        fetch_concurrency = self.get_fetch_concurrency()
+        if not fetch_concurrency:
+            yield
+            return
+        logger.info(f"fetching docs with {fetch_concurrency} threads")
+        with ThreadPool(processes=fetch_concurrency) as pool:
+            self.pipeline_context.fetch_pool = pool
+            try:
+                yield
+            finally:
+                self.pipeline_context.fetch_pool = None
+
+    @contextmanager
+    def worker_pool(self) -> t.Generator[None, None, None]:
+        """
+        Creates a single pool of workers that is shared by all nodes for the whole run,
+        rather than each node spawning (and warming up) its own pool.
+        """
+        if self.pipeline_context.num_processes == 1 and not self.pipeline_context.streaming:
+            yield
+            return
+        nodes = [self.source_node, self.partition_node, *self.reformat_nodes]
+        max_worker_memory = self.pipeline_context.max_worker_memory
+        with RecyclingPool(
+            processes=self.pipeline_context.num_processes,
+            initializer=init_worker,
+            initargs=(
+                logging.DEBUG if self.pipeline_context.verbose else logging.INFO,
+                [node for node in nodes if node is not None],
+            ),
+            maxtasksperchild=self.pipeline_context.max_tasks_per_worker,
+            max_memory=max_worker_memory * 2**20 if max_worker_memory else None,
+        ) as pool:
+            self.pipeline_context.worker_pool = pool
+            try:
+                yield
+            finally:
+                self.pipeline_context.worker_pool = None
+                if pool.num_recycled.value:
+                    logger.info(
+                        f"recycled {pool.num_recycled.value} workers that used more than "
+                        f"{max_worker_memory} MiB",
+                    )
+
     def run(self):
         logger.info(
             f"running pipeline: {self.get_nodes_str()} "
             f"with config: {self.pipeline_context.to_json()}",
         )
         self.initialize()
-        manager = mp.Manager()
-        self.pipeline_context.ingest_docs_map = manager.dict()
-        dict_docs = self.doc_factory_node()
-        dict_docs = [manager.dict(d) for d in dict_docs]
-        if not dict_docs:
-            logger.info("no docs found to process")
-            return
-        logger.info(
-            f"processing {len(dict_docs)} docs via "
-            f"{self.pipeline_context.num_processes} processes",
+        self.check_incremental_delete()
+        # Before anything else, since another run of the same command may hold the journal
+        self.pipeline_context.journal = self.get_journal()
+        self.pipeline_context.ingest_docs_map = get_doc_state_store(
+            backend=self.pipeline_context.doc_state_backend,
+            work_dir=self.pipeline_context.work_dir,
+            connector_config=self.get_connector_config(),
+        )
+        if self.pipeline_context.incremental:
+            self.pipeline_context.source_manifest = self.get_source_manifest()
+        self.pipeline_context.metrics = MetricsStore(
+            path=Path(self.pipeline_context.work_dir) / "metrics" / f"{uuid.uuid4().hex}.sqlite3",
         )
-        for doc in dict_docs:
-            self.pipeline_context.ingest_docs_map[get_ingest_doc_hash(doc)] = doc
-        fetched_filenames = self.source_node(iterable=dict_docs)
+        run_completed = False
+        try:
+            self.process_docs()
+            run_completed = True
+        finally:
+            self.pipeline_context.ingest_docs_map.delete()
+            if manifest := self.pipeline_context.source_manifest:
+                manifest.close()
+            if journal := self.pipeline_context.journal:
+                self.log_run_summary(journal=journal)
+                # Once every doc made it through, there is nothing left to resume
+                if run_completed and not journal.get_failures():
+                    journal.delete()
+                else:
+                    journal.close()
+            if metrics := self.pipeline_context.metrics:
+                self.report_metrics(metrics=metrics)
+            self.prune_work_dir()
+
+        if self.permissions_node:
+            self.permissions_node.cleanup_permissions()
+
+    def process_docs(self):
+        """Lists the docs and runs them through the nodes, streaming them if configured."""
+        # Docs are listed lazily, streaming runs start processing them right away
+        dict_docs = self.list_docs()
+        if self.pipeline_context.streaming:
+            with self.worker_pool(), self.fetch_pool():
+                self.run_streaming(dict_docs=dict_docs)
+        else:
+            dict_docs = list(dict_docs)
+            if not dict_docs:
+                logger.info("no docs found to process")
+                if unlisted_docs := self.get_unlisted_docs(listed_ids=set()):
+                    self.delete_docs(dict_docs=unlisted_docs)
+                return
+            logger.info(
+                f"processing {len(dict_docs)} docs via "
+                f"{self.pipeline_context.num_processes} processes",
+            )
+            self.pipeline_context.ingest_docs_map.update(
+                {get_ingest_doc_hash(doc): doc for doc in dict_docs},
+            )
+            with self.worker_pool(), self.fetch_pool():
+                if self.pipeline_context.incremental:
+                    dict_docs = self.filter_unchanged_docs(dict_docs=dict_docs)
+                    if not dict_docs:
+                        logger.info("no docs changed since the last run")
+                        return
+                self.run_nodes(dict_docs=dict_docs)
+
+    def run_nodes(self, dict_docs: t.List[dict]):
+        """
+        Runs each node over all docs before moving on to the next node.
+        """
+        if self.pipeline_context.resume:
+            resumed_docs = list(self.get_resumed_docs(dict_docs=dict_docs))
+        else:
+            resumed_docs = [(doc, False) for doc in dict_docs]
+        dict_docs = [doc for doc, _ in resumed_docs]
+        docs_to_fetch = [doc for doc, fetched in resumed_docs if not fetched]
+        fetched_filenames = self.source_node(iterable=docs_to_fetch) if docs_to_fetch else []
         if self.source_node.read_config.download_only:
             logger.info("stopping pipeline after downloading files")
             return
-        if not fetched_filenames:
+        if not fetched_filenames and len(docs_to_fetch) == len(dict_docs):
             logger.info("No files to run partition over")
             return
-        # To support batches ingest docs, expand those into the populated single ingest
-        # docs after downloading content
+        # Pick up the content populated by the source node, and to support batches ingest docs,
+        # expand those into the populated single ingest docs after downloading content
+        dict_docs = self.pipeline_context.ingest_docs_map.get_many(
+            [get_ingest_doc_hash(doc) for doc in dict_docs],
+        )
         dict_docs = self.expand_batch_docs(dict_docs=dict_docs)
+        if self.pipeline_context.resume:
+            dict_docs = list(self.skip_written_docs(dict_docs=dict_docs))
+            if not dict_docs:
+                logger.info("every doc was already written by the run being resumed")
+                return
         if self.partition_node is None:
             raise ValueError("partition node not set")
         partitioned_jsons = self.partition_node(iterable=dict_docs)
@@ -106,11 +326,482 @@ class Pipeline(DataClassJsonMixin):
         copier(iterable=partitioned_jsons)
 
         if self.write_node:
+            self.write_node.initialize()
+        self.write_batch(json_paths=partitioned_jsons)
+
+    def run_streaming(self, dict_docs: t.Iterable[dict]):
+        """
+        Streams each doc through all nodes independently rather than waiting for every doc
+        to finish a node before starting the next one. Each stage keeps at most
+        stream_buffer_size docs in flight, so listing, downloading, partitioning and writing
+        overlap while memory and disk usage stay bounded.
+        """
+        if self.partition_node is None and not self.source_node.read_config.download_only:
+            raise ValueError("partition node not set")
+        copier = Copier(pipeline_context=self.pipeline_context)
+        nodes: t.List[t.Any] = [self.source_node]
+        if not self.source_node.read_config.download_only:
+            nodes.extend([self.partition_node, *self.reformat_nodes, copier])
+            if self.write_node:
+                nodes.append(self.write_node)
+        for node in nodes:
+            node.initialize()
+        buffer_size = self.pipeline_context.stream_buffer_size
+        pool = self.pipeline_context.worker_pool
+        if pool is None:
+            raise ValueError("worker pool never initialized")
+        fetch_pool = self.pipeline_context.fetch_pool
+        listed_docs = self.store_docs(dict_docs=dict_docs)
+        deleted_docs: t.List[dict] = []
+        if self.pipeline_context.incremental:
+            listed_docs = self.filter_unchanged_docs_streaming(
+                dict_docs=listed_docs,
+                deleted_docs=deleted_docs,
+            )
+        if self.pipeline_context.resume:
+            resumed_docs = self.get_resumed_docs(dict_docs=listed_docs)
+        else:
+            resumed_docs = ((doc, False) for doc in listed_docs)
+        fetched = bounded_imap_unordered(
+            pool=fetch_pool or pool,
+            func=functools.partial(fetch_doc, self.source_node),
+            iterable=resumed_docs,
+            max_in_flight=self.get_fetch_concurrency() or buffer_size,
+            on_lost=lambda item, error: self.source_node.fail_lost(item[0], error),
+        )
+        # Pick up the content populated by the source node, and to support batches ingest docs,
+        # expand those into the populated single ingest docs as soon as it is downloaded
+        fetched_docs: t.Iterable[dict] = (
+            single_doc
+            for (doc, _), filenames in fetched
+            if filenames
+            for single_doc in self.expand_batch_docs(
+                dict_docs=[self.pipeline_context.ingest_docs_map[get_ingest_doc_hash(doc)]],
+            )
+        )
+        if self.pipeline_context.resume:
+            fetched_docs = self.skip_written_docs(dict_docs=fetched_docs)
+        if self.source_node.read_config.download_only:
+            num_fetched = sum(1 for _ in fetched_docs)
+            logger.info(f"stopping pipeline after downloading {num_fetched} files")
+            if deleted_docs:
+                self.delete_docs(dict_docs=deleted_docs)
+            return
+        processed = bounded_imap_unordered(
+            pool=pool,
+            func=functools.partial(
+                process_doc,
+                self.partition_node,
+                self.reformat_nodes,
+                copier,
+            ),
+            iterable=fetched_docs,
+            max_in_flight=buffer_size,
+            on_lost=self.partition_node.fail_lost if self.partition_node else None,
+        )
+        num_processed = 0
+        json_paths: t.List[str] = []
+        for _, json_path in processed:
+            if not json_path:
+                continue
+            num_processed += 1
+            json_paths.append(json_path)
+            if len(json_paths) >= self.pipeline_context.write_batch_size:
+                self.write_batch(json_paths=json_paths)
+                json_paths = []
+        if json_paths:
+            self.write_batch(json_paths=json_paths)
+        if deleted_docs:
+            self.delete_docs(dict_docs=deleted_docs)
+        logger.info(f"streamed {num_processed} docs through the pipeline")
+
+    def store_docs(self, dict_docs: t.Iterable[dict]) -> t.Iterator[dict]:
+        """
+        Records the docs in the doc state store as they are listed, a batch at a time, and
+        then passes them on.
+        """
+        num_listed = 0
+        iterator = iter(dict_docs)
+        while batch := list(itertools.islice(iterator, self.pipeline_context.stream_buffer_size)):
+            self.pipeline_context.ingest_docs_map.update(
+                {get_ingest_doc_hash(doc): doc for doc in batch},
+            )
+            num_listed += len(batch)
+            yield from batch
+        if not num_listed:
+            logger.info("no docs found to process")
+        else:
+            logger.info(f"listed {num_listed} docs from the source")
+
+    def log_run_summary(self, journal: CheckpointJournal):
+        """Logs how many docs completed each stage and why the others failed."""
+        logger.info(f"docs per completed stage: {journal.count_docs()}")
+        failures = journal.get_failures()
+        errors_by_node: t.Dict[str, t.Dict[str, int]] = {}
+        for entry in failures.values():
+            errors_by_type = errors_by_node.setdefault(entry.node or "unknown node", {})
+            error_type = (entry.error or "").split(":", 1)[0]
+            errors_by_type[error_type] = errors_by_type.get(error_type, 0) + 1
+        for node, errors_by_type in errors_by_node.items():
+            logger.warning(
+                f"{sum(errors_by_type.values())} docs failed in {node}: {errors_by_type}",
+            )
+
+    def report_metrics(self, metrics: MetricsStore):
+        """
+        Logs the totals per node and exports the metrics as configured. The metrics only
+        live for the run, so they are deleted once reported.
+        """
+        try:
+            if summary := metrics.summarize():
+                logger.info(f"pipeline metrics per node:\n{format_summary_table(summary)}")
+            if metrics_output := self.pipeline_context.metrics_output:
+                write_metrics_report(metrics.iter_metrics(), path=metrics_output)
+                logger.info(f"wrote the metrics of every doc to {metrics_output}")
+            if prometheus_file := self.pipeline_context.metrics_prometheus_file:
+                write_prometheus_textfile(summary, path=prometheus_file)
+        except Exception as e:
+            logger.warning(f"failed to report the pipeline metrics: {e}", exc_info=True)
+        finally:
+            metrics.close()
+            delete_sqlite(metrics.path)
+
+    def prune_work_dir(self):
+        """Evicts the outputs cached in the work dir beyond the configured size and age."""
+        max_size = self.pipeline_context.work_dir_max_size
+        max_age = self.pipeline_context.work_dir_max_age
+        if max_size is None and max_age is None:
+            return
+        try:
+            evicted = prune_cache(
+                work_dir=self.pipeline_context.work_dir,
+                max_size=max_size * 2**20 if max_size is not None else None,
+                max_age=max_age * 24 * 60 * 60 if max_age is not None else None,
+            )
+        except Exception as e:
+            logger.warning(f"failed to prune the work dir: {e}", exc_info=True)
+            return
+        logger.info(
+            f"evicted {evicted['files']} cached outputs ({evicted['bytes'] / 2**20:.1f} MiB) "
+            f"from {self.pipeline_context.work_dir}, "
+            f"{evicted['remaining_bytes'] / 2**20:.1f} MiB remain",
+        )
+        if max_size is not None and evicted["remaining_bytes"] > max_size * 2**20:
+            logger.warning(
+                f"the outputs cached in {self.pipeline_context.work_dir} still take up more "
+                f"than {max_size} MiB since those used within the last "
+                f"{MIN_EVICTION_AGE // 60} minutes are never evicted",
+            )
+
+    def check_incremental_delete(self):
+        """Fails right away rather than on every run when the destination can't delete."""
+        if not self.pipeline_context.incremental_delete or self.write_node is None:
+            return
+        dest_doc_connector = self.write_node.dest_doc_connector
+        if type(dest_doc_connector).delete is BaseDestinationConnector.delete:
+            raise ValueError(
+                f"{dest_doc_connector.__class__.__name__} does not support deleting content "
+                "from the destination, which incremental deletes require",
+            )
+
+    def get_connector_config(self) -> dict:
+        """The connector config of the source as it is serialized in each of its docs."""
+        return _asdict(self.doc_factory_node.source_doc_connector.connector_config)
+
+    def get_journal(self) -> CheckpointJournal:
+        """
+        A run is identified by its source, the docs it lists and its destination, so that
+        resuming picks up the last run of the same command. The journal is locked for the
+        whole run, so a run of the same command started meanwhile fails. Unless resuming, the
+        journal of the previous run is cleared. The journal is deleted once a run completes
+        without any doc failing, so only crashed runs, or runs with docs left to retry, can be
+        resumed.
+        """
+        source_doc_connector = self.doc_factory_node.source_doc_connector
+        read_config = source_doc_connector.read_config
+        run: t.Dict[str, t.Any] = {
+            "connector": source_doc_connector.__class__.__name__,
+            "config": source_doc_connector.connector_config.to_dict(
+                encode_json=True,
+                redact_sensitive=True,
+            ),
+            "max_docs": read_config.max_docs,
+            "num_shards": read_config.num_shards,
+            "shard_index": read_config.shard_index,
+            "destination": self.get_destination(),
+        }
+        journal = CheckpointJournal(
+            path=get_journal_path(work_dir=self.pipeline_context.work_dir, run=run),
+            connector_config=self.get_connector_config(),
+        )
+        try:
+            journal.lock()
+        except RuntimeError:
+            journal.close()
+            raise
+        if self.pipeline_context.resume:
             logger.info(
-                f"uploading elements from {len(partitioned_jsons)} "
-                "document(s) to the destination"
+                f"resuming from the checkpoint journal {journal.path}, "
+                f"docs per completed stage: {journal.count_docs()}",
             )
-            self.write_node(iterable=partitioned_jsons)
+        else:
+            journal.clear()
+        return journal
 
-        if self.permissions_node:
-            self.permissions_node.cleanup_permissions()
+    def list_docs(self) -> t.Iterator[dict]:
+        """
+        Lazily lists the docs from the source, recording them in the journal, unless the run
+        being resumed already listed all of them.
+        """
+        journal = self.pipeline_context.journal
+        if self.pipeline_context.resume and journal and journal.is_listing_complete():
+            logger.info("the run being resumed listed every doc, skipping listing the source")
+            return journal.iter_listed_docs()
+        self.doc_factory_node.initialize()
+        return self.record_listed_docs(dict_docs=self.doc_factory_node.run())
+
+    def record_listed_docs(self, dict_docs: t.Iterable[dict]) -> t.Iterator[dict]:
+        journal = self.pipeline_context.journal
+        for batch in batch_generator(
+            dict_docs, batch_size=self.pipeline_context.stream_buffer_size
+        ):
+            if journal:
+                journal.record(
+                    "listed",
+                    [JournalEntry(doc_hash=get_ingest_doc_hash(doc), doc=doc) for doc in batch],
+                )
+            yield from batch
+        if journal:
+            journal.record_listing_complete()
+
+    def get_resumed_docs(self, dict_docs: t.Iterable[dict]) -> t.Iterator[t.Tuple[dict, bool]]:
+        """
+        Drops the docs that the run being resumed already wrote, and flags the ones it
+        already fetched, and whose downloaded content is still around, so that they aren't
+        fetched again. Those are passed on as they were once fetched.
+        """
+        journal = self.pipeline_context.journal
+        if journal is None:
+            raise ValueError("journal never initialized")
+        num_written = 0
+        num_fetched = 0
+        for batch in batch_generator(
+            dict_docs, batch_size=self.pipeline_context.stream_buffer_size
+        ):
+            doc_hashes = [get_ingest_doc_hash(doc) for doc in batch]
+            written = journal.get_many("written", doc_hashes)
+            fetched = journal.get_many("fetched", doc_hashes)
+            fetched_docs = {
+                doc_hash: entry.doc
+                for doc_hash, entry in fetched.items()
+                if doc_hash not in written and entry.doc and self.is_downloaded(entry.doc)
+            }
+            if fetched_docs:
+                self.pipeline_context.ingest_docs_map.update(fetched_docs)
+            num_written += len(written)
+            num_fetched += len(fetched_docs)
+            for doc_hash, doc in zip(doc_hashes, batch):
+                if doc_hash in fetched_docs:
+                    yield fetched_docs[doc_hash], True
+                elif doc_hash not in written:
+                    yield doc, False
+        logger.info(
+            f"the run being resumed already wrote {num_written} of the listed docs "
+            f"and fetched {num_fetched} of the others",
+        )
+
+    def skip_written_docs(self, dict_docs: t.Iterable[dict]) -> t.Iterator[dict]:
+        """Drops the single docs, e.g. expanded from a batch, that were already written."""
+        journal = self.pipeline_context.journal
+        if journal is None:
+            raise ValueError("journal never initialized")
+        for batch in batch_generator(
+            dict_docs, batch_size=self.pipeline_context.stream_buffer_size
+        ):
+            written = journal.get_many("written", [get_ingest_doc_hash(doc) for doc in batch])
+            yield from (doc for doc in batch if get_ingest_doc_hash(doc) not in written)
+
+    @staticmethod
+    def is_downloaded(dict_doc: dict) -> bool:
+        doc = create_ingest_doc_from_dict(dict_doc)
+        docs = doc.ingest_docs if isinstance(doc, BaseIngestDocBatch) else [doc]
+        return all(Path(single_doc.filename).is_file() for single_doc in docs)
+
+    def write_batch(self, json_paths: t.List[str]):
+        """
+        Hands the final jsons to the destination. When running incrementally, outputs that
+        are identical to the ones last written are skipped and the manifest is updated
+        once the write succeeds. The docs are then recorded as written in the journal.
+        """
+        written_paths = json_paths
+        manifest = self.pipeline_context.source_manifest
+        entries: t.Dict[str, ManifestEntry] = {}
+        if manifest is not None:
+            entries = self.get_manifest_entries(json_paths=json_paths)
+            if not self.pipeline_context.reprocess:
+                recorded = manifest.get_many([entry.unique_id for entry in entries.values()])
+                json_paths = [
+                    json_path
+                    for json_path in json_paths
+                    if entries[json_path].unique_id not in recorded
+                    or recorded[entries[json_path].unique_id].output_hash
+                    != entries[json_path].output_hash
+                ]
+        if self.write_node and json_paths:
+            logger.info(
+                f"uploading elements from {len(json_paths)} document(s) to the destination",
+            )
+            with self.write_node.measure(json_paths):
+                self.write_node.run(json_paths)
+            # Streaming runs write more batches that must add to, rather than replace or
+            # conflict with, the content this one wrote
+            dest_doc_connector = self.write_node.dest_doc_connector
+            self.write_node.dest_doc_connector = dest_doc_connector.get_append_connector()
+        if manifest is not None:
+            manifest.update(list(entries.values()))
+        if journal := self.pipeline_context.journal:
+            ingest_doc_dicts = self.pipeline_context.ingest_docs_map.get_many(
+                [get_doc_hash_from_path(json_path) for json_path in written_paths],
+            )
+            journal.record(
+                "written",
+                [
+                    JournalEntry(doc_hash=get_ingest_doc_hash(ingest_doc_dict), path=json_path)
+                    for json_path, ingest_doc_dict in zip(written_paths, ingest_doc_dicts)
+                ],
+            )
+
+    def get_destination(self) -> t.Dict[str, t.Any]:
+        destination: t.Dict[str, t.Any] = {
+            "output_dir": str(Path(self.pipeline_context.output_dir).resolve()),
+        }
+        if self.write_node:
+            dest_doc_connector = self.write_node.dest_doc_connector
+            destination["connector"] = dest_doc_connector.__class__.__name__
+            destination["config"] = dest_doc_connector.to_dict(
+                encode_json=True,
+                redact_sensitive=True,
+            )
+        return destination
+
+    def get_source_manifest(self) -> SourceVersionManifest:
+        """
+        Each destination gets its own manifest, so running the same source against a new
+        destination processes every doc again.
+        """
+        manifest_path = get_manifest_path(
+            work_dir=self.pipeline_context.work_dir,
+            destination=self.get_destination(),
+        )
+        return SourceVersionManifest(path=manifest_path)
+
+    def get_manifest_entries(self, json_paths: t.List[str]) -> t.Dict[str, ManifestEntry]:
+        doc_hashes = [get_doc_hash_from_path(json_path) for json_path in json_paths]
+        ingest_doc_dicts = self.pipeline_context.ingest_docs_map.get_many(doc_hashes)
+        return {
+            json_path: ManifestEntry(
+                unique_id=ingest_doc_dict["unique_id"],
+                version=get_source_version(ingest_doc_dict),
+                output_hash=get_file_content_hash(json_path),
+                doc=ingest_doc_dict,
+            )
+            for json_path, ingest_doc_dict in zip(json_paths, ingest_doc_dicts)
+        }
+
+    def filter_unchanged_docs(self, dict_docs: t.List[dict]) -> t.List[dict]:
+        """
+        Drops the docs that didn't change since they were last written to the destination,
+        deleting any that no longer exist on the source if requested.
+        """
+        filter_node = SourceVersionFilter(pipeline_context=self.pipeline_context)
+        changed_docs = filter_node(iterable=dict_docs)
+        deleted_docs = [doc for doc in changed_docs if doc.get("exists") is False]
+        deleted_docs.extend(self.get_unlisted_docs(listed_ids=get_listed_ids(dict_docs)))
+        if deleted_docs:
+            self.delete_docs(dict_docs=deleted_docs)
+        changed_docs = [doc for doc in changed_docs if doc.get("exists") is not False]
+        logger.info(f"{len(changed_docs)} of {len(dict_docs)} docs changed since the last run")
+        return changed_docs
+
+    def filter_unchanged_docs_streaming(
+        self,
+        dict_docs: t.Iterable[dict],
+        deleted_docs: t.List[dict],
+    ) -> t.Iterator[dict]:
+        """
+        Lazy equivalent of filter_unchanged_docs, the docs that no longer exist on the
+        source are collected in deleted_docs so that they can be deleted at the end.
+        """
+        filter_node = SourceVersionFilter(pipeline_context=self.pipeline_context)
+        filter_node.initialize()
+        pool = filter_node.get_pool()
+        if pool is None:
+            raise ValueError("worker pool never initialized")
+        filtered = bounded_imap_unordered(
+            pool=pool,
+            func=filter_node.run,
+            iterable=dict_docs,
+            max_in_flight=self.get_fetch_concurrency() or self.pipeline_context.stream_buffer_size,
+        )
+        num_listed = 0
+        num_changed = 0
+        listed_ids: t.Optional[t.Set[str]] = set()
+        for listed_doc, doc in filtered:
+            num_listed += 1
+            if listed_ids is not None:
+                listed_ids = get_listed_ids([listed_doc], listed_ids=listed_ids)
+            if doc is None:
+                continue
+            if doc.get("exists") is False:
+                deleted_docs.append(doc)
+                continue
+            num_changed += 1
+            yield doc
+        logger.info(f"{num_changed} of {num_listed} docs changed since the last run")
+        deleted_docs.extend(self.get_unlisted_docs(listed_ids=listed_ids))
+
+    def get_unlisted_docs(self, listed_ids: t.Optional[t.Set[str]]) -> t.List[dict]:
+        """
+        When deletes were requested, the previously written docs that the source didn't list
+        this time, so that they can be deleted from the destination. Only a complete listing
+        tells which docs were removed from the source, so none are returned when it was cut
+        short by max_docs or only covered a shard, nor when the source lists batches of docs
+        (listed_ids is None), which are only expanded into the docs recorded in the manifest
+        once downloaded.
+        """
+        manifest = self.pipeline_context.source_manifest
+        if manifest is None or not self.pipeline_context.incremental_delete:
+            return []
+        read_config = self.doc_factory_node.source_doc_connector.read_config
+        if read_config.max_docs or read_config.num_shards > 1 or listed_ids is None:
+            return []
+        connector_config = self.get_connector_config()
+        unlisted_docs = []
+        for entry in manifest.iter_missing(unique_ids=listed_ids):
+            if entry.doc is None:
+                # Written by a version that didn't record the docs in the manifest
+                logger.warning(
+                    f"{entry.unique_id} is no longer listed by the source but can't be "
+                    "deleted since it was last written by an older version",
+                )
+                continue
+            logger.info(f"{entry.unique_id} is no longer listed by the source, deleting")
+            unlisted_docs.append(join_connector_config(entry.doc, connector_config))
+        return unlisted_docs
+
+    def delete_docs(self, dict_docs: t.List[dict]):
+        manifest = self.pipeline_context.source_manifest
+        if manifest is None:
+            raise ValueError("source manifest never initialized")
+        docs = [create_ingest_doc_from_dict(d) for d in dict_docs]
+        for doc in docs:
+            if isinstance(doc, BaseSingleIngestDoc):
+                output_filename = Path(doc._output_filename)
+                if output_filename.is_file():
+                    logger.info(f"Deleting {output_filename}")
+                    output_filename.unlink()
+        if self.write_node:
+            logger.info(f"deleting {len(docs)} document(s) from the destination")
+            self.write_node.initialize()
+            self.write_node.dest_doc_connector.delete(docs=docs)
+        manifest.remove([d["unique_id"] for d in dict_docs])
@@ -0,0 +1,165 @@
+import os
+import random
+import sqlite3
+import time
+import typing as t
+from contextlib import contextmanager
+from pathlib import Path
+
+from unstructured.ingest.logger import logger
+from unstructured.ingest.pipeline.utils import SqliteConnectionMixin
+
+# The longest a process waits before checking a limit again, so that it notices requests
+# finishing in other processes
+MAX_POLL_INTERVAL = 0.1
+
+# module-level variable to store rate limiters, keyed by their path, so that each process
+# only opens a given database once
+rate_limiters: t.Dict[str, "RateLimiter"] = {}
+
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class RateLimiter(SqliteConnectionMixin):
+    """
+    Token buckets shared by every process, and every run, using the same work dir, persisted
+    in a SQLite database in WAL mode. Each request to a rate limited service first takes a
+    token from the bucket of the service, which refills at the configured requests per
+    second, so that all processes together stay just under the limit of the service rather
+    than each of them running into it and backing off on its own. The number of requests in
+    flight across processes can be capped as well.
+    """
+
+    def __init__(self, path: t.Union[str, Path]):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection
+
+    def create_tables(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS buckets "
+            "(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)",
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS holders "
+            "(name TEXT NOT NULL, pid INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (name, pid))",
+        )
+
+    def try_acquire(
+        self,
+        name: str,
+        requests_per_second: t.Optional[float] = None,
+        max_concurrency: t.Optional[int] = None,
+    ) -> float:
+        """
+        Takes a token from the bucket, and a slot if the concurrency is capped, returning 0
+        if it did and otherwise roughly how many seconds to wait before trying again.
+        """
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            if max_concurrency is not None:
+                in_flight = self.get_in_flight(name)
+                if in_flight >= max_concurrency:
+                    # Don't let the slots of processes that died hold up the others forever
+                    connection.executemany(
+                        "DELETE FROM holders WHERE name = ? AND pid = ?",
+                        [
+                            (name, pid)
+                            for pid in self.get_holders(name)
+                            if not is_process_alive(pid)
+                        ],
+                    )
+                    if self.get_in_flight(name) >= max_concurrency:
+                        connection.commit()
+                        return MAX_POLL_INTERVAL
+            if requests_per_second is not None:
+                # Allows bursts of up to a second of requests after being idle
+                capacity = max(1.0, requests_per_second)
+                row = connection.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE name = ?",
+                    (name,),
+                ).fetchone()
+                tokens, updated_at = row if row is not None else (capacity, now)
+                tokens = min(capacity, tokens + max(0.0, now - updated_at) * requests_per_second)
+                if tokens < 1:
+                    connection.commit()
+                    return (1 - tokens) / requests_per_second
+                connection.execute(
+                    "INSERT INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET tokens = excluded.tokens, "
+                    "updated_at = excluded.updated_at",
+                    (name, tokens - 1, now),
+                )
+            if max_concurrency is not None:
+                connection.execute(
+                    "INSERT INTO holders (name, pid, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT (name, pid) DO UPDATE SET count = count + 1",
+                    (name, os.getpid()),
+                )
+            connection.commit()
+            return 0.0
+        except BaseException:
+            connection.rollback()
+            raise
+
+    def release(self, name: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "UPDATE holders SET count = count - 1 WHERE name = ? AND pid = ?",
+                (name, os.getpid()),
+            )
+            self.connection.execute("DELETE FROM holders WHERE count <= 0")
+
+    def get_in_flight(self, name: str) -> int:
+        row = self.connection.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM holders WHERE name = ?",
+            (name,),
+        ).fetchone()
+        return row[0]
+
+    def get_holders(self, name: str) -> t.List[int]:
+        rows = self.connection.execute("SELECT pid FROM holders WHERE name = ?", (name,))
+        return [pid for (pid,) in rows]
+
+    @contextmanager
+    def limit(
+        self,
+        name: str,
+        requests_per_second: t.Optional[float] = None,
+        max_concurrency: t.Optional[int] = None,
+    ) -> t.Generator[None, None, None]:
+        """Waits for the limits of the named service to allow one more request to it."""
+        if requests_per_second is None and max_concurrency is None:
+            yield
+            return
+        waited = 0.0
+        while wait := self.try_acquire(name, requests_per_second, max_concurrency):
+            # Spread out the processes waiting on the same bucket
+            wait = min(wait, MAX_POLL_INTERVAL) * random.uniform(0.5, 1.0)
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            logger.debug(f"waited {waited:.2f}s for the rate limit of {name}")
+        try:
+            yield
+        finally:
+            if max_concurrency is not None:
+                self.release(name)
+
+
+def get_rate_limiter(work_dir: str) -> RateLimiter:
+    path = str((Path(work_dir) / "rate_limits.sqlite3").resolve())
+    if path not in rate_limiters:
+        rate_limiters[path] = RateLimiter(path=path)
+    return rate_limiters[path]
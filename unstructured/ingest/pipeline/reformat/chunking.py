@@ -1,6 +1,5 @@
 import hashlib
 import json
-import os.path
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
@@ -9,8 +8,12 @@ from unstructured.ingest.interfaces import (
     ChunkingConfig,
 )
 from unstructured.ingest.logger import logger
+from unstructured.ingest.pipeline.cache import touch_cache_file
 from unstructured.ingest.pipeline.interfaces import ReformatNode
-from unstructured.staging.base import convert_to_dict, elements_from_json
+from unstructured.ingest.pipeline.intermediate import read_elements_dicts, write_elements_dicts
+from unstructured.ingest.pipeline.metrics import note_doc_metric
+from unstructured.ingest.pipeline.utils import get_doc_hash_from_path, get_ingest_doc_hash
+from unstructured.staging.base import convert_to_dict, dict_to_elements
 
 
 @dataclass
@@ -29,32 +32,43 @@ class Chunker(ReformatNode):
 
     def run(self, elements_json: str) -> Optional[str]:
         try:
-            elements_json_filename = os.path.basename(elements_json)
-            filename_ext = os.path.basename(elements_json_filename)
-            filename = os.path.splitext(filename_ext)[0]
+            filename = get_doc_hash_from_path(elements_json)
             hashed_filename = hashlib.sha256(
                 f"{self.create_hash()}{filename}".encode(),
             ).hexdigest()[:32]
-            json_filename = f"{hashed_filename}.json"
+            json_filename = f"{hashed_filename}{self.get_intermediate_suffix()}"
             json_path = (Path(self.get_path()) / json_filename).resolve()
-            self.pipeline_context.ingest_docs_map[
-                hashed_filename
-            ] = self.pipeline_context.ingest_docs_map[filename]
+            ingest_doc_dict = self.pipeline_context.ingest_docs_map[filename]
+            self.pipeline_context.ingest_docs_map[hashed_filename] = ingest_doc_dict
             if (
                 not self.pipeline_context.reprocess
                 and json_path.is_file()
                 and json_path.stat().st_size
             ):
                 logger.debug(f"File exists: {json_path}, skipping chunking")
+                note_doc_metric(cache_hit=True)
+                touch_cache_file(json_path)
+                self.record_checkpoint(
+                    "chunked",
+                    get_ingest_doc_hash(ingest_doc_dict),
+                    path=str(json_path),
+                )
                 return str(json_path)
-            elements = elements_from_json(filename=elements_json)
+            elements = dict_to_elements(read_elements_dicts(elements_json))
             chunked_elements = self.chunking_config.chunk(elements=elements)
+            note_doc_metric(elements=len(chunked_elements))
             elements_dict = convert_to_dict(chunked_elements)
-            with open(json_path, "w", encoding="utf8") as output_f:
-                logger.info(f"writing chunking content to {json_path}")
-                json.dump(elements_dict, output_f, ensure_ascii=False, indent=2)
+            logger.info(f"writing chunking content to {json_path}")
+            write_elements_dicts(json_path, elements_dict)
+            self.record_checkpoint(
+                "chunked",
+                get_ingest_doc_hash(ingest_doc_dict),
+                path=str(json_path),
+            )
             return str(json_path)
         except Exception as e:
+            note_doc_metric(failed=True)
+            self.record_failure(elements_json, e)
             if self.pipeline_context.raise_on_error:
                 raise
             logger.error(f"failed to run chunking on file {elements_json}, {e}", exc_info=True)
@@ -1,16 +1,60 @@
+import functools
 import hashlib
 import json
-import os.path
+import math
+import time
+import typing as t
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+from unstructured.documents.elements import Element
+from unstructured.embed.cache import CachedEmbeddingEncoder, EmbeddingCache
+from unstructured.embed.interfaces import BaseEmbeddingEncoder
 from unstructured.ingest.interfaces import (
     EmbeddingConfig,
 )
 from unstructured.ingest.logger import logger
+from unstructured.ingest.pipeline.cache import touch_cache_file
 from unstructured.ingest.pipeline.interfaces import ReformatNode
-from unstructured.staging.base import convert_to_dict, elements_from_json
+from unstructured.ingest.pipeline.intermediate import read_elements_dicts, write_elements_dicts
+from unstructured.ingest.pipeline.metrics import get_size, note_doc_metric
+from unstructured.ingest.pipeline.utils import get_doc_hash_from_path, get_ingest_doc_hash
+from unstructured.ingest.utils.data_prep import batch_generator
+from unstructured.staging.base import convert_to_dict, dict_to_elements
+
+# module-level variable to store embedders, keyed by the hash of their config, so that each
+# process only loads a given model once
+embedders: t.Dict[str, BaseEmbeddingEncoder] = {}
+
+
+class RateLimitedEmbeddingEncoder(BaseEmbeddingEncoder):
+    """Wraps an embedding encoder to wait for the limits on requests before each call."""
+
+    def __init__(
+        self,
+        encoder: BaseEmbeddingEncoder,
+        limit_requests: t.Callable[[], t.ContextManager[None]],
+    ):
+        self.encoder = encoder
+        self.limit_requests = limit_requests
+
+    def initialize(self):
+        self.encoder.initialize()
+
+    def num_of_dimensions(self):
+        return self.encoder.num_of_dimensions()
+
+    def is_unit_vector(self):
+        return self.encoder.is_unit_vector()
+
+    def embed_query(self, query):
+        with self.limit_requests():
+            return self.encoder.embed_query(query)
+
+    def embed_documents(self, elements: t.List[Element]) -> t.List[Element]:
+        with self.limit_requests():
+            return self.encoder.embed_documents(elements=elements)
 
 
 @dataclass
@@ -25,41 +69,193 @@ class Embedder(ReformatNode):
 
     def create_hash(self) -> str:
         hash_dict = self.embedder_config.to_dict()
+        # How elements are batched or cached doesn't change their embeddings
+        for key in ["max_batch_docs", "max_batch_chars", "cache", "cache_max_entries"]:
+            hash_dict.pop(key, None)
         return hashlib.sha256(json.dumps(hash_dict, sort_keys=True).encode()).hexdigest()[:32]
 
-    def run(self, elements_json: str) -> Optional[str]:
-        try:
-            elements_json_filename = os.path.basename(elements_json)
-            filename_ext = os.path.basename(elements_json_filename)
-            filename = os.path.splitext(filename_ext)[0]
-            hashed_filename = hashlib.sha256(
-                f"{self.create_hash()}{filename}".encode(),
-            ).hexdigest()[:32]
-            json_filename = f"{hashed_filename}.json"
-            json_path = (Path(self.get_path()) / json_filename).resolve()
-            self.pipeline_context.ingest_docs_map[
-                hashed_filename
-            ] = self.pipeline_context.ingest_docs_map[filename]
+    def get_embedder(self) -> BaseEmbeddingEncoder:
+        config_hash = self.create_hash()
+        if config_hash not in embedders:
+            embedder = self.embedder_config.get_embedder()
             if (
-                not self.pipeline_context.reprocess
-                and json_path.is_file()
-                and json_path.stat().st_size
+                self.pipeline_context.embedding_requests_per_second is not None
+                or self.pipeline_context.embedding_max_concurrency is not None
             ):
-                logger.debug(f"File exists: {json_path}, skipping embedding")
-                return str(json_path)
-            elements = elements_from_json(filename=elements_json)
-            embedder = self.embedder_config.get_embedder()
-            embedded_elements = embedder.embed_documents(elements=elements)
-            elements_dict = convert_to_dict(embedded_elements)
-            with open(json_path, "w", encoding="utf8") as output_f:
-                logger.info(f"writing embeddings content to {json_path}")
-                json.dump(elements_dict, output_f, ensure_ascii=False, indent=2)
-            return str(json_path)
+                # Only the requests actually made to the provider count, not cache hits
+                embedder = RateLimitedEmbeddingEncoder(
+                    encoder=embedder,
+                    limit_requests=functools.partial(
+                        self.limit_requests,
+                        f"embedding:{self.embedder_config.provider}",
+                        requests_per_second=self.pipeline_context.embedding_requests_per_second,
+                        max_concurrency=self.pipeline_context.embedding_max_concurrency,
+                    ),
+                )
+            if self.embedder_config.cache:
+                embedder = CachedEmbeddingEncoder(
+                    encoder=embedder,
+                    cache=EmbeddingCache(
+                        path=self.get_cache_path(),
+                        max_entries=self.embedder_config.cache_max_entries,
+                    ),
+                    namespace=self.embedder_config.get_cache_namespace(),
+                )
+            embedders[config_hash] = embedder
+        return embedders[config_hash]
+
+    def get_cache_path(self) -> Path:
+        return (Path(self.pipeline_context.work_dir) / "embeddings.sqlite3").resolve()
+
+    def warm_up(self):
+        self.get_embedder()
+
+    def map_run(self, map_func, iterable) -> t.List[t.Optional[str]]:
+        """
+        Maps groups of docs over the workers, rather than single docs, so that the elements
+        of many small docs are embedded together.
+        """
+        elements_jsons = list(iterable)
+        batch_size = min(
+            self.embedder_config.max_batch_docs,
+            # Still spread the docs over every worker
+            max(1, math.ceil(len(elements_jsons) / self.pipeline_context.num_processes)),
+        )
+        batches = [
+            elements_jsons[i : i + batch_size]  # noqa: E203
+            for i in range(0, len(elements_jsons), batch_size)
+        ]
+        return [
+            json_path
+            for json_paths in map_func(
+                functools.partial(self.measured_run_batch, queued_at=time.time()),
+                batches,
+            )
+            for json_path in json_paths
+        ]
+
+    def measured_run_batch(
+        self,
+        elements_jsons: t.List[str],
+        queued_at: t.Optional[float] = None,
+    ) -> t.List[t.Optional[str]]:
+        with self.measure(elements_jsons, queued_at=queued_at) as metrics:
+            json_paths = self.run_batch(elements_jsons)
+            for metric, json_path in zip(metrics, json_paths):
+                metric.bytes_out = get_size(json_path)
+        return json_paths
+
+    def run(self, elements_json: str) -> Optional[str]:
+        return self.run_batch([elements_json])[0]
+
+    def run_batch(self, elements_jsons: t.List[str]) -> t.List[t.Optional[str]]:
+        """
+        Embeds the elements of all docs together, in batches of at most max_batch_chars
+        characters, and scatters the embedded elements back to a file per doc. If that fails,
+        each doc is embedded on its own, so that only the docs that fail by themselves are
+        failed.
+        """
+        json_paths: t.List[t.Optional[str]] = [None] * len(elements_jsons)
+        pending: t.List[t.Tuple[int, str, Path, t.List[Element]]] = []
+        for i, elements_json in enumerate(elements_jsons):
+            try:
+                filename = get_doc_hash_from_path(elements_json)
+                hashed_filename = hashlib.sha256(
+                    f"{self.create_hash()}{filename}".encode(),
+                ).hexdigest()[:32]
+                json_filename = f"{hashed_filename}{self.get_intermediate_suffix()}"
+                json_path = (Path(self.get_path()) / json_filename).resolve()
+                ingest_doc_dict = self.pipeline_context.ingest_docs_map[filename]
+                self.pipeline_context.ingest_docs_map[hashed_filename] = ingest_doc_dict
+                doc_hash = get_ingest_doc_hash(ingest_doc_dict)
+                if (
+                    not self.pipeline_context.reprocess
+                    and json_path.is_file()
+                    and json_path.stat().st_size
+                ):
+                    logger.debug(f"File exists: {json_path}, skipping embedding")
+                    note_doc_metric(index=i, cache_hit=True)
+                    touch_cache_file(json_path)
+                    json_paths[i] = str(json_path)
+                    self.record_checkpoint("embedded", doc_hash, path=json_paths[i])
+                    continue
+                elements = dict_to_elements(read_elements_dicts(elements_json))
+                pending.append((i, doc_hash, json_path, elements))
+            except Exception as e:
+                note_doc_metric(index=i, failed=True)
+                self.record_failure(elements_json, e)
+                if self.pipeline_context.raise_on_error:
+                    raise
+                logger.error(
+                    f"failed to embed content from file {elements_json}, {e}",
+                    exc_info=True,
+                )
+        if not pending:
+            return json_paths
+        embedded_docs: t.List[t.Optional[t.List[Element]]]
+        try:
+            embedded_docs = list(self.embed_docs([elements for *_, elements in pending]))
         except Exception as e:
             if self.pipeline_context.raise_on_error:
                 raise
-            logger.error(f"failed to embed content from file {elements_json}, {e}", exc_info=True)
-            return None
+            if len(pending) == 1:
+                index = pending[0][0]
+                self.fail_doc(index, elements_jsons[index], e)
+                return json_paths
+            # Rather than failing every doc of the batch, only fail those whose content
+            # can't be embedded on its own
+            logger.warning(
+                f"failed to embed the content of {len(pending)} docs together, "
+                f"retrying each doc on its own: {e}",
+            )
+            embedded_docs = []
+            for i, *_, elements in pending:
+                try:
+                    embedded_docs.extend(self.embed_docs([elements]))
+                except Exception as doc_error:
+                    self.fail_doc(i, elements_jsons[i], doc_error)
+                    embedded_docs.append(None)
+        embedder = embedders.get(self.create_hash())
+        if isinstance(embedder, CachedEmbeddingEncoder):
+            logger.info(
+                f"embedding cache: {embedder.cache.hits} hits, "
+                f"{embedder.cache.misses} misses in this process",
+            )
+        for (i, doc_hash, json_path, elements), embedded_elements in zip(pending, embedded_docs):
+            if embedded_elements is None:
+                continue
+            elements_dict = convert_to_dict(embedded_elements)
+            logger.info(f"writing embeddings content to {json_path}")
+            write_elements_dicts(json_path, elements_dict)
+            json_paths[i] = str(json_path)
+            note_doc_metric(index=i, elements=len(elements))
+            self.record_checkpoint("embedded", doc_hash, path=json_paths[i])
+        return json_paths
+
+    def embed_docs(self, docs_elements: t.List[t.List[Element]]) -> t.List[t.List[Element]]:
+        """
+        Embeds the elements of all docs in batches of at most max_batch_chars characters,
+        and splits the embedded elements back per doc.
+        """
+        embedder = self.get_embedder()
+        embedded_elements: t.List[Element] = []
+        for batch in batch_generator(
+            (element for elements in docs_elements for element in elements),
+            max_batch_bytes=self.embedder_config.max_batch_chars,
+            get_size=lambda element: len(str(element)),
+        ):
+            embedded_elements.extend(embedder.embed_documents(elements=batch))
+        embedded_docs = []
+        offset = 0
+        for elements in docs_elements:
+            embedded_docs.append(embedded_elements[offset : offset + len(elements)])  # noqa: E203
+            offset += len(elements)
+        return embedded_docs
+
+    def fail_doc(self, index: int, elements_json: str, error: Exception):
+        note_doc_metric(index=index, failed=True)
+        self.record_failure(elements_json, error)
+        logger.error(f"failed to embed content from file {elements_json}, {error}", exc_info=True)
 
     def get_path(self) -> Path:
         return (Path(self.pipeline_context.work_dir) / "embedded").resolve()
@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import typing as t
+from pathlib import Path
+
+from unstructured.ingest.logger import logger
+from unstructured.ingest.pipeline.utils import SqliteConnectionMixin
+from unstructured.utils import dependency_exists
+
+PDFMINER_AVAILABLE = dependency_exists("pdfminer")
+
+IMAGE_EXTENSIONS = [".bmp", ".heic", ".jpeg", ".jpg", ".png", ".tif", ".tiff"]
+# Used to estimate the page count of pdfs whose header can't be read
+DEFAULT_PDF_PAGE_BYTES = 100 * 1024
+# Until timings were recorded for a file type, pdfs and images are assumed to take this
+# many seconds per page for each strategy, and every other file type this many per KB
+DEFAULT_SECONDS_PER_PAGE = {"fast": 0.05, "auto": 0.5, "ocr_only": 2.0, "hi_res": 3.0}
+DEFAULT_SECONDS_PER_KB = 0.002
+# Each doc is also assumed to take this long, whatever its size, e.g. to load its content
+DEFAULT_SECONDS_PER_DOC = 0.01
+# The smaller docs are grouped in batches so that each worker gets roughly this many tasks
+TASKS_PER_WORKER = 8
+MAX_BATCH_DOCS = 50
+# The key the cost units of a doc are carried under in the serialized ingest doc, computed
+# by the worker that downloaded its content
+COST_UNITS_KEY = "cost_units"
+
+
+def get_pdf_page_count(filename: t.Union[str, Path]) -> t.Optional[int]:
+    """
+    Reads the page count from the page tree of the pdf, which only requires parsing its
+    cross reference table rather than any of the pages.
+    """
+    if not PDFMINER_AVAILABLE:
+        return None
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+
+    try:
+        with open(filename, "rb") as f:
+            document = PDFDocument(PDFParser(f))
+            pages = resolve1(document.catalog["Pages"])
+            return int(resolve1(pages["Count"]))
+    except Exception as e:
+        logger.debug(f"failed to read the page count of {filename}: {e}")
+        return None
+
+
+def get_cost_key(filename: t.Union[str, Path], strategy: str) -> t.Tuple[str, str]:
+    return os.path.splitext(str(filename))[1].lower(), strategy
+
+
+def get_cost_units(filename: t.Union[str, Path], count_pages: bool = True) -> float:
+    """
+    What the time it takes to partition a file is proportional to: its number of pages for
+    pdfs and images, and its size in KB for everything else. Reading the page count of a pdf
+    takes parsing it in part, so unless count_pages, it's estimated from the file size.
+    """
+    extension = os.path.splitext(str(filename))[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return 1.0
+    try:
+        size = os.path.getsize(filename)
+    except OSError:
+        return 0.0
+    if extension == ".pdf":
+        page_count = get_pdf_page_count(filename) if count_pages else None
+        return float(page_count) if page_count is not None else size / DEFAULT_PDF_PAGE_BYTES
+    return size / 1024
+
+
+class PartitionTimings(SqliteConnectionMixin):
+    """
+    Accumulates how long partitioning took per unit of cost, for each file type and strategy,
+    in a SQLite database in WAL mode, so that the estimates used to schedule docs onto the
+    workers improve with every run sharing the same work dir.
+    """
+
+    def __init__(self, path: t.Union[str, Path]):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection
+
+    def create_tables(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS timings "
+            "(extension TEXT NOT NULL, strategy TEXT NOT NULL, docs INTEGER NOT NULL, "
+            "units REAL NOT NULL, seconds REAL NOT NULL, PRIMARY KEY (extension, strategy))",
+        )
+
+    def record(self, key: t.Tuple[str, str], units: float, seconds: float) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO timings (extension, strategy, docs, units, seconds) "
+                "VALUES (?, ?, 1, ?, ?) ON CONFLICT (extension, strategy) DO UPDATE SET "
+                "docs = docs + 1, units = units + excluded.units, "
+                "seconds = seconds + excluded.seconds",
+                (*key, units, seconds),
+            )
+
+    def get_seconds_per_unit(self) -> t.Dict[t.Tuple[str, str], float]:
+        rows = self.connection.execute(
+            "SELECT extension, strategy, units, seconds FROM timings WHERE units > 0",
+        )
+        return {
+            (extension, strategy): seconds / units for extension, strategy, units, seconds in rows
+        }
+
+
+def get_doc_cost_units(ingest_doc_dict: dict, filename: t.Union[str, Path]) -> float:
+    """
+    The cost units carried by the serialized ingest doc, or else those that are quick to
+    get, i.e. with the page count of pdfs estimated from their size.
+    """
+    units = ingest_doc_dict.get(COST_UNITS_KEY)
+    if units is not None:
+        return float(units)
+    return get_cost_units(filename, count_pages=False)
+
+
+def estimate_cost(
+    filename: t.Union[str, Path],
+    strategy: str,
+    seconds_per_unit: t.Dict[t.Tuple[str, str], float],
+    units: t.Optional[float] = None,
+) -> float:
+    """
+    Estimates how many seconds partitioning the file will take, from its cost units if they
+    are already known.
+    """
+    key = get_cost_key(filename, strategy)
+    if key in seconds_per_unit:
+        rate = seconds_per_unit[key]
+    elif key[0] == ".pdf" or key[0] in IMAGE_EXTENSIONS:
+        rate = DEFAULT_SECONDS_PER_PAGE.get(strategy, DEFAULT_SECONDS_PER_PAGE["auto"])
+    else:
+        rate = DEFAULT_SECONDS_PER_KB
+    if units is None:
+        units = get_cost_units(filename)
+    return DEFAULT_SECONDS_PER_DOC + rate * units
+
+
+def schedule_batches(
+    items: t.List[t.Any],
+    costs: t.List[float],
+    num_workers: int,
+) -> t.List[t.List[t.Any]]:
+    """
+    Orders the items from the most to the least costly, so that the longest tasks start
+    first and the shortest ones fill in the gaps at the end (longest processing time
+    first), and groups the smaller items in batches to cut down the overhead per task.
+    """
+    if not items:
+        return []
+    target_cost = sum(costs) / (max(1, num_workers) * TASKS_PER_WORKER)
+    batches: t.List[t.List[t.Any]] = []
+    batch: t.List[t.Any] = []
+    batch_cost = 0.0
+    for cost, item in sorted(zip(costs, items), key=lambda pair: pair[0], reverse=True):
+        batch.append(item)
+        batch_cost += cost
+        if batch_cost >= target_cost or len(batch) >= MAX_BATCH_DOCS:
+            batches.append(batch)
+            batch = []
+            batch_cost = 0.0
+    if batch:
+        batches.append(batch)
+    return batches
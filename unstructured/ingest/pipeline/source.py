@@ -1,4 +1,5 @@
 import os
+import threading
 import typing as t
 from dataclasses import dataclass
 
@@ -11,9 +12,13 @@ from unstructured.ingest.interfaces import (
 )
 from unstructured.ingest.logger import logger
 from unstructured.ingest.pipeline.interfaces import SourceNode
+from unstructured.ingest.pipeline.metrics import note_doc_metric
+from unstructured.ingest.pipeline.scheduling import COST_UNITS_KEY, get_cost_units
+from unstructured.ingest.pipeline.utils import get_ingest_doc_hash
 
-# module-level variable to store session handle
-session_handle: t.Optional[BaseSessionHandle] = None
+# module-level storage of the session handle, one per thread since docs are also fetched
+# by a pool of threads and session handles aren't safe to share across them
+session_state = threading.local()
 
 
 @dataclass
@@ -25,8 +30,9 @@ class Reader(SourceNode):
             and doc.filename.stat().st_size
         ):
             logger.info(f"File exists: {doc.filename}, skipping download")
+            note_doc_metric(cache_hit=True)
             # Still need to fetch metadata if file exists locally
-            doc.update_source_metadata()
+            self.call_source(doc, doc.update_source_metadata)
         else:
             # TODO: update all to use doc.to_json(redact_sensitive=True) once session handler
             # can be serialized
@@ -37,43 +43,55 @@ class Reader(SourceNode):
                 logger.warning("failed to print full doc: ", e)
                 logger.debug(f"Fetching {doc.__class__.__name__} - PID: {os.getpid()}")
             if self.retry_strategy:
-                self.retry_strategy(doc.get_file)
+                self.retry_strategy(self.call_source, doc, doc.get_file)
             else:
-                doc.get_file()
+                self.call_source(doc, doc.get_file)
         for k, v in doc.to_dict().items():
             ingest_doc_dict[k] = v
+        # Computed here, by the worker fetching the doc, rather than when scheduling it
+        ingest_doc_dict[COST_UNITS_KEY] = get_cost_units(doc.filename)
         return doc.filename
 
     def get_batch(self, doc_batch: BaseIngestDocBatch, ingest_doc_dict: dict) -> t.List[str]:
         if self.retry_strategy:
-            self.retry_strategy(doc_batch.get_files)
+            self.retry_strategy(self.call_source, doc_batch, doc_batch.get_files)
         else:
-            doc_batch.get_files()
+            self.call_source(doc_batch, doc_batch.get_files)
         for k, v in doc_batch.to_dict().items():
             ingest_doc_dict[k] = v
         return [doc.filename for doc in doc_batch.ingest_docs]
 
     def run(self, ingest_doc_dict: dict) -> t.Optional[t.Union[str, t.List[str]]]:
         try:
-            global session_handle
+            doc_hash = get_ingest_doc_hash(ingest_doc_dict)
             doc = create_ingest_doc_from_dict(ingest_doc_dict)
             if isinstance(doc, IngestDocSessionHandleMixin):
+                session_handle: t.Optional[BaseSessionHandle] = getattr(
+                    session_state,
+                    "session_handle",
+                    None,
+                )
                 if session_handle is None:
                     # create via doc.session_handle, which is a property that creates a
                     # session handle if one is not already defined
-                    session_handle = doc.session_handle
+                    session_state.session_handle = doc.session_handle
                 else:
                     doc._session_handle = session_handle
             if isinstance(doc, BaseSingleIngestDoc):
-                return self.get_single(doc=doc, ingest_doc_dict=ingest_doc_dict)
+                filenames = self.get_single(doc=doc, ingest_doc_dict=ingest_doc_dict)
             elif isinstance(doc, BaseIngestDocBatch):
-                return self.get_batch(doc_batch=doc, ingest_doc_dict=ingest_doc_dict)
+                filenames = self.get_batch(doc_batch=doc, ingest_doc_dict=ingest_doc_dict)
             else:
                 raise ValueError(
                     f"type of doc ({type(doc)}) is not a recognized type: "
                     f"BaseSingleIngestDoc or BaseSingleIngestDoc"
                 )
+            self.pipeline_context.ingest_docs_map[doc_hash] = ingest_doc_dict
+            self.record_checkpoint("fetched", doc_hash, doc=ingest_doc_dict)
+            return filenames
         except Exception as e:
+            note_doc_metric(failed=True)
+            self.record_failure(ingest_doc_dict, e)
             if self.pipeline_context.raise_on_error:
                 raise
             logger.error(
@@ -1,6 +1,257 @@
+import copy
+import functools
 import hashlib
+import itertools
+import os
+import queue
+import sqlite3
+import threading
+import time
+import typing as t
+from multiprocessing.pool import Pool
+from pathlib import Path
+
+# how many bytes to read at a time when hashing file content
+CONTENT_HASH_CHUNK_SIZE = 1024 * 1024
+# How often, in seconds, the workers of a pool are checked while waiting on their tasks
+WORKER_POLL_INTERVAL = 1.0
 
 
 def get_ingest_doc_hash(json_as_dict: dict) -> str:
     hashed = hashlib.sha256(json_as_dict["unique_id"].encode()).hexdigest()[:32]
     return hashed
+
+
+def get_doc_hash_from_path(path: t.Union[str, Path]) -> str:
+    """The hash a pipeline node named its output after, regardless of the file's suffix."""
+    return os.path.basename(path).split(".")[0]
+
+
+def get_file_content_hash(filename: t.Union[str, Path]) -> str:
+    """Hashes the content of a file, reading it in chunks to keep memory usage bounded."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as f:
+        while chunk := f.read(CONTENT_HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def connect_sqlite(path: t.Union[str, Path]) -> sqlite3.Connection:
+    """
+    Opens a connection to a SQLite database in WAL mode so that the main process and every
+    worker process can read and write it concurrently.
+    """
+    # Each connection is only ever used by one thread at a time, but thread ids can be
+    # reused by a new thread once the one that opened the connection is gone
+    connection = sqlite3.connect(str(path), timeout=60, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def delete_sqlite(path: t.Union[str, Path]) -> None:
+    """Removes a SQLite database along with the files WAL mode keeps next to it."""
+    for suffix in ["", "-wal", "-shm"]:
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def split_connector_config(ingest_doc_dict: dict) -> dict:
+    """
+    Returns a copy of the serialized ingest doc without its connector config, nor that of
+    any doc it batches, so that credentials are never written to disk along with it. Every
+    doc of a run shares the connector config of its source, join_connector_config() puts
+    it back.
+    """
+    split = dict(ingest_doc_dict)
+    if "connector_config" in split:
+        split["connector_config"] = None
+    if ingest_docs := split.get("ingest_docs"):
+        split["ingest_docs"] = [split_connector_config(doc) for doc in ingest_docs]
+    return split
+
+
+def join_connector_config(ingest_doc_dict: dict, connector_config: dict) -> dict:
+    """Puts the connector config back into a doc split by split_connector_config()."""
+    if "connector_config" in ingest_doc_dict and ingest_doc_dict["connector_config"] is None:
+        ingest_doc_dict["connector_config"] = copy.deepcopy(connector_config)
+    for doc in ingest_doc_dict.get("ingest_docs") or []:
+        join_connector_config(doc, connector_config)
+    return ingest_doc_dict
+
+
+class SqliteConnectionMixin:
+    """
+    Gives each process, and each thread within it, its own connection to the SQLite
+    database at self.path, since connections can't be shared across either.
+    """
+
+    path: str
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connections"] = {}
+        return state
+
+    def create_tables(self, connection: sqlite3.Connection) -> None:
+        pass
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if "_connections" not in self.__dict__:
+            self._connections: t.Dict[t.Tuple[int, int], sqlite3.Connection] = {}
+        key = (os.getpid(), threading.get_ident())
+        if (connection := self._connections.get(key)) is None:
+            connection = connect_sqlite(self.path)
+            with connection:
+                self.create_tables(connection)
+            self._connections[key] = connection
+        return connection
+
+    def close(self) -> None:
+        connections = getattr(self, "_connections", {})
+        self._connections = {}
+        for (pid, _), connection in connections.items():
+            if pid == os.getpid():
+                connection.close()
+
+
+class WorkerLostError(Exception):
+    """Raised for a task that will never complete since the worker running it died."""
+
+
+def get_dead_workers(workers: t.Dict[int, t.Any], pool: Pool) -> t.List[t.Any]:
+    """
+    Keeps track of the worker processes of the pool in workers, by pid, and returns those
+    that died since the last call, rather than exiting once done, e.g. killed by the OOM
+    killer. The pool replaces them, but the tasks they were running never complete. Pools
+    of threads have no exit codes, their workers are never reported.
+    """
+    for worker in list(getattr(pool, "_pool", [])):
+        if (pid := getattr(worker, "pid", None)) is not None:
+            workers.setdefault(pid, worker)
+    dead = []
+    for pid, worker in list(workers.items()):
+        if worker.exitcode is None:
+            continue
+        del workers[pid]
+        if worker.exitcode != 0:
+            dead.append(worker)
+    return dead
+
+
+def bounded_imap_unordered(
+    pool: Pool,
+    func: t.Callable[[t.Any], t.Any],
+    iterable: t.Iterable[t.Any],
+    max_in_flight: int,
+    on_lost: t.Optional[t.Callable[[t.Any, Exception], t.Any]] = None,
+) -> t.Iterator[t.Tuple[t.Any, t.Any]]:
+    """
+    Lazily submits func(item) to the pool for each item in the iterable, keeping at most
+    max_in_flight tasks pending at any given time, and yields (item, result) tuples in the
+    order the tasks complete. The iterable is only advanced when a slot frees up, which
+    applies backpressure to whatever is producing it, i.e. a previous pipeline stage.
+
+    A worker that dies abruptly never returns the result of its task, so the workers are
+    checked every WORKER_POLL_INTERVAL seconds. Pools that keep track of the task each of
+    their workers runs, i.e. a RecyclingPool, report exactly which tasks were lost, and
+    kill the workers that hang past the timeout of their doc. With any other pool, once a
+    worker died every pending task fails with a WorkerLostError. Failed tasks are passed to
+    on_lost, which gives the result to yield for them, or the error is raised when it's not
+    set.
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be at least 1: {max_in_flight}")
+    completed: queue.Queue = queue.Queue()
+    iterator = iter(iterable)
+    exhausted = False
+    # The item and the job of the pool running it, by task
+    pending: t.Dict[int, t.Tuple[t.Any, t.Optional[int]]] = {}
+    task_ids = itertools.count()
+    get_lost_jobs: t.Optional[t.Callable[[], t.Dict[int, Exception]]] = getattr(
+        pool,
+        "get_lost_jobs",
+        None,
+    )
+    workers: t.Dict[int, t.Any] = {}
+    next_check = time.monotonic() + WORKER_POLL_INTERVAL
+    while True:
+        while not exhausted and len(pending) < max_in_flight:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                exhausted = True
+                break
+            task_id = next(task_ids)
+            async_result = pool.apply_async(
+                func,
+                (item,),
+                callback=lambda result, task_id=task_id: completed.put((task_id, result, None)),
+                error_callback=lambda e, task_id=task_id: completed.put((task_id, None, e)),
+            )
+            pending[task_id] = (item, getattr(async_result, "_job", None))
+        if not pending:
+            return
+        if time.monotonic() >= next_check:
+            next_check = time.monotonic() + WORKER_POLL_INTERVAL
+            lost: t.Dict[int, Exception] = {}
+            if get_lost_jobs is not None:
+                lost_jobs = get_lost_jobs()
+                lost = {
+                    task_id: lost_jobs[job]
+                    for task_id, (_, job) in pending.items()
+                    if job in lost_jobs
+                }
+            elif dead := get_dead_workers(workers, pool):
+                dead_error = WorkerLostError(
+                    f"worker {', '.join(str(worker.pid) for worker in dead)} died "
+                    f"with exit code {', '.join(str(worker.exitcode) for worker in dead)}",
+                )
+                lost = {task_id: dead_error for task_id in pending}
+            for task_id, lost_error in lost.items():
+                item, _ = pending.pop(task_id)
+                if on_lost is None:
+                    raise lost_error
+                yield item, on_lost(item, lost_error)
+            continue
+        try:
+            task_id, result, error = completed.get(
+                timeout=max(next_check - time.monotonic(), 0),
+            )
+        except queue.Empty:
+            continue
+        if task_id not in pending:
+            # The task was already failed as lost
+            continue
+        item, _ = pending.pop(task_id)
+        if error is not None:
+            raise error
+        yield item, result
+
+
+def call_with_index(func: t.Callable[[t.Any], t.Any], indexed_item: t.Tuple[int, t.Any]) -> t.Any:
+    return func(indexed_item[1])
+
+
+def map_with_pool(
+    pool: Pool,
+    func: t.Callable[[t.Any], t.Any],
+    iterable: t.Iterable[t.Any],
+    on_lost: t.Optional[t.Callable[[t.Any, Exception], t.Any]] = None,
+) -> t.List[t.Any]:
+    """
+    Like pool.map(), but tasks that will never complete since their worker was lost fail,
+    as in bounded_imap_unordered(), rather than the map waiting on them forever. The pool
+    hands out one item at a time as its workers free up, in the order of the iterable.
+    """
+    items = list(iterable)
+    results: t.List[t.Any] = [None] * len(items)
+    for (index, _), result in bounded_imap_unordered(
+        pool,
+        functools.partial(call_with_index, func),
+        enumerate(items),
+        max_in_flight=max(len(items), 1),
+        on_lost=None if on_lost is None else lambda item, error: on_lost(item[1], error),
+    ):
+        results[index] = result
+    return results
@@ -0,0 +1,281 @@
+import multiprocessing as mp
+import os
+import signal
+import sys
+import threading
+import time
+import typing as t
+from contextlib import contextmanager
+from multiprocessing.pool import Pool
+
+from unstructured.ingest.logger import logger
+from unstructured.ingest.pipeline.utils import WorkerLostError
+from unstructured.utils import dependency_exists
+
+PSUTIL_AVAILABLE = dependency_exists("psutil")
+if PSUTIL_AVAILABLE:
+    import psutil
+
+# A doc is aborted once the worker partitioning it uses this many times max_worker_memory,
+# below that the worker is only recycled once it's done with the doc
+DOC_MEMORY_LIMIT_FACTOR = 2
+# How often, in seconds, the memory of a worker is checked while it processes a doc
+MEMORY_POLL_INTERVAL = 0.5
+# How long, in seconds, a worker still running a doc past its timeout is given to interrupt
+# itself before the parent kills it
+WORKER_KILL_GRACE_PERIOD = 10.0
+
+# module-level variable to store the queue the workers of a RecyclingPool report to the
+# parent through, only set in those workers
+worker_reports: t.Optional[t.Any] = None
+
+
+class DocTimeoutError(Exception):
+    """Raised when processing a single doc takes longer than the configured timeout."""
+
+
+class WorkerMemoryError(Exception):
+    """Raised when the memory of a worker grows too large while processing a single doc."""
+
+
+def get_rss() -> t.Optional[int]:
+    """The resident memory of the current process in bytes, if it can be determined."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Falls back to the peak usage, reported in kilobytes except on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def report_to_parent(kind: str, value: t.Any) -> None:
+    """
+    Reports what the current worker is up to, see RecyclingPool.get_lost_jobs(). Does
+    nothing outside the workers of a RecyclingPool.
+    """
+    if worker_reports is not None:
+        worker_reports.put((os.getpid(), kind, value))
+
+
+class WorkerTaskQueue:
+    """
+    Wraps the queue that pool workers take their tasks from. Each worker reports the task it
+    takes to the parent, so that the parent knows which task a worker was running when it
+    dies. When max_memory is set, before taking the next task, a worker whose memory grew
+    beyond it gets the sentinel instead, so it exits the same way it does after max tasks
+    per child and the pool starts a fresh one in its place. Every worker takes at least one
+    task, so that the pool makes progress even when a fresh worker already uses more than
+    max_memory.
+    """
+
+    def __init__(
+        self,
+        queue: t.Any,
+        reports: t.Any,
+        max_memory: t.Optional[int],
+        num_recycled: t.Any,
+    ):
+        self.queue = queue
+        self.reports = reports
+        self.max_memory = max_memory
+        self.num_recycled = num_recycled
+        self.num_taken = 0
+
+    @property
+    def _writer(self):
+        return self.queue._writer
+
+    def get(self):
+        global worker_reports
+        worker_reports = self.reports
+        rss = get_rss() if self.num_taken and self.max_memory is not None else None
+        if rss is not None and self.max_memory is not None and rss > self.max_memory:
+            logger.info(
+                f"recycling worker {os.getpid()} using {rss // 2**20} MiB, "
+                f"more than the max of {self.max_memory // 2**20} MiB",
+            )
+            with self.num_recycled.get_lock():
+                self.num_recycled.value += 1
+            report_to_parent("task", None)
+            return None
+        self.num_taken += 1
+        task = self.queue.get()
+        # Tasks are (job, index, func, args, kwargs) tuples, the sentinel is None
+        report_to_parent("task", None if task is None else task[0])
+        return task
+
+
+class RecyclingPool(Pool):
+    """
+    Pool of worker processes that replaces workers whose memory grew beyond max_memory, and
+    that keeps track of the task each worker runs so that the tasks of workers that died, or
+    hung past the timeout of their doc, can be failed rather than waited on forever.
+    """
+
+    def __init__(self, *args, max_memory: t.Optional[int] = None, **kwargs):
+        self.max_memory = max_memory
+        self.num_recycled = mp.Value("i", 0)
+        self.reports = (kwargs.get("context") or mp.get_context()).SimpleQueue()
+        self.workers: t.List[t.Any] = []
+        # The job, node and deadline of the task each worker is running, by pid
+        self.running: t.Dict[int, t.Tuple[int, t.Optional[str], t.Optional[float]]] = {}
+        self.running_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def Process(self, ctx, *args, **kwds):  # noqa: N802
+        inqueue, *worker_args = kwds["args"]
+        kwds["args"] = (
+            WorkerTaskQueue(inqueue, self.reports, self.max_memory, self.num_recycled),
+            *worker_args,
+        )
+        worker = ctx.Process(*args, **kwds)
+        self.workers.append(worker)
+        return worker
+
+    def read_reports(self):
+        while not self.reports.empty():
+            pid, kind, value = self.reports.get()
+            job, node, deadline = self.running.get(pid, (None, None, None))
+            if kind == "task":
+                if value is None:
+                    self.running.pop(pid, None)
+                    continue
+                job, node, deadline = value, None, None
+            elif kind == "node":
+                node = value
+            elif kind == "timeout":
+                deadline = (
+                    None if value is None else time.monotonic() + value + WORKER_KILL_GRACE_PERIOD
+                )
+            if job is not None:
+                self.running[pid] = (job, node, deadline)
+
+    def get_lost_jobs(self) -> t.Dict[int, Exception]:
+        """
+        The jobs that will never complete, by id, with the error to fail them with. Those are
+        the jobs of workers that died, e.g. killed by the OOM killer, and of workers still
+        running a doc WORKER_KILL_GRACE_PERIOD seconds past its timeout, e.g. stuck in native
+        code, which are killed. Either way the pool starts a fresh worker in their place.
+        The node the worker was running is set as the node of each error.
+        """
+        lost: t.Dict[int, Exception] = {}
+        with self.running_lock:
+            self.read_reports()
+            workers = {worker.pid: worker for worker in list(self.workers) if worker.pid}
+            now = time.monotonic()
+            for pid, (job, node, deadline) in list(self.running.items()):
+                worker = workers.get(pid)
+                if worker is None:
+                    continue
+                error: t.Optional[Exception] = None
+                if worker.exitcode is None and deadline is not None and now > deadline:
+                    logger.warning(f"killing worker {pid} running a doc past its timeout")
+                    worker.kill()
+                    worker.join(timeout=WORKER_KILL_GRACE_PERIOD)
+                    error = DocTimeoutError("worker killed after running past the doc timeout")
+                elif worker.exitcode is not None:
+                    # A worker exits on its own only once done with its task
+                    if worker.exitcode != 0:
+                        error = WorkerLostError(
+                            f"worker {pid} died with exit code {worker.exitcode}",
+                        )
+                else:
+                    continue
+                del self.running[pid]
+                if error is not None:
+                    setattr(error, "node", node)
+                    lost[job] = error
+            self.workers = [
+                worker
+                for worker in self.workers
+                if worker.exitcode is None or worker.pid in self.running
+            ]
+        return lost
+
+
+@contextmanager
+def guard_doc(
+    timeout: t.Optional[float] = None,
+    max_memory: t.Optional[int] = None,
+) -> t.Generator[None, None, None]:
+    """
+    Interrupts the code run within it with a DocTimeoutError once it runs longer than the
+    timeout, or a WorkerMemoryError once the process uses more than max_memory bytes, see
+    interrupt_doc(). Code that doesn't return to the interpreter, e.g. a single long call
+    into a C extension, can't be interrupted, so in the workers of a RecyclingPool the
+    parent also kills the worker once it runs WORKER_KILL_GRACE_PERIOD seconds past the
+    timeout, and fails its task.
+    """
+    if timeout is not None:
+        report_to_parent("timeout", timeout)
+    try:
+        with interrupt_doc(timeout=timeout, max_memory=max_memory):
+            yield
+    finally:
+        if timeout is not None:
+            report_to_parent("timeout", None)
+
+
+@contextmanager
+def interrupt_doc(
+    timeout: t.Optional[float] = None,
+    max_memory: t.Optional[int] = None,
+) -> t.Generator[None, None, None]:
+    """
+    Interrupts the code run within it with a DocTimeoutError once it runs longer than the
+    timeout, or a WorkerMemoryError once the process uses more than max_memory bytes, by
+    raising them from a signal handler. That requires running in the main thread of a
+    process on a platform with SIGALRM, elsewhere the code runs unguarded. Code that doesn't
+    return to the interpreter is only interrupted once it does.
+    """
+    if (
+        (timeout is None and max_memory is None)
+        or threading.current_thread() is not threading.main_thread()
+        or not hasattr(signal, "SIGALRM")
+    ):
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise DocTimeoutError(f"timed out after {timeout}s")
+
+    exceeded: t.List[int] = []
+
+    def on_memory_exceeded(signum, frame):
+        raise WorkerMemoryError(f"worker memory grew to {exceeded[0] // 2**20} MiB")
+
+    done = threading.Event()
+
+    def watch_memory(max_memory: int):
+        while not done.wait(MEMORY_POLL_INTERVAL):
+            rss = get_rss()
+            if rss is not None and rss > max_memory:
+                exceeded.append(rss)
+                os.kill(os.getpid(), signal.SIGUSR1)
+                return
+
+    previous_alarm_handler = signal.signal(signal.SIGALRM, on_timeout)
+    previous_memory_handler = signal.signal(signal.SIGUSR1, on_memory_exceeded)
+    watcher = None
+    try:
+        if max_memory is not None:
+            watcher = threading.Thread(target=watch_memory, args=(max_memory,), daemon=True)
+            watcher.start()
+        if timeout is not None:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        done.set()
+        if watcher is not None:
+            watcher.join()
+        signal.signal(signal.SIGALRM, previous_alarm_handler)
+        signal.signal(signal.SIGUSR1, previous_memory_handler)
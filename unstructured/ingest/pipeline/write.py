@@ -1,18 +1,20 @@
-import os.path
 import typing as t
 from dataclasses import dataclass
 
 from unstructured.ingest.connector.registry import create_ingest_doc_from_dict
 from unstructured.ingest.pipeline.interfaces import WriteNode
+from unstructured.ingest.pipeline.utils import get_doc_hash_from_path
 
 
 @dataclass
 class Writer(WriteNode):
     def run(self, json_paths: t.List[str]):
-        ingest_docs = []
-        for json_path in json_paths:
-            filename = os.path.basename(json_path)
-            doc_hash = os.path.splitext(filename)[0]
-            ingest_doc_dict = self.pipeline_context.ingest_docs_map[doc_hash]
-            ingest_docs.append(create_ingest_doc_from_dict(ingest_doc_dict))
-        self.dest_doc_connector.write(docs=ingest_docs)
+        doc_hashes = [get_doc_hash_from_path(json_path) for json_path in json_paths]
+        ingest_doc_dicts = self.pipeline_context.ingest_docs_map.get_many(doc_hashes)
+        ingest_docs = [create_ingest_doc_from_dict(d) for d in ingest_doc_dicts]
+        with self.limit_requests(
+            f"destination:{self.dest_doc_connector.__class__.__name__}",
+            requests_per_second=self.pipeline_context.destination_requests_per_second,
+            max_concurrency=self.pipeline_context.destination_max_concurrency,
+        ):
+            self.dest_doc_connector.write(docs=ingest_docs)
@@ -0,0 +1,61 @@
+import itertools
+import json
+import typing as t
+
+from unstructured.ingest.interfaces import BaseIngestDoc
+from unstructured.ingest.logger import logger
+
+T = t.TypeVar("T")
+
+
+def get_json_size(data: t.Any) -> int:
+    """Number of bytes the data takes up once serialized to json."""
+    return len(json.dumps(data).encode("utf-8"))
+
+
+def batch_generator(
+    iterable: t.Iterable[T],
+    batch_size: t.Optional[int] = None,
+    max_batch_bytes: t.Optional[int] = None,
+    get_size: t.Callable[[T], int] = get_json_size,
+) -> t.Iterator[t.List[T]]:
+    """
+    Lazily groups the items into lists holding at most batch_size items and, if
+    max_batch_bytes is set, whose items take up at most that many bytes as measured by
+    get_size. An item larger than max_batch_bytes on its own is yielded as a single batch.
+    """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1: {batch_size}")
+    iterator = iter(iterable)
+    if max_batch_bytes is None:
+        while chunk := list(itertools.islice(iterator, batch_size)):
+            yield chunk
+        return
+    batch: t.List[T] = []
+    batch_bytes = 0
+    for item in iterator:
+        item_bytes = get_size(item)
+        if batch and (
+            batch_bytes + item_bytes > max_batch_bytes
+            or (batch_size is not None and len(batch) >= batch_size)
+        ):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(item)
+        batch_bytes += item_bytes
+    if batch:
+        yield batch
+
+
+def iter_elements_dicts(docs: t.Iterable[BaseIngestDoc]) -> t.Iterator[t.Dict[str, t.Any]]:
+    """
+    Lazily yields the element dicts in the output json of each doc, only ever holding the
+    content of a single doc in memory.
+    """
+    for doc in docs:
+        local_path = doc._output_filename
+        with open(local_path) as json_file:
+            elements_dict = json.load(json_file)
+        logger.info(f"streaming {len(elements_dict)} json elements from content in {local_path}")
+        yield from elements_dict
@@ -0,0 +1,58 @@
+import hashlib
+import json
+import shutil
+import typing as t
+from pathlib import Path
+
+from unstructured.ingest.logger import logger
+
+
+def get_shard_index(unique_id: str, num_shards: int) -> int:
+    """
+    Maps a doc to a shard by hashing its unique id. Unlike the builtin hash, which is salted
+    per process, this gives every machine running the same listing the same answer.
+    """
+    digest = hashlib.sha256(str(unique_id).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards
+
+
+def merge_shard_outputs(
+    shard_output_dirs: t.List[t.Union[str, Path]],
+    output_dir: t.Union[str, Path],
+) -> t.Dict[str, t.Any]:
+    """
+    Copies the json outputs of every shard of a sharded run into output_dir and returns
+    how many docs and elements each shard contributed. Since shards are disjoint, finding
+    the same output in two of them means they weren't run with the same --num-shards.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    merged_from: t.Dict[Path, Path] = {}
+    shard_stats = []
+    for shard_output_dir in map(Path, shard_output_dirs):
+        if not shard_output_dir.is_dir():
+            raise ValueError(f"shard output dir not found: {shard_output_dir}")
+        num_docs = num_elements = 0
+        for json_path in sorted(shard_output_dir.rglob("*.json")):
+            relative_path = json_path.relative_to(shard_output_dir)
+            if relative_path in merged_from:
+                raise ValueError(
+                    f"{relative_path} found in both {merged_from[relative_path]} and "
+                    f"{shard_output_dir}, were the shards run with the same --num-shards?",
+                )
+            merged_from[relative_path] = shard_output_dir
+            with open(json_path) as json_f:
+                num_elements += len(json.load(json_f))
+            num_docs += 1
+            destination = output_dir / relative_path
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(json_path, destination)
+        logger.info(f"merged {num_docs} docs from {shard_output_dir}")
+        shard_stats.append(
+            {"output_dir": str(shard_output_dir), "docs": num_docs, "elements": num_elements},
+        )
+    return {
+        "docs": sum(stats["docs"] for stats in shard_stats),
+        "elements": sum(stats["elements"] for stats in shard_stats),
+        "shards": shard_stats,
+    }
@@ -1,18 +1,33 @@
 import contextlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     IO,
+    Any,
+    Dict,
     List,
     Optional,
+    Tuple,
 )
 
 import requests
+from requests.adapters import HTTPAdapter
 from unstructured_client import UnstructuredClient
 from unstructured_client.models import shared
+from urllib3.util.retry import Retry
 
 from unstructured.documents.elements import Element
 from unstructured.logger import logger
 from unstructured.partition.common import exactly_one
 from unstructured.staging.base import dict_to_elements, elements_from_json
+from unstructured.utils import requires_dependencies
+
+DEFAULT_API_URL = "https://api.unstructured.io/general/v0/general"
+# Responses worth retrying, since the API is overloaded or restarting rather than rejecting
+# the request itself
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
 
 
 def partition_via_api(
@@ -110,7 +125,8 @@ def partition_multiple_via_api(
     **request_kwargs,
 ) -> List[List[Element]]:
     """Partitions multiple documents using the Unstructured REST API by batching
-    the documents into a single HTTP request.
+    the documents into a single HTTP request. To instead send a request per document
+    concurrently, reusing connections and retrying failed requests, use PartitionApiClient.
 
     See https://api.unstructured.io/general/docs for the hosted API documentation or
     https://github.com/Unstructured-IO/unstructured-api for instructions on how to run
@@ -209,3 +225,208 @@ def partition_multiple_via_api(
         raise ValueError(
             f"Receive unexpected status code {response.status_code} from the API.",
         )
+
+
+@requires_dependencies(["pypdf"], extras="pdf")
+def split_pdf(content: bytes, page_range_size: int) -> List[Tuple[int, bytes]]:
+    """Splits the pdf in documents of at most page_range_size pages, with their first page."""
+    import pypdf
+
+    pdf_reader = pypdf.PdfReader(io.BytesIO(content))
+    num_pages = len(pdf_reader.pages)
+    splits = []
+    for start in range(0, num_pages, page_range_size):
+        pdf_writer = pypdf.PdfWriter()
+        for page in pdf_reader.pages[start : start + page_range_size]:  # noqa: E203
+            pdf_writer.add_page(page)
+        split = io.BytesIO()
+        pdf_writer.write(split)
+        splits.append((start + 1, split.getvalue()))
+    return splits
+
+
+def _to_form_data(request_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for k, v in request_kwargs.items():
+        if v is None:
+            continue
+        if isinstance(v, bool):
+            data[k] = str(v).lower()
+        elif isinstance(v, (list, tuple)):
+            data[k] = [str(item) for item in v]
+        else:
+            data[k] = str(v)
+    return data
+
+
+class PartitionApiClient:
+    """Client for the Unstructured REST API meant to be reused across many documents.
+
+    Requests go through a single session, so connections to the API are kept alive rather than
+    opened for every document. At most max_concurrency requests are in flight at a time, and
+    requests that fail to connect or get a response worth retrying are retried with exponential
+    backoff. PDFs can also be split in ranges of pages that are partitioned concurrently.
+
+    Parameters
+    ----------
+    api_url
+        The URL for the Unstructured API. Defaults to the hosted Unstructured API.
+    api_key
+        The API key to pass to the Unstructured API.
+    max_concurrency
+        How many requests can be in flight at a time, across all threads using the client.
+    max_retries
+        How many times a request is retried before giving up.
+    backoff_factor
+        Retries wait backoff_factor * 2 ** (retry - 1) seconds, unless the API responds with a
+        Retry-After header.
+    timeout
+        How many seconds to wait for the API to respond to each request, by default forever.
+    """
+
+    def __init__(
+        self,
+        api_url: str = DEFAULT_API_URL,
+        api_key: str = "",
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout: Optional[float] = None,
+    ):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                "ACCEPT": "application/json",
+                "UNSTRUCTURED-API-KEY": api_key,
+            },
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max_concurrency,
+            max_retries=Retry(
+                total=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUS_CODES,
+                # Partitioning has no side effects, so posting again is safe
+                allowed_methods=None,
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._in_flight = threading.BoundedSemaphore(max_concurrency)
+
+    def __enter__(self) -> "PartitionApiClient":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def post(
+        self,
+        content: bytes,
+        filename: str,
+        content_type: Optional[str] = None,
+        **request_kwargs,
+    ) -> List[Dict[str, Any]]:
+        """Partitions a single document, returning the elements as dictionaries."""
+        with self._in_flight:
+            response = self.session.post(
+                self.api_url,
+                data=_to_form_data(request_kwargs),
+                files=[("files", (filename, content, content_type))],
+                timeout=self.timeout,
+            )
+        if response.status_code != 200:
+            raise ValueError(
+                f"Receive unexpected status code {response.status_code} from the API.",
+            )
+        return response.json()
+
+    def partition(
+        self,
+        filename: Optional[str] = None,
+        file: Optional[IO[bytes]] = None,
+        metadata_filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        split_pdf_page_range: Optional[int] = None,
+        **request_kwargs,
+    ) -> List[Element]:
+        """Partitions a document, equivalent to partition_via_api.
+
+        If split_pdf_page_range is set, PDFs with more pages than that are split in ranges of at
+        most that many pages, which are partitioned concurrently. The elements of each range are
+        then put back together in order, with their page numbers shifted back to the page they
+        were on in the whole document.
+        """
+        exactly_one(filename=filename, file=file)
+        if filename is not None:
+            with open(filename, "rb") as f:
+                content = f.read()
+            metadata_filename = metadata_filename or filename
+        else:
+            if metadata_filename is None:
+                raise ValueError(
+                    "If file is specified in partition, metadata_filename must be specified "
+                    "as well.",
+                )
+            content = file.read()  # type: ignore
+        metadata_filename = os.path.basename(metadata_filename)
+
+        splits = [(1, content)]
+        if split_pdf_page_range and content.startswith(b"%PDF"):
+            splits = split_pdf(content, page_range_size=split_pdf_page_range)
+        if len(splits) == 1:
+            return dict_to_elements(
+                self.post(content, metadata_filename, content_type, **request_kwargs),
+            )
+
+        logger.debug(f"Partitioning {metadata_filename} in {len(splits)} ranges of pages")
+        with ThreadPoolExecutor(max_workers=min(len(splits), self.max_concurrency)) as executor:
+            responses = list(
+                executor.map(
+                    lambda split: self.post(
+                        split[1],
+                        metadata_filename,
+                        content_type,
+                        **request_kwargs,
+                    ),
+                    splits,
+                ),
+            )
+        elements = []
+        for (first_page, _), element_dicts in zip(splits, responses):
+            for element in dict_to_elements(element_dicts):
+                if element.metadata.page_number is not None:
+                    element.metadata.page_number += first_page - 1
+                elements.append(element)
+        return elements
+
+    def partition_multiple(
+        self,
+        filenames: List[str],
+        content_types: Optional[List[str]] = None,
+        **request_kwargs,
+    ) -> List[List[Element]]:
+        """Partitions the documents concurrently, with a request per document, in order."""
+        if content_types and len(content_types) != len(filenames):
+            raise ValueError("content_types and filenames must have the same length.")
+        content_types = content_types or [None] * len(filenames)  # type: ignore
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return list(
+                executor.map(
+                    lambda args: self.partition(
+                        filename=args[0],
+                        content_type=args[1],
+                        **request_kwargs,
+                    ),
+                    zip(filenames, content_types),  # type: ignore
+                ),
+            )
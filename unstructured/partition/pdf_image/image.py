@@ -53,6 +53,11 @@ def partition_image(
         model if to identify document elements. When using the "ocr_only" strategy,
         partition_image simply extracts the text from the document using OCR and processes it.
         The default strategy is `hi_res`.
+        With the "ocr_only" strategy, every frame of a multi-page image, e.g. a TIFF, is OCRed
+        as a page of its own.
+    ocr_max_workers
+        Only applicable if `strategy=ocr_only`. The number of pages OCRed at once by a pool of
+        threads, the `OCR_MAX_WORKERS` environment variable by default.
     metadata_last_modified
         The last modified date for the document.
     """
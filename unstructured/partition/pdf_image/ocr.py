@@ -6,7 +6,6 @@ from typing import BinaryIO, Dict, List, Optional, Union, cast
 import cv2
 import numpy as np
 import pandas as pd
-import pdf2image
 import unstructured_pytesseract
 
 # NOTE(yuming): Rename PIL.Image to avoid conflict with
@@ -24,7 +23,7 @@ from unstructured_pytesseract import Output
 
 from unstructured.documents.elements import ElementType
 from unstructured.logger import logger
-from unstructured.partition.pdf_image.pdf_image_utils import valid_text
+from unstructured.partition.pdf_image.pdf_image_utils import PdfPageImages, valid_text
 from unstructured.partition.utils.config import env_config
 from unstructured.partition.utils.constants import (
     IMAGE_COLOR_DEPTH,
@@ -51,6 +50,7 @@ def process_data_with_ocr(
     ocr_languages: str = "eng",
     ocr_mode: str = OCRMode.FULL_PAGE.value,
     pdf_image_dpi: int = 200,
+    pdf_page_images: Optional[PdfPageImages] = None,
 ) -> "DocumentLayout":
     """
     Process OCR data from a given data and supplement the output DocumentLayout
@@ -76,6 +76,9 @@ def process_data_with_ocr(
 
     - pdf_image_dpi (int, optional): DPI (dots per inch) for processing PDF images. Defaults to 200.
 
+    - pdf_page_images (PdfPageImages, optional): The renderings of the PDF pages to OCR, shared
+        with the other steps of partitioning. If not given, the pages are rendered anew.
+
     Returns:
         DocumentLayout: The merged layout information obtained after OCR processing.
     """
@@ -90,6 +93,7 @@ def process_data_with_ocr(
             ocr_languages=ocr_languages,
             ocr_mode=ocr_mode,
             pdf_image_dpi=pdf_image_dpi,
+            pdf_page_images=pdf_page_images,
         )
         return merged_layouts
 
@@ -102,6 +106,7 @@ def process_file_with_ocr(
     ocr_languages: str = "eng",
     ocr_mode: str = OCRMode.FULL_PAGE.value,
     pdf_image_dpi: int = 200,
+    pdf_page_images: Optional[PdfPageImages] = None,
 ) -> "DocumentLayout":
     """
     Process OCR data from a given file and supplement the output DocumentLayout
@@ -126,6 +131,9 @@ def process_file_with_ocr(
 
     - pdf_image_dpi (int, optional): DPI (dots per inch) for processing PDF images. Defaults to 200.
 
+    - pdf_page_images (PdfPageImages, optional): The renderings of the PDF pages to OCR, shared
+        with the other steps of partitioning. If not given, the pages are rendered anew.
+
     Returns:
         DocumentLayout: The merged layout information obtained after OCR processing.
     """
@@ -146,26 +154,28 @@ def process_file_with_ocr(
                     )
                     merged_page_layouts.append(merged_page_layout)
                 return DocumentLayout.from_pages(merged_page_layouts)
-        else:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                _image_paths = pdf2image.convert_from_path(
+        elif pdf_page_images is None:
+            with PdfPageImages(filename=filename, dpi=pdf_image_dpi) as pdf_page_images:
+                return process_file_with_ocr(
                     filename,
-                    dpi=pdf_image_dpi,
-                    output_folder=temp_dir,
-                    paths_only=True,
+                    out_layout,
+                    infer_table_structure=infer_table_structure,
+                    ocr_languages=ocr_languages,
+                    ocr_mode=ocr_mode,
+                    pdf_image_dpi=pdf_image_dpi,
+                    pdf_page_images=pdf_page_images,
                 )
-                image_paths = cast(List[str], _image_paths)
-                for i, image_path in enumerate(image_paths):
-                    with PILImage.open(image_path) as image:
-                        merged_page_layout = supplement_page_layout_with_ocr(
-                            out_layout.pages[i],
-                            image,
-                            infer_table_structure=infer_table_structure,
-                            ocr_languages=ocr_languages,
-                            ocr_mode=ocr_mode,
-                        )
-                        merged_page_layouts.append(merged_page_layout)
-                return DocumentLayout.from_pages(merged_page_layouts)
+        else:
+            for i, image in enumerate(pdf_page_images):
+                merged_page_layout = supplement_page_layout_with_ocr(
+                    out_layout.pages[i],
+                    image,
+                    infer_table_structure=infer_table_structure,
+                    ocr_languages=ocr_languages,
+                    ocr_mode=ocr_mode,
+                )
+                merged_page_layouts.append(merged_page_layout)
+            return DocumentLayout.from_pages(merged_page_layouts)
     except Exception as e:
         if os.path.isdir(filename) or os.path.isfile(filename):
             raise e
@@ -1,15 +1,20 @@
 import contextlib
 import io
+import multiprocessing
 import os
 import re
 import warnings
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from tempfile import SpooledTemporaryFile
 from typing import (
     IO,
     TYPE_CHECKING,
     Any,
     BinaryIO,
+    Deque,
     Dict,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -33,6 +38,7 @@ from pdfminer.layout import (
 from pdfminer.pdftypes import PDFObjRef
 from pdfminer.utils import open_filename
 from PIL import Image as PILImage
+from PIL import ImageSequence
 
 from unstructured.chunking.title import add_chunking_strategy
 from unstructured.cleaners.core import (
@@ -72,6 +78,7 @@ from unstructured.partition.lang import (
     prepare_languages_for_tesseract,
 )
 from unstructured.partition.pdf_image.pdf_image_utils import (
+    PdfPageImages,
     check_element_types_to_extract,
     save_elements,
 )
@@ -79,9 +86,15 @@ from unstructured.partition.pdf_image.pdfminer_utils import (
     open_pdfminer_pages_generator,
     rect_to_bbox,
 )
-from unstructured.partition.strategies import determine_pdf_or_image_strategy, validate_strategy
+from unstructured.partition.strategies import (
+    determine_pdf_or_image_strategy,
+    is_pdf_text_extractable,
+    validate_strategy,
+)
 from unstructured.partition.text import element_from_text
+from unstructured.partition.utils.config import env_config
 from unstructured.partition.utils.constants import (
+    OCR_AGENT_PADDLE,
     OCR_AGENT_TESSERACT,
     SORT_MODE_BASIC,
     SORT_MODE_DONT,
@@ -98,7 +111,7 @@ from unstructured.patches.pdfminer import parse_keyword
 from unstructured.utils import requires_dependencies
 
 if TYPE_CHECKING:
-    pass
+    from unstructured_inference.inference.layout import DocumentLayout, PageLayout
 
 
 # NOTE(alan): Patching this to fix a bug in pdfminer.six. Submitted this PR into pdfminer.six to fix
@@ -175,6 +188,22 @@ def partition_pdf(
     image_output_dir_path
         If extract_images_in_pdf=True (or extract_tables_in_pdf=True) and strategy=hi_res, any
         detected images or tables will be saved in the given path
+    max_workers
+        Only applicable if `strategy=hi_res`. If greater than 1, the pages of the document are
+        split into ranges of `page_batch_size` pages that a pool of this many worker processes,
+        each loading the layout model once, partition concurrently. The elements are the same
+        as when partitioning the pages one at a time. Starting the workers takes a few seconds,
+        so this pays off for long documents.
+    ocr_max_workers
+        Only applicable if `strategy=ocr_only`. The number of pages OCRed at once by a pool of
+        threads, each running tesseract in a process of its own, single threaded unless
+        `OMP_THREAD_LIMIT` says otherwise. The `OCR_MAX_WORKERS` environment variable by
+        default, which defaults to the number of cpus, or to 1 within daemon processes, e.g. the
+        workers of a pool, so that several of them don't each start as many tesseract processes
+        as there are cpus.
+    page_batch_size
+        The number of pages each worker partitions at a time when `max_workers` is set, 10 by
+        default.
     """
 
     exactly_one(filename=filename, file=file)
@@ -216,6 +245,16 @@ def extractable_elements(
     )
 
 
+def _partition_pdf_with_pdfminer_or_warn(**kwargs: Any) -> List[Element]:
+    """The elements extracted from the PDF with pdfminer, none if that fails."""
+    try:
+        return extractable_elements(**kwargs)
+    except Exception as e:
+        logger.error(e)
+        logger.warning("PDF text extraction failed, skip text extraction...")
+        return []
+
+
 def get_the_last_modification_date_pdf_or_img(
     file: Optional[Union[bytes, BinaryIO, SpooledTemporaryFile]] = None,
     filename: Optional[str] = "",
@@ -244,6 +283,8 @@ def _partition_pdf_or_image_local(
     extract_element_types: Optional[List[str]] = None,
     image_output_dir_path: Optional[str] = None,
     pdf_image_dpi: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    page_batch_size: int = 10,
     **kwargs,
 ) -> List[Element]:
     """Partition using package installed locally"""
@@ -275,118 +316,157 @@ def _partition_pdf_or_image_local(
             f"(currently {pdf_image_dpi}).",
         )
 
-    if file is None:
-        inferred_document_layout = process_file_with_model(
-            filename,
-            is_image=is_image,
-            model_name=model_name,
-            pdf_image_dpi=pdf_image_dpi,
-        )
-
-        if pdf_text_extractable is True:
-            # NOTE(christine): merged_document_layout = extracted_layout + inferred_layout
-            merged_document_layout = process_file_with_pdfminer(
-                inferred_document_layout,
-                filename,
-            )
-        else:
-            merged_document_layout = inferred_document_layout
-
-        if model_name.startswith("chipper"):
-            # NOTE(alan): We shouldn't do OCR with chipper
-            final_document_layout = merged_document_layout
-        else:
-            final_document_layout = process_file_with_ocr(
-                filename,
-                merged_document_layout,
-                is_image=is_image,
+    # Each page of a pdf is rendered once and shared by the layout model, OCR and extracting
+    # images of elements
+    with (
+        contextlib.nullcontext()
+        if is_image
+        else PdfPageImages(filename=filename, file=file, dpi=pdf_image_dpi)
+    ) as pdf_page_images:
+        if pdf_page_images is not None and _can_partition_pages_in_parallel(
+            pdf_page_images,
+            max_workers=max_workers,
+            page_batch_size=page_batch_size,
+        ):
+            final_document_layout = _partition_pdf_pages_in_parallel(
+                pdf_page_images,
+                max_workers=cast(int, max_workers),
+                page_batch_size=page_batch_size,
+                model_name=model_name,
+                pdf_text_extractable=pdf_text_extractable,
                 infer_table_structure=infer_table_structure,
                 ocr_languages=ocr_languages,
                 ocr_mode=ocr_mode,
-                pdf_image_dpi=pdf_image_dpi,
             )
-    else:
-        inferred_document_layout = process_data_with_model(
-            file,
-            is_image=is_image,
-            model_name=model_name,
-            pdf_image_dpi=pdf_image_dpi,
-        )
-        if hasattr(file, "seek"):
-            file.seek(0)
-        if pdf_text_extractable is True:
-            # NOTE(christine): merged_document_layout = extracted_layout + inferred_layout
-            merged_document_layout = process_data_with_pdfminer(
-                inferred_document_layout,
-                file,
-            )
-        else:
-            merged_document_layout = inferred_document_layout
+        elif file is None:
+            if pdf_page_images is None:
+                inferred_document_layout = process_file_with_model(
+                    filename,
+                    is_image=is_image,
+                    model_name=model_name,
+                    pdf_image_dpi=pdf_image_dpi,
+                )
+            else:
+                inferred_document_layout = process_pdf_page_images_with_model(
+                    pdf_page_images,
+                    model_name=model_name,
+                )
 
-        if model_name.startswith("chipper"):
-            # NOTE(alan): We shouldn't do OCR with chipper
-            final_document_layout = merged_document_layout
+            if pdf_text_extractable is True:
+                # NOTE(christine): merged_document_layout = extracted_layout + inferred_layout
+                merged_document_layout = process_file_with_pdfminer(
+                    inferred_document_layout,
+                    filename,
+                )
+            else:
+                merged_document_layout = inferred_document_layout
+
+            if model_name.startswith("chipper"):
+                # NOTE(alan): We shouldn't do OCR with chipper
+                final_document_layout = merged_document_layout
+            else:
+                final_document_layout = process_file_with_ocr(
+                    filename,
+                    merged_document_layout,
+                    is_image=is_image,
+                    infer_table_structure=infer_table_structure,
+                    ocr_languages=ocr_languages,
+                    ocr_mode=ocr_mode,
+                    pdf_image_dpi=pdf_image_dpi,
+                    pdf_page_images=pdf_page_images,
+                )
         else:
+            if pdf_page_images is None:
+                inferred_document_layout = process_data_with_model(
+                    file,
+                    is_image=is_image,
+                    model_name=model_name,
+                    pdf_image_dpi=pdf_image_dpi,
+                )
+            else:
+                inferred_document_layout = process_pdf_page_images_with_model(
+                    pdf_page_images,
+                    model_name=model_name,
+                )
             if hasattr(file, "seek"):
                 file.seek(0)
-            final_document_layout = process_data_with_ocr(
-                file,
-                merged_document_layout,
-                is_image=is_image,
-                infer_table_structure=infer_table_structure,
-                ocr_languages=ocr_languages,
-                ocr_mode=ocr_mode,
-                pdf_image_dpi=pdf_image_dpi,
-            )
+            if pdf_text_extractable is True:
+                # NOTE(christine): merged_document_layout = extracted_layout + inferred_layout
+                merged_document_layout = process_data_with_pdfminer(
+                    inferred_document_layout,
+                    file,
+                )
+            else:
+                merged_document_layout = inferred_document_layout
 
-    # NOTE(alan): starting with v2, chipper sorts the elements itself.
-    if model_name == "chipper":
-        kwargs["sort_mode"] = SORT_MODE_DONT
+            if model_name.startswith("chipper"):
+                # NOTE(alan): We shouldn't do OCR with chipper
+                final_document_layout = merged_document_layout
+            else:
+                if hasattr(file, "seek"):
+                    file.seek(0)
+                final_document_layout = process_data_with_ocr(
+                    file,
+                    merged_document_layout,
+                    is_image=is_image,
+                    infer_table_structure=infer_table_structure,
+                    ocr_languages=ocr_languages,
+                    ocr_mode=ocr_mode,
+                    pdf_image_dpi=pdf_image_dpi,
+                    pdf_page_images=pdf_page_images,
+                )
 
-    final_document_layout = clean_pdfminer_inner_elements(final_document_layout)
+        # NOTE(alan): starting with v2, chipper sorts the elements itself.
+        if model_name == "chipper":
+            kwargs["sort_mode"] = SORT_MODE_DONT
 
-    for page in final_document_layout.pages:
-        for el in page.elements:
-            el.text = el.text or ""
+        final_document_layout = clean_pdfminer_inner_elements(final_document_layout)
 
-    elements = document_to_element_list(
-        final_document_layout,
-        sortable=True,
-        include_page_breaks=include_page_breaks,
-        last_modification_date=metadata_last_modified,
-        # NOTE(crag): do not attempt to derive ListItem's from a layout-recognized "List"
-        # block with NLP rules. Otherwise, the assumptions in
-        # unstructured.partition.common::layout_list_to_list_items often result in weird chunking.
-        infer_list_items=False,
-        languages=languages,
-        **kwargs,
-    )
+        for page in final_document_layout.pages:
+            for el in page.elements:
+                el.text = el.text or ""
 
-    extract_element_types = check_element_types_to_extract(extract_element_types)
-    #  NOTE(christine): `extract_images_in_pdf` would deprecate
-    #  (but continue to support for a while)
-    if extract_images_in_pdf:
-        save_elements(
-            elements=elements,
-            element_category_to_save=ElementType.IMAGE,
-            filename=filename,
-            file=file,
-            pdf_image_dpi=pdf_image_dpi,
-            output_dir_path=image_output_dir_path,
+        elements = document_to_element_list(
+            final_document_layout,
+            sortable=True,
+            include_page_breaks=include_page_breaks,
+            last_modification_date=metadata_last_modified,
+            # NOTE(crag): do not attempt to derive ListItem's from a layout-recognized "List"
+            # block with NLP rules. Otherwise, the assumptions in
+            # unstructured.partition.common::layout_list_to_list_items often result in weird
+            # chunking.
+            infer_list_items=False,
+            languages=languages,
+            **kwargs,
         )
 
-    for el_type in extract_element_types:
-        if extract_images_in_pdf and el_type == ElementType.IMAGE:
-            continue
+        extract_element_types = check_element_types_to_extract(extract_element_types)
+        #  NOTE(christine): `extract_images_in_pdf` would deprecate
+        #  (but continue to support for a while)
+        if extract_images_in_pdf:
+            save_elements(
+                elements=elements,
+                element_category_to_save=ElementType.IMAGE,
+                filename=filename,
+                file=file,
+                pdf_image_dpi=pdf_image_dpi,
+                output_dir_path=image_output_dir_path,
+                pdf_page_images=pdf_page_images,
+            )
 
-        save_elements(
-            elements=elements,
-            element_category_to_save=el_type,
-            filename=filename,
-            file=file,
-            pdf_image_dpi=pdf_image_dpi,
-            output_dir_path=image_output_dir_path,
-        )
+        for el_type in extract_element_types:
+            if extract_images_in_pdf and el_type == ElementType.IMAGE:
+                continue
+
+            save_elements(
+                elements=elements,
+                element_category_to_save=el_type,
+                filename=filename,
+                file=file,
+                pdf_image_dpi=pdf_image_dpi,
+                output_dir_path=image_output_dir_path,
+                pdf_page_images=pdf_page_images,
+            )
 
     out_elements = []
     for el in elements:
@@ -416,6 +496,165 @@ def _partition_pdf_or_image_local(
     return out_elements
 
 
+def process_pdf_page_images_with_model(
+    pdf_page_images: PdfPageImages,
+    model_name: Optional[str] = None,
+) -> "DocumentLayout":
+    """
+    Runs the layout model over the renderings of the pages of a pdf. Does the same as
+    process_file_with_model from unstructured_inference, but takes the renderings from
+    pdf_page_images so that they are shared with the other steps of partitioning.
+    """
+    from unstructured_inference.inference.layout import DocumentLayout, PageLayout
+    from unstructured_inference.models.base import get_model
+    from unstructured_inference.models.unstructuredmodel import (
+        UnstructuredElementExtractionModel,
+        UnstructuredObjectDetectionModel,
+    )
+
+    model = get_model(model_name)
+    detection_model = None
+    element_extraction_model = None
+    if isinstance(model, UnstructuredObjectDetectionModel):
+        detection_model = model
+    elif isinstance(model, UnstructuredElementExtractionModel):
+        element_extraction_model = model
+    else:
+        raise ValueError(f"Unsupported model type: {type(model)}")
+    logger.info(f"Reading PDF for file: {pdf_page_images.path} ...")
+    pages = [
+        PageLayout.from_image(
+            image,
+            number=page_number,
+            document_filename=pdf_page_images.path,
+            detection_model=detection_model,
+            element_extraction_model=element_extraction_model,
+        )
+        for page_number, image in zip(pdf_page_images.page_numbers, pdf_page_images)
+    ]
+    return DocumentLayout.from_pages(pages)
+
+
+def _can_partition_pages_in_parallel(
+    pdf_page_images: PdfPageImages,
+    max_workers: Optional[int],
+    page_batch_size: int,
+) -> bool:
+    if max_workers is None or max_workers <= 1:
+        return False
+    if multiprocessing.current_process().daemon:
+        logger.warning(
+            "Partitioning the pages of the PDF one at a time, since max_workers can't start "
+            "worker processes from within a daemon process, e.g. a worker of a pool.",
+        )
+        return False
+    return len(pdf_page_images) > page_batch_size
+
+
+def _warm_up_layout_model(model_name: str):
+    """Loads the layout model when a worker process starts, rather than on its first pages."""
+    from unstructured_inference.models.base import get_model
+
+    get_model(model_name)
+
+
+def _partition_pdf_page_range(
+    filename: str,
+    first_page: int,
+    last_page: int,
+    model_name: str,
+    pdf_image_dpi: int,
+    pdf_text_extractable: bool,
+    infer_table_structure: bool,
+    ocr_languages: str,
+    ocr_mode: str,
+) -> List["PageLayout"]:
+    """Runs the layout model, pdfminer and OCR over a range of pages of a pdf, the same way
+    _partition_pdf_or_image_local does over all of them."""
+    from unstructured.partition.pdf_image.ocr import process_file_with_ocr
+    from unstructured.partition.pdf_image.pdfminer_processing import process_file_with_pdfminer
+
+    with PdfPageImages(
+        filename=filename,
+        dpi=pdf_image_dpi,
+        first_page=first_page,
+        last_page=last_page,
+    ) as pdf_page_images:
+        document_layout = process_pdf_page_images_with_model(
+            pdf_page_images,
+            model_name=model_name,
+        )
+        if pdf_text_extractable is True:
+            document_layout = process_file_with_pdfminer(
+                document_layout,
+                filename,
+                page_numbers=pdf_page_images.page_numbers,
+            )
+        if not model_name.startswith("chipper"):
+            document_layout = process_file_with_ocr(
+                filename,
+                document_layout,
+                infer_table_structure=infer_table_structure,
+                ocr_languages=ocr_languages,
+                ocr_mode=ocr_mode,
+                pdf_image_dpi=pdf_image_dpi,
+                pdf_page_images=pdf_page_images,
+            )
+    for page in document_layout.pages:
+        # The models stay in the worker, only the layout is sent back
+        page.detection_model = None
+        page.element_extraction_model = None
+        page.image_array = None
+    return document_layout.pages
+
+
+def _partition_pdf_pages_in_parallel(
+    pdf_page_images: PdfPageImages,
+    max_workers: int,
+    page_batch_size: int,
+    model_name: str,
+    **kwargs,
+) -> "DocumentLayout":
+    """
+    Splits a pdf into ranges of page_batch_size pages that a pool of max_workers processes,
+    each of which loads the layout model once, partition concurrently. The layouts of the pages
+    are put back together in page order, so that converting them to elements gives the same
+    result as partitioning the pages one at a time.
+    """
+    from unstructured_inference.inference.layout import DocumentLayout
+
+    page_ranges = [
+        (first_page, min(first_page + page_batch_size - 1, len(pdf_page_images)))
+        for first_page in range(1, len(pdf_page_images) + 1, page_batch_size)
+    ]
+    logger.info(
+        f"Partitioning {len(pdf_page_images)} pages in {len(page_ranges)} ranges with "
+        f"{min(max_workers, len(page_ranges))} worker processes ...",
+    )
+    # NOTE: spawned rather than forked, since forking a process that runs model inference or
+    # OCR threads can deadlock the workers
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(page_ranges)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up_layout_model,
+        initargs=(model_name,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _partition_pdf_page_range,
+                pdf_page_images.path,
+                first_page,
+                last_page,
+                model_name=model_name,
+                pdf_image_dpi=pdf_page_images.dpi,
+                **kwargs,
+            )
+            for first_page, last_page in page_ranges
+        ]
+        pages = [page for future in futures for page in future.result()]
+    return DocumentLayout.from_pages(pages)
+
+
 def partition_pdf_or_image(
     filename: str = "",
     file: Optional[Union[bytes, BinaryIO, SpooledTemporaryFile]] = None,
@@ -446,11 +685,13 @@ def partition_pdf_or_image(
         filename=filename,
     )
 
-    extracted_elements = []
+    extracted_elements: Optional[List[Element]] = None
     pdf_text_extractable = False
     if not is_image:
-        try:
-            extracted_elements = extractable_elements(
+        # NOTE: the PDF is only partitioned with pdfminer for the fast strategy, otherwise
+        # a sample of its pages is checked for text
+        if strategy == PartitionStrategy.FAST:
+            extracted_elements = _partition_pdf_with_pdfminer_or_warn(
                 filename=filename,
                 file=spooled_to_bytes_io_if_needed(file),
                 include_page_breaks=include_page_breaks,
@@ -461,9 +702,15 @@ def partition_pdf_or_image(
             pdf_text_extractable = any(
                 isinstance(el, Text) and el.text.strip() for el in extracted_elements
             )
-        except Exception as e:
-            logger.error(e)
-            logger.warning("PDF text extraction failed, skip text extraction...")
+        else:
+            try:
+                pdf_text_extractable = is_pdf_text_extractable(
+                    filename=filename,
+                    file=spooled_to_bytes_io_if_needed(file),
+                )
+            except Exception as e:
+                logger.error(e)
+                logger.warning("PDF text extraction failed, skip text extraction...")
 
     strategy = determine_pdf_or_image_strategy(
         strategy,
@@ -495,6 +742,15 @@ def partition_pdf_or_image(
             out_elements = _process_uncategorized_text_elements(elements)
 
     elif strategy == PartitionStrategy.FAST:
+        if extracted_elements is None:
+            extracted_elements = _partition_pdf_with_pdfminer_or_warn(
+                filename=filename,
+                file=spooled_to_bytes_io_if_needed(file),
+                include_page_breaks=include_page_breaks,
+                languages=languages,
+                metadata_last_modified=metadata_last_modified or last_modification_date,
+                **kwargs,
+            )
         return extracted_elements
 
     elif strategy == PartitionStrategy.OCR_ONLY:
@@ -809,6 +1065,20 @@ def convert_pdf_to_images(
             yield image
 
 
+def _iter_image_frames(image: PILImage.Image) -> Iterator[PILImage.Image]:
+    """Yields each frame of the image, e.g. each page of a multi-page TIFF, as an image of its
+    own."""
+    if getattr(image, "n_frames", 1) == 1:
+        yield image
+        return
+    image_format = image.format
+    for frame in ImageSequence.Iterator(image):
+        # The iterator seeks within the same image, so each frame needs its own copy
+        frame = frame.copy()
+        frame.format = image_format
+        yield frame
+
+
 @requires_dependencies("unstructured_pytesseract", "unstructured_inference")
 def _partition_pdf_or_image_with_ocr(
     filename: str = "",
@@ -817,41 +1087,82 @@ def _partition_pdf_or_image_with_ocr(
     languages: Optional[List[str]] = ["eng"],
     is_image: bool = False,
     metadata_last_modified: Optional[str] = None,
+    ocr_max_workers: Optional[int] = None,
+    # Only apply to the hi_res strategy, e.g. when auto falls back to ocr_only
+    max_workers: Optional[int] = None,
+    page_batch_size: Optional[int] = None,
     **kwargs,
 ):
     """Partitions an image or PDF using OCR. For PDFs, each page is converted
-    to an image prior to processing."""
+    to an image prior to processing. Pages are OCRed by up to ocr_max_workers threads at once,
+    OCR_MAX_WORKERS if not given, while the following pages are rendered."""
+
+    from unstructured.partition.pdf_image.ocr import get_ocr_agent
+
+    if ocr_max_workers is None:
+        ocr_max_workers = env_config.OCR_MAX_WORKERS
+    # A paddle model can't run on more than one thread at a time
+    if get_ocr_agent() == OCR_AGENT_PADDLE:
+        ocr_max_workers = 1
 
-    elements = []
     if is_image:
-        images = []
         image = PILImage.open(file) if file is not None else PILImage.open(filename)
-        images.append(image)
+        return _partition_images_with_ocr(
+            images=_iter_image_frames(image),
+            ocr_max_workers=ocr_max_workers,
+            languages=languages,
+            include_page_breaks=include_page_breaks,
+            metadata_last_modified=metadata_last_modified,
+            **kwargs,
+        )
+    return _partition_images_with_ocr(
+        images=convert_pdf_to_images(filename, file),
+        ocr_max_workers=ocr_max_workers,
+        languages=languages,
+        include_page_breaks=include_page_breaks,
+        metadata_last_modified=metadata_last_modified,
+        **kwargs,
+    )
 
-        for i, image in enumerate(images):
-            page_elements = _partition_pdf_or_image_with_ocr_from_image(
-                image=image,
-                languages=languages,
-                page_number=i + 1,
-                include_page_breaks=include_page_breaks,
-                metadata_last_modified=metadata_last_modified,
-                **kwargs,
+
+def _partition_images_with_ocr(
+    images: Iterable[PILImage.Image],
+    ocr_max_workers: int = 1,
+    **kwargs,
+) -> List[Element]:
+    """
+    Partitions each image as a page, numbered from 1, using OCR. Up to ocr_max_workers pages are
+    OCRed at once by a pool of threads, which is enough since tesseract runs in a process of
+    its own, while the images of the next pages are taken from the iterable. At most twice as
+    many pages as workers are held in memory, and the elements are in page order.
+    """
+    elements: List[Element] = []
+    if ocr_max_workers <= 1:
+        for page_number, image in enumerate(images, start=1):
+            elements.extend(
+                _partition_pdf_or_image_with_ocr_from_image(
+                    image=image,
+                    page_number=page_number,
+                    **kwargs,
+                ),
             )
-            elements.extend(page_elements)
-    else:
-        page_number = 0
-        for image in convert_pdf_to_images(filename, file):
-            page_number += 1
-            page_elements = _partition_pdf_or_image_with_ocr_from_image(
-                image=image,
-                languages=languages,
-                page_number=page_number,
-                include_page_breaks=include_page_breaks,
-                metadata_last_modified=metadata_last_modified,
-                **kwargs,
+        return elements
+
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=ocr_max_workers) as executor:
+        for page_number, image in enumerate(images, start=1):
+            if len(pending) >= 2 * ocr_max_workers:
+                elements.extend(pending.popleft().result())
+            pending.append(
+                executor.submit(
+                    _partition_pdf_or_image_with_ocr_from_image,
+                    image=image,
+                    page_number=page_number,
+                    **kwargs,
+                ),
             )
-            elements.extend(page_elements)
-
+        while pending:
+            elements.extend(pending.popleft().result())
     return elements
 
 
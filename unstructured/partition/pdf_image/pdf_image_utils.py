@@ -1,7 +1,8 @@
 import os
 import tempfile
+from collections import OrderedDict
 from pathlib import PurePath
-from typing import TYPE_CHECKING, BinaryIO, List, Optional, Union, cast
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Union, cast
 
 import cv2
 import numpy as np
@@ -11,10 +12,15 @@ from PIL import Image
 from unstructured.documents.elements import ElementType
 from unstructured.logger import logger
 from unstructured.partition.common import convert_to_bytes
+from unstructured.partition.utils.config import env_config
 
 if TYPE_CHECKING:
     from unstructured.documents.elements import Element
 
+# How many pages of a pdf PdfPageImages renders at a time, each render is a separate call to
+# poppler that parses the pdf anew
+PDF_RENDER_BATCH_SIZE = 16
+
 
 def write_image(image: Union[Image.Image, np.ndarray], output_image_path: str):
     """
@@ -71,6 +77,135 @@ def convert_pdf_to_image(
     return images
 
 
+class PdfPageImages:
+    """
+    Renders the pages of a pdf into images on demand, so that every step of partitioning it
+    at the same dpi, e.g. layout detection, OCR and extracting images of elements, shares a
+    single rendering of each page. Pages are rendered a batch at a time into a temporary
+    directory that lives until the object is closed, and the most recently used of them are
+    also kept decoded in memory. Iterating over it yields the pages from first_page to
+    last_page, or to the end of the pdf if not given.
+    """
+
+    def __init__(
+        self,
+        filename: str = "",
+        file: Optional[Union[bytes, BinaryIO]] = None,
+        dpi: int = 200,
+        max_cached_pages: Optional[int] = None,
+        render_batch_size: int = PDF_RENDER_BATCH_SIZE,
+        first_page: int = 1,
+        last_page: Optional[int] = None,
+    ):
+        self.filename = filename
+        self.file = file
+        self.dpi = dpi
+        self.first_page = first_page
+        self.last_page = last_page
+        self.max_cached_pages = (
+            env_config.PDF_PAGE_IMAGE_CACHE_SIZE if max_cached_pages is None else max_cached_pages
+        )
+        self.render_batch_size = render_batch_size
+        self.number_of_renders = 0
+        self._temp_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._path: Optional[str] = None
+        self._number_of_pages: Optional[int] = None
+        self._page_paths: Dict[int, str] = {}
+        self._images: "OrderedDict[int, Image.Image]" = OrderedDict()
+
+    def __enter__(self) -> "PdfPageImages":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.page_numbers)
+
+    def __iter__(self) -> Iterator[Image.Image]:
+        for page_number in self.page_numbers:
+            yield self.get_page(page_number)
+
+    @property
+    def temp_dir(self) -> str:
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.TemporaryDirectory()
+        return self._temp_dir.name
+
+    @property
+    def path(self) -> str:
+        """The pdf to render, written out to the temporary directory if given as a file."""
+        if self._path is None:
+            if self.file is not None:
+                self._path = os.path.join(self.temp_dir, "document.pdf")
+                with open(self._path, "wb") as pdf_f:
+                    pdf_f.write(convert_to_bytes(self.file))
+            else:
+                self._path = self.filename
+        return self._path
+
+    @property
+    def number_of_pages(self) -> int:
+        if self._number_of_pages is None:
+            self._number_of_pages = int(pdf2image.pdfinfo_from_path(self.path)["Pages"])
+        return self._number_of_pages
+
+    @property
+    def page_numbers(self) -> range:
+        last_page = self.number_of_pages
+        if self.last_page is not None:
+            last_page = min(self.last_page, last_page)
+        return range(self.first_page, last_page + 1)
+
+    def get_page_path(self, page_number: int) -> str:
+        """The path to the rendering of the page, numbered from 1, rendering it if needed."""
+        if page_number not in self._page_paths:
+            if not 1 <= page_number <= self.number_of_pages:
+                raise IndexError(
+                    f"page {page_number} out of range, the pdf has {self.number_of_pages} pages",
+                )
+            # Batches don't reach beyond the pages iterated over, unless the page is elsewhere
+            end = (
+                self.page_numbers.stop - 1
+                if page_number in self.page_numbers
+                else self.number_of_pages
+            )
+            last_page = min(page_number + self.render_batch_size - 1, end)
+            _image_paths = pdf2image.convert_from_path(
+                self.path,
+                dpi=self.dpi,
+                output_folder=self.temp_dir,
+                first_page=page_number,
+                last_page=last_page,
+                paths_only=True,
+            )
+            self.number_of_renders += 1
+            image_paths = cast(List[str], _image_paths)
+            self._page_paths.update(zip(range(page_number, last_page + 1), image_paths))
+        return self._page_paths[page_number]
+
+    def get_page(self, page_number: int) -> Image.Image:
+        """The rendering of the page, numbered from 1, rendering it if needed."""
+        if page_number in self._images:
+            self._images.move_to_end(page_number)
+            return self._images[page_number]
+        image = Image.open(self.get_page_path(page_number))
+        image.load()
+        if self.max_cached_pages > 0:
+            self._images[page_number] = image
+            while len(self._images) > self.max_cached_pages:
+                self._images.popitem(last=False)
+        return image
+
+    def close(self):
+        self._images.clear()
+        self._page_paths.clear()
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+            self._path = None
+
+
 def save_elements(
     elements: List["Element"],
     element_category_to_save: str,
@@ -78,55 +213,56 @@ def save_elements(
     filename: str = "",
     file: Optional[Union[bytes, BinaryIO]] = None,
     output_dir_path: Optional[str] = None,
+    pdf_page_images: Optional[PdfPageImages] = None,
 ):
     """
     Extract and save images from the page. This method iterates through the layout elements
     of the page, identifies image regions, and extracts and saves them as separate image files.
+    The pages are cropped from pdf_page_images if given, otherwise they are rendered anew.
     """
 
     if not output_dir_path:
         output_dir_path = os.path.join(os.getcwd(), "figures")
     os.makedirs(output_dir_path, exist_ok=True)
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        _image_paths = convert_pdf_to_image(
-            filename,
-            file,
-            pdf_image_dpi,
-            output_folder=temp_dir,
-            path_only=True,
-        )
-        image_paths = cast(List[str], _image_paths)
-
-        figure_number = 0
-        for el in elements:
-            if el.category != element_category_to_save:
-                continue
-
-            coordinates = el.metadata.coordinates
-            if not coordinates or not coordinates.points:
-                continue
-
-            points = coordinates.points
-            x1, y1 = points[0]
-            x2, y2 = points[2]
-            page_number = el.metadata.page_number
-
-            figure_number += 1
-            try:
-                basename = "table" if el.category == ElementType.TABLE else "figure"
-                output_f_path = os.path.join(
-                    output_dir_path,
-                    f"{basename}-{page_number}-{figure_number}.jpg",
-                )
-                image_path = image_paths[page_number - 1]
-                image = Image.open(image_path)
-                cropped_image = image.crop((x1, y1, x2, y2))
-                write_image(cropped_image, output_f_path)
-                # add image path to element metadata
-                el.metadata.image_path = output_f_path
-            except (ValueError, IOError):
-                logger.warning("Image Extraction Error: Skipping the failed image", exc_info=True)
+    if pdf_page_images is None:
+        with PdfPageImages(filename=filename, file=file, dpi=pdf_image_dpi) as pdf_page_images:
+            return save_elements(
+                elements=elements,
+                element_category_to_save=element_category_to_save,
+                pdf_image_dpi=pdf_image_dpi,
+                output_dir_path=output_dir_path,
+                pdf_page_images=pdf_page_images,
+            )
+
+    figure_number = 0
+    for el in elements:
+        if el.category != element_category_to_save:
+            continue
+
+        coordinates = el.metadata.coordinates
+        if not coordinates or not coordinates.points:
+            continue
+
+        points = coordinates.points
+        x1, y1 = points[0]
+        x2, y2 = points[2]
+        page_number = el.metadata.page_number
+
+        figure_number += 1
+        try:
+            basename = "table" if el.category == ElementType.TABLE else "figure"
+            output_f_path = os.path.join(
+                output_dir_path,
+                f"{basename}-{page_number}-{figure_number}.jpg",
+            )
+            image = pdf_page_images.get_page(page_number)
+            cropped_image = image.crop((x1, y1, x2, y2))
+            write_image(cropped_image, output_f_path)
+            # add image path to element metadata
+            el.metadata.image_path = output_f_path
+        except (ValueError, IOError):
+            logger.warning("Image Extraction Error: Skipping the failed image", exc_info=True)
 
 
 def check_element_types_to_extract(
@@ -1,5 +1,6 @@
-from typing import TYPE_CHECKING, BinaryIO, List, Optional, Union, cast
+from typing import TYPE_CHECKING, BinaryIO, Collection, List, Optional, Union, cast
 
+from pdfminer.layout import LTPage
 from pdfminer.utils import open_filename
 from unstructured_inference.inference.elements import (
     EmbeddedTextRegion,
@@ -27,12 +28,14 @@ if TYPE_CHECKING:
 def process_file_with_pdfminer(
     inferred_document_layout: "DocumentLayout",
     filename: str = "",
+    page_numbers: Optional[Collection[int]] = None,
 ) -> "DocumentLayout":
     with open_filename(filename, "rb") as fp:
         fp = cast(BinaryIO, fp)
         inferred_document_layout = process_data_with_pdfminer(
             inferred_document_layout=inferred_document_layout,
             file=fp,
+            page_numbers=page_numbers,
         )
         return inferred_document_layout
 
@@ -40,10 +43,12 @@ def process_file_with_pdfminer(
 def process_data_with_pdfminer(
     inferred_document_layout: "DocumentLayout",
     file: Optional[Union[bytes, BinaryIO]] = None,
+    page_numbers: Optional[Collection[int]] = None,
 ) -> "DocumentLayout":
-    """Process document data using PDFMiner to extract layout information."""
+    """Process document data using PDFMiner to extract layout information. If page_numbers is
+    given, the inferred document layout only holds the pages with those numbers."""
 
-    extracted_layouts = get_regions_by_pdfminer(file)
+    extracted_layouts = get_regions_by_pdfminer(file, page_numbers=page_numbers)
 
     inferred_pages = inferred_document_layout.pages
     for i, (inferred_page, extracted_layout) in enumerate(zip(inferred_pages, extracted_layouts)):
@@ -82,50 +87,58 @@ def process_data_with_pdfminer(
 def get_regions_by_pdfminer(
     fp: Optional[Union[bytes, BinaryIO]],
     dpi: int = 200,
+    page_numbers: Optional[Collection[int]] = None,
 ) -> List[List[TextRegion]]:
     """Loads the image and word objects from a pdf using pdfplumber and the image renderings of the
     pdf pages using pdf2image"""
 
     layouts = []
+    for page, page_layout in open_pdfminer_pages_generator(fp, page_numbers=page_numbers):
+        layouts.append(get_regions_from_page_layout(page_layout, dpi=dpi))
+
+    return layouts
+
+
+def get_regions_from_page_layout(page_layout: LTPage, dpi: int = 200) -> List[TextRegion]:
+    """Gets the text and image regions of a page laid out by pdfminer, scaled to the image
+    rendering of the page at the dpi."""
+
     # Coefficient to rescale bounding box to be compatible with images
     coef = dpi / 72
-    for page, page_layout in open_pdfminer_pages_generator(fp):
-        height = page_layout.height
+    height = page_layout.height
+
+    layout: List["TextRegion"] = []
+    for obj in page_layout:
+        x1, y1, x2, y2 = rect_to_bbox(obj.bbox, height)
+
+        if hasattr(obj, "get_text"):
+            _text = obj.get_text()
+            element_class = EmbeddedTextRegion  # type: ignore
+        else:
+            embedded_images = get_images_from_pdf_element(obj)
+            if len(embedded_images) > 0:
+                _text = None
+                element_class = ImageTextRegion  # type: ignore
+            else:
+                continue
+
+        text_region = element_class.from_coords(
+            x1 * coef,
+            y1 * coef,
+            x2 * coef,
+            y2 * coef,
+            text=_text,
+            source=Source.PDFMINER,
+        )
 
-        layout: List["TextRegion"] = []
-        for obj in page_layout:
-            x1, y1, x2, y2 = rect_to_bbox(obj.bbox, height)
+        if text_region.bbox is not None and text_region.bbox.area > 0:
+            layout.append(text_region)
 
-            if hasattr(obj, "get_text"):
-                _text = obj.get_text()
-                element_class = EmbeddedTextRegion  # type: ignore
-            else:
-                embedded_images = get_images_from_pdf_element(obj)
-                if len(embedded_images) > 0:
-                    _text = None
-                    element_class = ImageTextRegion  # type: ignore
-                else:
-                    continue
-
-            text_region = element_class.from_coords(
-                x1 * coef,
-                y1 * coef,
-                x2 * coef,
-                y2 * coef,
-                text=_text,
-                source=Source.PDFMINER,
-            )
-
-            if text_region.bbox is not None and text_region.bbox.area > 0:
-                layout.append(text_region)
-
-        # NOTE(christine): always do the basic sort first for deterministic order across
-        # python versions.
-        layout = order_layout(layout)
-
-        # apply the current default sorting to the layout elements extracted by pdfminer
-        layout = sort_text_regions(layout)
-
-        layouts.append(layout)
+    # NOTE(christine): always do the basic sort first for deterministic order across
+    # python versions.
+    layout = order_layout(layout)
 
-    return layouts
+    # apply the current default sorting to the layout elements extracted by pdfminer
+    layout = sort_text_regions(layout)
+
+    return layout
@@ -1,9 +1,12 @@
+import itertools
 import tempfile
-from typing import Any, BinaryIO, List, Tuple
+from typing import Any, BinaryIO, Collection, Iterable, List, Optional, Tuple
 
 import pikepdf
 from pdfminer.converter import PDFPageAggregator
 from pdfminer.layout import LAParams, LTContainer, LTImage
+from pdfminer.pdfdevice import PDFDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
 from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
 from pdfminer.pdfpage import PDFPage
 from pdfminer.pdfparser import PSSyntaxError
@@ -21,6 +24,52 @@ def init_pdfminer():
     return device, interpreter
 
 
+class PDFTextFound(Exception):
+    """Raised by TextPresenceDevice to stop interpreting a page once it's found text."""
+
+
+class TextPresenceDevice(PDFDevice):
+    """A device that interprets the content of pdf pages without laying it out, only to tell
+    whether they show any characters other than whitespace."""
+
+    def render_string(self, textstate, seq, ncs, graphicstate):
+        font = textstate.font
+        if font is None:
+            return
+        for obj in seq:
+            if not isinstance(obj, bytes):
+                continue
+            for cid in font.decode(obj):
+                try:
+                    char = font.to_unichr(cid)
+                except PDFUnicodeNotDefined:
+                    # Extracted as "(cid:...)", which counts as text as well
+                    raise PDFTextFound
+                if char.strip():
+                    raise PDFTextFound
+
+
+def pdfminer_pages_have_text(pages: Iterable[PDFPage]) -> bool:
+    """Whether any of the pages shows text, stopping at the first character found."""
+    rsrcmgr = PDFResourceManager()
+    interpreter = PDFPageInterpreter(rsrcmgr, TextPresenceDevice(rsrcmgr))
+    for page in pages:
+        try:
+            interpreter.process_page(page)
+        except PDFTextFound:
+            return True
+    return False
+
+
+def pdfminer_layout_has_text(layout_object: Any) -> bool:
+    """Whether a PDF layout element, or any element within it, has text other than whitespace."""
+    if hasattr(layout_object, "get_text"):
+        return bool(layout_object.get_text().strip())
+    if isinstance(layout_object, LTContainer):
+        return any(pdfminer_layout_has_text(child) for child in layout_object)
+    return False
+
+
 def get_images_from_pdf_element(layout_object: Any) -> List[LTImage]:
     """
     Recursively extracts LTImage objects from a PDF layout element.
@@ -81,15 +130,20 @@ def rect_to_bbox(
 
 def open_pdfminer_pages_generator(
     fp: BinaryIO,
+    page_numbers: Optional[Collection[int]] = None,
 ):
-    """Open PDF pages using PDFMiner, handling and repairing invalid dictionary constructs."""
+    """Open PDF pages using PDFMiner, handling and repairing invalid dictionary constructs.
+    If page_numbers is given, only the pages with those numbers, counting from 1, are opened."""
 
     device, interpreter = init_pdfminer()
+    pagenos = None if page_numbers is None else {page_number - 1 for page_number in page_numbers}
     try:
-        i = 0
-        pages = PDFPage.get_pages(fp)
+        # The index of each page opened within the entire PDF
+        page_indices = itertools.count() if pagenos is None else iter(sorted(pagenos))
+        pages = PDFPage.get_pages(fp, pagenos=pagenos)
         # Detect invalid dictionary construct for entire PDF
         for page in pages:
+            i = next(page_indices)
             try:
                 # Detect invalid dictionary construct for one page
                 interpreter.process_page(page)
@@ -106,7 +160,6 @@ def open_pdfminer_pages_generator(
                     page = next(PDFPage.get_pages(open(tmp.name, "rb")))  # noqa: SIM115
                     interpreter.process_page(page)
                     page_layout = device.get_result()
-            i += 1
             yield page, page_layout
     except PSSyntaxError:
         logger.info("Detected invalid dictionary construct for PDFminer")
@@ -115,7 +168,7 @@ def open_pdfminer_pages_generator(
         with tempfile.NamedTemporaryFile() as tmp:
             with pikepdf.Pdf.open(fp) as pdf:
                 pdf.save(tmp.name)
-            pages = PDFPage.get_pages(open(tmp.name, "rb"))  # noqa: SIM115
+            pages = PDFPage.get_pages(open(tmp.name, "rb"), pagenos=pagenos)  # noqa: SIM115
             for page in pages:
                 interpreter.process_page(page)
                 page_layout = device.get_result()
@@ -1,7 +1,10 @@
+import io
+import itertools
 from tempfile import SpooledTemporaryFile
-from typing import BinaryIO, Optional, Union
+from typing import BinaryIO, List, Optional, Union, cast
 
 from unstructured.logger import logger
+from unstructured.partition.utils.config import env_config
 from unstructured.partition.utils.constants import PartitionStrategy
 from unstructured.utils import dependency_exists
 
@@ -22,6 +25,67 @@ def validate_strategy(strategy: str, is_image: bool = False):
         raise ValueError("The fast strategy is not available for image files.")
 
 
+def is_pdf_text_extractable(
+    filename: str = "",
+    file: Optional[Union[bytes, BinaryIO, SpooledTemporaryFile]] = None,
+    max_pages: Optional[int] = None,
+) -> bool:
+    """Checks whether the text of a PDF can be extracted without OCR. Up to max_pages of its
+    pages, PDF_TEXT_EXTRACTABLE_SAMPLE_PAGES by default, spread evenly from the first to the
+    last, are interpreted with pdfminer until one of them shows any text. The pages aren't
+    laid out, so unlike partitioning the PDF this takes milliseconds rather than seconds."""
+    from pdfminer.utils import open_filename
+
+    if max_pages is None:
+        max_pages = env_config.PDF_TEXT_EXTRACTABLE_SAMPLE_PAGES
+    if isinstance(file, bytes):
+        file = io.BytesIO(file)
+
+    if file is not None:
+        file.seek(0)
+        return _sampled_pdf_pages_have_text(cast(BinaryIO, file), max_pages=max_pages)
+    with open_filename(filename, "rb") as fp:
+        return _sampled_pdf_pages_have_text(cast(BinaryIO, fp), max_pages=max_pages)
+
+
+def _sampled_pdf_pages_have_text(fp: BinaryIO, max_pages: int) -> bool:
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.psparser import PSException
+
+    from unstructured.partition.pdf_image.pdfminer_utils import (
+        open_pdfminer_pages_generator,
+        pdfminer_layout_has_text,
+        pdfminer_pages_have_text,
+    )
+
+    try:
+        # Only the page tree is read here, the content of the pages is parsed as needed
+        pages = list(PDFPage.create_pages(PDFDocument(PDFParser(fp))))
+        return pdfminer_pages_have_text(
+            pages[i] for i in _sample_page_indices(len(pages), max_pages)
+        )
+    except PSException:
+        logger.info("Checking the text of the first pages of the PDF after repairing it ...")
+        fp.seek(0)
+        return any(
+            pdfminer_layout_has_text(page_layout)
+            for _, page_layout in itertools.islice(open_pdfminer_pages_generator(fp), max_pages)
+        )
+
+
+def _sample_page_indices(number_of_pages: int, max_pages: int) -> List[int]:
+    """The indices of at most max_pages pages spread evenly over a document of number_of_pages
+    pages, including the first and the last."""
+    if number_of_pages <= max_pages:
+        return list(range(number_of_pages))
+    if max_pages <= 1:
+        return [0]
+    step = (number_of_pages - 1) / (max_pages - 1)
+    return sorted({round(i * step) for i in range(max_pages)})
+
+
 def determine_pdf_or_image_strategy(
     strategy: str,
     file: Optional[Union[bytes, BinaryIO, SpooledTemporaryFile]] = None,
@@ -5,6 +5,7 @@ this module. Constants are values that are usually names for common options (e.g
 settings that should not be altered without making a code change (e.g., definition of 1Gb of memory
 in bytes). Constants should go into `./constants.py`
 """
+import multiprocessing
 import os
 from dataclasses import dataclass
 
@@ -72,6 +73,32 @@ class ENVConfig:
         """optimum text height for tesseract OCR"""
         return self._get_int("TESSERACT_OPTIMUM_TEXT_HEIGHT", 20)
 
+    @property
+    def PDF_PAGE_IMAGE_CACHE_SIZE(self) -> int:
+        """number of rendered pdf page images kept decoded in memory while partitioning a pdf
+
+        pages beyond this are read back from the temporary directory they were rendered into
+        """
+        return self._get_int("PDF_PAGE_IMAGE_CACHE_SIZE", 4)
+
+    @property
+    def PDF_TEXT_EXTRACTABLE_SAMPLE_PAGES(self) -> int:
+        """maximum number of pages, spread from the first to the last, checked for text to tell
+        whether the text of a pdf is extractable when choosing a strategy for it
+        """
+        return self._get_int("PDF_TEXT_EXTRACTABLE_SAMPLE_PAGES", 10)
+
+    @property
+    def OCR_MAX_WORKERS(self) -> int:
+        """number of pages OCRed at once by the ocr_only strategy, defaults to the number of cpus
+
+        each page OCRed with tesseract runs in a process of its own. Defaults to 1 within daemon
+        processes, e.g. the workers of a pool, which already run one per cpu
+        """
+        if multiprocessing.current_process().daemon:
+            return self._get_int("OCR_MAX_WORKERS", 1)
+        return self._get_int("OCR_MAX_WORKERS", os.cpu_count() or 1)
+
     @property
     def OCR_AGENT(self) -> str:
         """error margin when comparing if a ocr region is within the table element when preparing